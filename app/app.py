@@ -54,19 +54,21 @@ if ref and ref.get("files"):
             "Para auditoría de cambios en los paquetes, véase el registro en data/data_changelog.md."
         )
 
-if not os.path.isfile(config.DB_PATH):
+DB_PATH = config.served_db_path()
+if not os.path.isfile(DB_PATH):
     st.warning(
         "No se encontró la base de datos. Ejecute la ingestión y el intercambio atómico "
-        f"para que exista `{config.DB_PATH}`."
+        f"para que exista `{DB_PATH}`."
     )
     st.stop()
 
 import duckdb
-con = duckdb.connect(config.DB_PATH, read_only=True)
+con = duckdb.connect(DB_PATH, read_only=True)
 
 # --- Filters (sidebar) ---
 months_available = con.execute(
-    "SELECT DISTINCT month FROM tenders_clean_all WHERE month IS NOT NULL ORDER BY month"
+    "SELECT DISTINCT month FROM tenders_clean_all WHERE month IS NOT NULL AND buyer_key = md5_number_upper(?) ORDER BY month",
+    [config.DEFAULT_BUYER],
 ).fetchall()
 months_available = [r[0] for r in months_available]
 years_available = sorted(set(m[:4] for m in months_available)) if months_available else []
@@ -86,28 +88,30 @@ if use_range and months_available:
     if from_month and to_month and from_month > to_month:
         from_month, to_month = to_month, from_month
 
-# Build SQL filter fragments (for tenders: t.month / tenders_clean_all.month, for awards: a.month / awards_clean_all.month)
+# Build SQL filter fragments (for tenders: t.* / tenders_clean_all, for awards: a.* / awards_clean_all).
+# Same buyer_key + range predicates on the typed year / month_date columns as the API (backend/db.py).
 def month_filter(table_alias: str) -> tuple[str, list]:
     alias = f"{table_alias}." if table_alias else ""
-    parts, params = [], []
+    parts, params = [f"{alias}buyer_key = md5_number_upper(?)"], [config.DEFAULT_BUYER]
     if selected_years:
-        placeholders = ",".join(["?" for _ in selected_years])
-        parts.append(f"SUBSTR({alias}month, 1, 4) IN ({placeholders})")
-        params.extend(selected_years)
+        years = sorted(int(y) for y in selected_years)
+        parts.append(f"{alias}year BETWEEN ? AND ?")
+        params.extend([years[0], years[-1]])
+        if len(years) != years[-1] - years[0] + 1:
+            placeholders = ",".join(["?" for _ in years])
+            parts.append(f"{alias}year IN ({placeholders})")
+            params.extend(years)
     if from_month:
-        parts.append(f"{alias}month >= ?")
+        parts.append(f"{alias}month_date >= CAST(? || '-01' AS DATE)")
         params.append(from_month)
     if to_month:
-        parts.append(f"{alias}month <= ?")
+        parts.append(f"{alias}month_date <= CAST(? || '-01' AS DATE)")
         params.append(to_month)
     where = " AND ".join(parts) if parts else "1=1"
     return where, params
 
 wf_t, params_t = month_filter("")
 wf_a, params_a = month_filter("")
-# For JOINs: tender alias "t", award alias "a"
-wf_t_alias = wf_t.replace("month", "t.month") if "month" in wf_t else wf_t
-wf_a_alias = wf_a.replace("month", "a.month") if "month" in wf_a else wf_a
 
 # Placeholder KPIs (filtered)
 tenders_count = con.execute(
@@ -221,17 +225,28 @@ else:
 
 # --- By procurement method (modalidad) ---
 st.markdown("**Por modalidad de contratación**")
+# Award amounts come from awards_fact, which already carries each award's tender modality.
 df_method = con.execute(f"""
+    WITH t AS (
+        SELECT procurement_method_details, COUNT(DISTINCT nog) AS procesos
+        FROM tenders_clean_all
+        WHERE {wf_t}
+        GROUP BY procurement_method_details
+    ),
+    a AS (
+        SELECT procurement_method_details, SUM(amount) AS total_amount
+        FROM awards_fact
+        WHERE {wf_a} AND has_tender
+        GROUP BY procurement_method_details
+    )
     SELECT
         COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
-        COUNT(DISTINCT t.nog) AS procesos,
-        ROUND(COALESCE(SUM(a.amount), 0), 2) AS total_q
-    FROM tenders_clean_all t
-    LEFT JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
-    WHERE {wf_t_alias}
-    GROUP BY t.procurement_method_details
+        t.procesos,
+        ROUND(COALESCE(a.total_amount, 0), 2) AS total_q
+    FROM t
+    LEFT JOIN a ON t.procurement_method_details IS NOT DISTINCT FROM a.procurement_method_details
     ORDER BY total_q DESC
-""", params_t).df()
+""", params_t + params_a).df()
 if not df_method.empty:
     st.dataframe(df_method, use_container_width=True, column_config={
         "total_q": st.column_config.NumberColumn("Total adjudicado (Q)", format="Q %.2f"),
@@ -244,14 +259,13 @@ if not df_method.empty:
     df_top_suppliers_by_mod = con.execute(f"""
         WITH by_mod_supplier AS (
             SELECT
-                COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
-                COALESCE(a.supplier_name, '(Sin nombre)') AS proveedor,
-                ROUND(SUM(a.amount), 2) AS total_q,
+                COALESCE(procurement_method_details, '(Sin especificar)') AS modalidad,
+                COALESCE(supplier_name, '(Sin nombre)') AS proveedor,
+                ROUND(SUM(amount), 2) AS total_q,
                 COUNT(*) AS adjudicaciones
-            FROM tenders_clean_all t
-            JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
-            WHERE {wf_t_alias}
-            GROUP BY t.procurement_method_details, a.supplier_name
+            FROM awards_fact
+            WHERE {wf_a} AND has_tender
+            GROUP BY procurement_method_details, supplier_name
         ),
         ranked AS (
             SELECT *, ROW_NUMBER() OVER (PARTITION BY modalidad ORDER BY total_q DESC) AS rn
@@ -261,7 +275,7 @@ if not df_method.empty:
         FROM ranked
         WHERE rn <= 10
         ORDER BY modalidad, rn
-    """, params_t).df()
+    """, params_a).df()
     if not df_top_suppliers_by_mod.empty:
         for mod in df_top_suppliers_by_mod["modalidad"].unique():
             sub = df_top_suppliers_by_mod[df_top_suppliers_by_mod["modalidad"] == mod].drop(columns=["modalidad", "rn"])
@@ -337,11 +351,11 @@ else:
 
 st.divider()
 st.subheader("Procesos")
-df_tenders = con.execute(f"SELECT * FROM tenders_clean_all WHERE {wf_t} ORDER BY date_published DESC NULLS LAST LIMIT 100", params_t).df()
+df_tenders = con.execute(f"SELECT * EXCLUDE (year, month_date) FROM tenders_clean_all WHERE {wf_t} ORDER BY date_published DESC NULLS LAST LIMIT 100", params_t).df()
 st.dataframe(df_tenders)
 
 st.subheader("Adjudicaciones")
-df_awards = con.execute(f"SELECT * FROM awards_clean_all WHERE {wf_a} ORDER BY award_date DESC NULLS LAST LIMIT 100", params_a).df()
+df_awards = con.execute(f"SELECT * EXCLUDE (year, month_date) FROM awards_clean_all WHERE {wf_a} ORDER BY award_date DESC NULLS LAST LIMIT 100", params_a).df()
 st.dataframe(df_awards)
 
 con.close()
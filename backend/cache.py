@@ -0,0 +1,235 @@
+"""
+In-process response cache for the API. Data only changes when lake.duckdb is swapped,
+so responses are cached per (endpoint, normalized filter) and the whole cache is dropped
+when the data version token (see db.data_version) changes. Entries hold encoded bodies,
+so a hit costs no JSON serialization, and their gzip / brotli variants (backend.compression),
+each compressed on first request for it. Concurrent misses for the same key and data version
+share one computation (single_flight), so a burst of identical requests runs one query.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi.responses import Response
+
+from backend.compression import accepted_encoding, compress, compressible, record_served
+from backend.db import data_version
+from backend.executor import query_executor
+from backend.formats import json_response
+from backend.metrics import observe_rows, registry
+
+CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "512"))
+SINGLE_FLIGHT = os.getenv("API_SINGLE_FLIGHT", "1") != "0"
+
+_MISS = object()
+
+
+def normalize_filter(
+    years: list[str] | None = None,
+    from_month: str | None = None,
+    to_month: str | None = None,
+) -> tuple:
+    """Canonical form of the month/year filter: years de-duplicated and sorted, blanks as None."""
+    norm_years = tuple(sorted({y for y in years if y})) if years else ()
+    return (norm_years, from_month or None, to_month or None)
+
+
+class ResponseCache:
+    """Bounded LRU of endpoint results, tagged with the data version they were computed on."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version: str | None = None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str) -> None:
+        """Drop everything if the data changed. Caller holds _lock."""
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version: str):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key, _MISS)
+            if value is _MISS:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, version: str, value) -> None:
+        with self._lock:
+            if version != self.version:
+                # Computed on a generation that has since been replaced; don't keep it.
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache()
+
+
+class SingleFlight:
+    """
+    Identical concurrent misses wait on the first one's computation instead of running their own.
+    Callers may be on different event loops (requests on the server's, warm-up on its own thread's),
+    so the shared result is a concurrent.futures.Future in a lock-guarded map; the leader runs the
+    computation on its loop and every caller awaits the result through asyncio.wrap_future.
+    """
+
+    def __init__(self, enabled: bool = SINGLE_FLIGHT):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._inflight: dict = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def run(self, key, endpoint: str, fn, *args):
+        """Result of fn(*args) (a coroutine function), shared with concurrent calls for the same key."""
+        if not self.enabled:
+            return await fn(*args)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = concurrent.futures.Future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            task = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(functools.partial(self._settle, key, future))
+        else:
+            registry.inc("api_coalesced_requests_total", "Cache misses served by another request's in-flight query.", {"endpoint": endpoint})
+        # shield: one waiter going away (client disconnect) must not cancel the others' result.
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key, future: concurrent.futures.Future, task: asyncio.Task) -> None:
+        """Leader's task finished: publish its outcome to every waiter and free the key."""
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._inflight),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
+
+
+single_flight = SingleFlight()
+
+
+def cache_key(endpoint: str, kwargs: dict) -> tuple:
+    """(endpoint, normalized filter, other params sorted by name)."""
+    filt = normalize_filter(kwargs.get("years"), kwargs.get("from_month"), kwargs.get("to_month"))
+    rest = tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in kwargs.items()
+        if k not in ("years", "from_month", "to_month")
+    ))
+    return (endpoint, filt, rest)
+
+
+class _CachedResponse:
+    """Body + headers of an encoded Response, plus compressed bodies by encoding; a fresh Response is built per hit."""
+
+    __slots__ = ("body", "status_code", "media_type", "headers", "rows", "compressed")
+
+    def __init__(self, response: Response):
+        self.body = response.body
+        self.rows = getattr(response, "rows", None)
+        self.status_code = response.status_code
+        self.media_type = response.media_type
+        self.headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+        self.compressed: dict[str, bytes] = {}
+
+    def build(self, endpoint: str, encoding: str | None = None) -> Response:
+        """Response in `encoding` when the body is worth compressing (compressed once, then reused), else plain."""
+        if encoding is None or not compressible(self.body, self.media_type):
+            return Response(content=self.body, status_code=self.status_code, media_type=self.media_type, headers=self.headers)
+        body = self.compressed.get(encoding)
+        if body is None:
+            # Concurrent first requests may both compress; the last one stored wins, same bytes.
+            body = self.compressed[encoding] = compress(self.body, encoding, endpoint)
+        record_served(endpoint, encoding)
+        headers = {**self.headers, "Content-Encoding": encoding}
+        return Response(content=body, status_code=self.status_code, media_type=self.media_type, headers=headers)
+
+
+def cached(endpoint: str):
+    """
+    Decorator for API handlers: serve from response_cache while the data version is unchanged.
+    Hits are answered on the event loop; misses run the (sync) handler on query_executor.
+    Plain return values are JSON-encoded there too (timed under `endpoint`), so every entry is bytes.
+    Misses go through single_flight: concurrent requests for the same key share the entry.
+    """
+
+    def decorator(fn):
+        def compute(key, version, kwargs) -> _CachedResponse:
+            value = fn(**kwargs)
+            if not isinstance(value, Response):
+                value = json_response(value, endpoint, kwargs.get("fmt", "json"))
+            entry = _CachedResponse(value)
+            response_cache.put(key, version, entry)
+            return entry
+
+        async def execute(key, version, kwargs) -> _CachedResponse:
+            return await query_executor.run(compute, key, version, kwargs)
+
+        @functools.wraps(fn)
+        async def wrapper(**kwargs):
+            version = data_version()
+            key = cache_key(endpoint, kwargs)
+            entry = response_cache.get(key, version)
+            if entry is _MISS:
+                entry = await single_flight.run((version, key), endpoint, execute, key, version, kwargs)
+            observe_rows(entry.rows)
+            return entry.build(endpoint, accepted_encoding.get())
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,157 @@
+"""
+Content-Encoding negotiation for the API. Bodies of at least API_COMPRESS_MIN_BYTES are sent
+brotli- (when the `brotli` package is installed) or gzip-compressed, whichever the client's
+Accept-Encoding prefers. Cached responses keep each compressed variant next to the plain body
+(see backend.cache), so a body is compressed once per data version and encoding; other responses
+are compressed per request by CompressionMiddleware. Ratio and CPU time per endpoint and encoding
+are in compression_stats() and /api/metrics.
+"""
+import contextvars
+import gzip
+import os
+import threading
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from backend.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("API_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "5"))
+
+# Server preference when the client accepts several with the same q-value.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Parquet is compressed internally; Arrow IPC streams and JSON are not.
+_COMPRESSIBLE = ("application/json", "application/vnd.apache.arrow.stream", "text/")
+
+# Encoding negotiated for the request being served (None = identity); set by CompressionMiddleware.
+accepted_encoding: contextvars.ContextVar[str | None] = contextvars.ContextVar("accepted_encoding", default=None)
+
+_lock = threading.Lock()
+_stats: dict[tuple[str, str], dict] = {}
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Best of ENCODINGS allowed by an Accept-Encoding header (q-values honoured), or None."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressible(body: bytes, media_type: str | None) -> bool:
+    return len(body) >= COMPRESS_MIN_BYTES and media_type is not None and media_type.startswith(_COMPRESSIBLE)
+
+
+def _entry(endpoint: str, encoding: str) -> dict:
+    """Stats slot for (endpoint, encoding). Caller holds _lock."""
+    return _stats.setdefault((endpoint, encoding), {"compressed": 0, "served": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0})
+
+
+def compress(body: bytes, encoding: str, endpoint: str) -> bytes:
+    """body compressed with `encoding` ('br' or 'gzip'); ratio and CPU time recorded under endpoint."""
+    started = time.thread_time()
+    if encoding == "br":
+        out = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        out = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    cpu = time.thread_time() - started
+    labels = {"endpoint": endpoint, "encoding": encoding}
+    registry.inc("api_compression_input_bytes_total", "Bytes fed to the response compressor.", labels, len(body))
+    registry.inc("api_compression_output_bytes_total", "Compressed response bytes produced.", labels, len(out))
+    registry.inc("api_compression_cpu_seconds_total", "CPU time spent compressing responses.", labels, cpu)
+    with _lock:
+        entry = _entry(endpoint, encoding)
+        entry["compressed"] += 1
+        entry["bytes_in"] += len(body)
+        entry["bytes_out"] += len(out)
+        entry["cpu_ms"] += cpu * 1000
+    return out
+
+
+def record_served(endpoint: str, encoding: str) -> None:
+    """Count a compressed response sent (cache hits reuse stored bytes: served > compressed)."""
+    with _lock:
+        _entry(endpoint, encoding)["served"] += 1
+
+
+def compression_stats() -> dict:
+    """{endpoint: {encoding: compressed / served counts, ratio, CPU ms}} since process start."""
+    out: dict = {}
+    with _lock:
+        for (endpoint, encoding), e in sorted(_stats.items()):
+            out.setdefault(endpoint, {})[encoding] = {
+                "compressed": e["compressed"],
+                "served": e["served"],
+                "bytes_in": e["bytes_in"],
+                "bytes_out": e["bytes_out"],
+                "ratio": round(e["bytes_in"] / e["bytes_out"], 2) if e["bytes_out"] else None,
+                "cpu_ms_total": round(e["cpu_ms"], 3),
+                "cpu_ms_avg": round(e["cpu_ms"] / e["compressed"], 3) if e["compressed"] else None,
+            }
+    return {"encodings": list(ENCODINGS), "min_bytes": COMPRESS_MIN_BYTES, "endpoints": out}
+
+
+def _add_vary(response: Response) -> None:
+    vary = response.headers.get("vary")
+    if not vary:
+        response.headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        response.headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """
+    Negotiates the encoding for /api requests (accepted_encoding) and compresses bodies the
+    handler didn't: cached endpoints return their stored compressed variant already encoded.
+    """
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if not path.startswith("/api/"):
+            return await call_next(request)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        token = accepted_encoding.set(encoding)
+        try:
+            response = await call_next(request)
+        finally:
+            accepted_encoding.reset(token)
+        if response.status_code not in (200, 304):
+            return response
+        _add_vary(response)
+        if encoding is None or response.status_code != 200 or "content-encoding" in response.headers:
+            return response
+        media_type = response.headers.get("content-type", "").split(";")[0]
+        if not media_type.startswith(_COMPRESSIBLE):
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        if len(body) < COMPRESS_MIN_BYTES:
+            return Response(content=body, status_code=response.status_code, headers=headers)
+        endpoint = path.removeprefix("/api/")
+        headers["content-encoding"] = encoding
+        record_served(endpoint, encoding)
+        return Response(content=compress(body, encoding, endpoint), status_code=response.status_code, headers=headers)
@@ -0,0 +1,71 @@
+"""
+Supplier concentration metrics from per-supplier award totals: Herfindahl-Hirschman index,
+Gini coefficient, Lorenz curve and top-N shares. Callers get the totals from one grouped query;
+everything here is a single sort plus running sums over those totals.
+"""
+from itertools import accumulate
+
+DEFAULT_TOP_N = (1, 5, 10, 20)
+DEFAULT_LORENZ_POINTS = 101
+
+
+def parse_top_n(values: list[str] | None) -> list[int]:
+    """Repeated and/or comma-separated top= -> sorted positive ints (default DEFAULT_TOP_N)."""
+    if not values:
+        return list(DEFAULT_TOP_N)
+    out = set()
+    for item in values:
+        for part in item.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if not part.isdigit() or int(part) < 1:
+                raise ValueError(f"top must be positive integers, got {part!r}")
+            out.add(int(part))
+    return sorted(out) or list(DEFAULT_TOP_N)
+
+
+def metrics(totals: list[float], top_n=DEFAULT_TOP_N, lorenz_points: int = DEFAULT_LORENZ_POINTS) -> dict:
+    """
+    Concentration of `totals` (one amount per supplier).
+    hhi: sum of squared % shares (0-10,000; > 2,500 is "highly concentrated" in antitrust usage).
+    gini: 0 = equal amounts, -> 1 = one supplier takes everything.
+    lorenz: [supplier share, amount share] points, suppliers ascending by amount, sampled to lorenz_points.
+    top_shares: % of the amount going to the N largest suppliers.
+    """
+    values = sorted(max(float(v or 0), 0.0) for v in totals)
+    n = len(values)
+    total = sum(values)
+    if n == 0 or total <= 0:
+        return {
+            "suppliers": n,
+            "total_q": 0.0,
+            "hhi": 0.0,
+            "gini": 0.0,
+            "top_shares": [{"n": k, "pct": 0.0} for k in top_n],
+            "lorenz": [],
+        }
+
+    cumulative = [0.0, *accumulate(values)]
+    hhi = sum((v / total * 100) ** 2 for v in values)
+    # Ascending order: G = sum((2i - n - 1) * x_i) / (n * sum(x)), i = 1..n.
+    gini = sum((2 * i - n - 1) * v for i, v in enumerate(values, start=1)) / (n * total)
+
+    if n + 1 <= lorenz_points:
+        ranks = range(n + 1)
+    else:
+        ranks = sorted({round(j * n / (lorenz_points - 1)) for j in range(lorenz_points)})
+    lorenz = [[round(k / n, 4), round(cumulative[k] / total, 4)] for k in ranks]
+
+    top_shares = [
+        {"n": k, "pct": round((total - cumulative[max(n - k, 0)]) / total * 100, 1)}
+        for k in top_n
+    ]
+    return {
+        "suppliers": n,
+        "total_q": round(total, 2),
+        "hhi": round(hhi, 1),
+        "gini": round(gini, 4),
+        "top_shares": top_shares,
+        "lorenz": lorenz,
+    }
@@ -0,0 +1,42 @@
+"""
+dataset_meta (months, years, modalities, buyers, row counts and manifest summary, written by
+scripts/derived_tables.py at ingest) held in memory per data version. Serves /api/filters,
+/api/diagnostic, /api/data-reference and the default years of the modality endpoints without
+DISTINCT scans or re-reading ingest_manifest.json per request.
+"""
+import logging
+import threading
+
+from backend.db import buyer_key, data_version, get_connection
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_meta: tuple[str, dict[int | None, dict]] = ("", {})  # (data version, buyer_key -> row; None = whole DB)
+
+
+def _load() -> dict[int | None, dict]:
+    with get_connection() as con:
+        cur = con.execute("SELECT * FROM dataset_meta")
+        cols = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+    return {r[0]: dict(zip(cols, r)) for r in rows}
+
+
+def _rows() -> dict[int | None, dict]:
+    global _meta
+    version = data_version()
+    current = _meta
+    if current[0] == version:
+        return current[1]
+    with _lock:
+        if _meta[0] != version:
+            _meta = (version, _load())
+            buyers = sum(1 for key in _meta[1] if key is not None)
+            logger.info("dataset_meta loaded: %d buyers (data version %s)", buyers, version)
+        return _meta[1]
+
+
+def get_meta(buyer: str | None = None) -> dict | None:
+    """Row for a resolved buyer name (None = whole DB), or None when the DB has no data for it."""
+    return _rows().get(None if buyer is None else buyer_key(buyer))
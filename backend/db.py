@@ -1,8 +1,30 @@
 """
 DuckDB connection and filter helpers. Uses project config from parent.
+
+The API shares one long-lived read-only handle on the served DB per process
+(see ConnectionManager). Each thread gets its own cursor on that handle. The served
+DB is the current published generation (data/generations/<name>/lake.duckdb, see
+scripts/publish_generation.py) or else data/lake.duckdb. When it changes (new
+generation published, or `mv lake_next.duckdb lake.duckdb`) a new handle is opened
+and checked on a background thread, then used for new requests; the request path only
+stats files. Each generation counts its leases, and the old one is
+closed once its in-flight requests finish. A new DB that fails the check is not served.
+
+Under `python -m backend.serve --workers N` the worker processes don't look at the DB files
+themselves: they follow the serving signal (API_SERVING_SIGNAL, a small JSON file written by the
+supervisor, see backend/serve.py) naming the DB and a switch time, open that generation as soon
+as it appears and all start serving it at the switch time.
 """
+import hashlib
+import json
+import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
@@ -11,9 +33,435 @@ if ROOT not in sys.path:
 import config
 import duckdb
 
+from backend.metrics import observe_query
+
+logger = logging.getLogger(__name__)
+
+# How often (seconds) to stat the DB file for a swap. 0 = check on every request.
+SWAP_CHECK_SECONDS = float(os.getenv("DB_SWAP_CHECK_SECONDS", "1.0"))
+# Serving signal file to follow instead of watching the DB (set by backend/serve.py for its workers).
+SERVING_SIGNAL = os.getenv("API_SERVING_SIGNAL", "")
+# DuckDB worker threads per generation, shared by the queries running on it. 0 = DuckDB default (one per core).
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+
+# Tables the API reads; a new DB missing any of them is rejected instead of served.
+REQUIRED_TABLES = (
+    "tenders_clean_all",
+    "awards_clean_all",
+    "awards_by_month_supplier",
+    "awards_by_month_band",
+    "awards_by_month_modality_supplier",
+    "tenders_by_month_modality",
+    "awards_by_supplier",
+    "low_competition_tenders",
+    "search_docs",
+    "search_stopwords",
+    "buyers",
+    "dataset_meta",
+)
+
+# buyer= value that lifts the buyer filter (every buyer in the lake).
+ALL_BUYERS = "all"
+
+
+def file_identity(path: str) -> tuple[int, int, int] | None:
+    """(inode, mtime_ns, size) of path, or None if missing. Changes when the file is swapped."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def read_signal(path: str) -> dict | None:
+    """Serving signal {"seq", "path", "identity", "switch_at"}, or None if missing / unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            signal = json.load(f)
+        return {
+            "seq": int(signal["seq"]),
+            "path": str(signal["path"]),
+            "identity": tuple(signal["identity"]),
+            "switch_at": float(signal.get("switch_at") or 0),
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def missing_tables(con) -> list[str]:
+    """REQUIRED_TABLES not present in the connection's current database."""
+    present = {r[0] for r in con.execute(
+        "SELECT table_name FROM duckdb_tables() WHERE database_name = current_database()"
+    ).fetchall()}
+    return [t for t in REQUIRED_TABLES if t not in present]
+
+
+def validate_db(path: str) -> list[str]:
+    """
+    Problems that should stop path from being served (empty list = OK): it must open read-only, have
+    every REQUIRED_TABLES and some tenders. The one check before a DB is published
+    (scripts/publish_generation.py) or signalled to workers (backend/serve.py).
+    """
+    # :memory: + ATTACH like the API, so nothing is cached for this path in-process.
+    con = duckdb.connect(":memory:")
+    try:
+        con.execute(f"ATTACH '{path.replace(chr(39), chr(39) * 2)}' AS lake (READ_ONLY)")
+        con.execute("USE lake")
+        missing = missing_tables(con)
+        if missing:
+            return [f"missing tables: {', '.join(missing)}"]
+        if con.execute("SELECT COUNT(*) FROM tenders_clean_all").fetchone()[0] == 0:
+            return ["tenders_clean_all is empty"]
+        return []
+    except Exception as e:
+        return [f"cannot open: {e}"]
+    finally:
+        con.close()
+
+
+class _Generation:
+    """One opened copy of the DB file plus the cursors handed out on it."""
+
+    def __init__(self, gen_id: int, path: str, identity: tuple[int, int, int] | None):
+        self.id = gen_id
+        self.path = path
+        self.identity = identity
+        self.opened_at = time.time()
+        # A fresh in-memory instance per generation: duckdb.connect(path) would reuse the
+        # process-wide instance cached for that path and keep serving the replaced file.
+        self.con = duckdb.connect(":memory:")
+        try:
+            self.con.execute(f"ATTACH '{path.replace(chr(39), chr(39) * 2)}' AS lake (READ_ONLY)")
+            self.con.execute("USE lake")
+            if DUCKDB_THREADS > 0:
+                self.con.execute(f"SET threads = {DUCKDB_THREADS}")
+            missing = missing_tables(self.con)
+            if missing:
+                raise RuntimeError(f"{path} is missing tables: {', '.join(missing)}")
+        except Exception:
+            self.con.close()
+            raise
+        self.cursors: list = []
+        self.active = 0
+        self.retired = False
+        self.closed = False
+
+    def new_cursor(self):
+        cur = self.con.cursor()
+        cur.execute("USE lake")
+        self.cursors.append(cur)
+        return cur
+
+    def close(self) -> None:
+        for cur in self.cursors:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        self.cursors.clear()
+        self.con.close()
+        self.closed = True
+
+
+class ConnectionManager:
+    """Process-wide, swap-aware pool of read-only cursors over the served DuckDB file."""
+
+    def __init__(
+        self,
+        resolve_path=config.served_db_path,
+        check_interval: float = SWAP_CHECK_SECONDS,
+        signal_path: str = SERVING_SIGNAL,
+    ):
+        self.resolve_path = resolve_path
+        self.check_interval = check_interval
+        self.signal_path = signal_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._current: _Generation | None = None
+        self._pending: tuple[_Generation, float] | None = None  # opened, served from switch_at (epoch seconds)
+        self._signal: tuple[tuple | None, dict | None] = (None, None)  # (signal file identity, parsed signal)
+        self._retired: list[_Generation] = []
+        self._next_id = 1
+        self._last_check = 0.0
+        self._rejected: tuple[str, tuple] | None = None  # (path, identity) that failed to open
+        self._opening: tuple[str, tuple] | None = None  # (path, identity) being opened on _opener
+        self._closed = False
+        # Opens and checks new DBs off the request path (the event loop calls data_version()).
+        self._opener = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-open")
+        self._stats = {
+            "leases_total": 0,
+            "cursors_created": 0,
+            "reopens": 0,
+            "rejected": 0,
+            "generations_closed": 0,
+        }
+
+    def _open(self, path: str, identity) -> _Generation:
+        gen = _Generation(self._next_id, path, identity)
+        self._next_id += 1
+        return gen
+
+    def _target(self) -> tuple[str, tuple | None, float]:
+        """(path, file identity, switch_at) to serve: from the serving signal if following one, else the files."""
+        if self.signal_path:
+            signal_identity = file_identity(self.signal_path)
+            if signal_identity != self._signal[0]:
+                self._signal = (signal_identity, read_signal(self.signal_path))
+            signal = self._signal[1]
+            if signal is not None:
+                identity = file_identity(signal["path"])
+                # Replaced since it was signalled: wait for the supervisor's next signal.
+                return signal["path"], identity if identity == signal["identity"] else None, signal["switch_at"]
+        path = self.resolve_path()
+        return path, file_identity(path), 0.0
+
+    def _promote(self, new_gen: _Generation) -> _Generation:
+        """Serve new_gen from now on; retire the current one. Caller holds _lock."""
+        gen = self._current
+        if gen is not None:
+            logger.info("DB changed (%s -> %s); serving generation %s", gen.path, new_gen.path, new_gen.id)
+            self._stats["reopens"] += 1
+            gen.retired = True
+            self._retired.append(gen)
+            self._reap()
+        self._current = new_gen
+        return new_gen
+
+    def _current_generation(self) -> _Generation:
+        """
+        Return the generation new leases should use. Caller holds _lock. Only stats files here: a
+        changed DB is opened and checked on _opener and served once it is ready (see _open_next).
+        """
+        gen = self._current
+        if self._pending is not None and time.time() >= self._pending[1]:
+            pending, self._pending = self._pending[0], None
+            gen = self._promote(pending)
+        now = time.monotonic()
+        if gen is not None and now - self._last_check < self.check_interval:
+            return gen
+        self._last_check = now
+        path, identity, switch_at = self._target()
+        if gen is None:
+            # Nothing to serve yet: the first open has to happen on the request path.
+            self._current = self._open(path, identity)
+            return self._current
+        known = [(gen.path, gen.identity), self._rejected, self._opening]
+        if self._pending is not None:
+            known.append((self._pending[0].path, self._pending[0].identity))
+        if identity is None or (path, identity) in known:
+            # Missing file, one that failed to open, or already opened / opening: keep serving what we have.
+            return gen
+        self._opening = (path, identity)
+        self._opener.submit(self._open_next, path, identity, switch_at)
+        return gen
+
+    def _open_next(self, path: str, identity, switch_at: float) -> None:
+        """On _opener: open and check a new DB, then promote it (or hold it until switch_at)."""
+        with self._lock:
+            gen_id = self._next_id
+            self._next_id += 1
+        try:
+            new_gen = _Generation(gen_id, path, identity)
+        except Exception:
+            with self._lock:
+                self._opening = None
+                self._rejected = (path, identity)
+                self._stats["rejected"] += 1
+            logger.exception("New DB %s failed to open; still serving the current generation", path)
+            return
+        with self._lock:
+            self._opening = None
+            if self._closed:
+                new_gen.close()
+                return
+            if self._pending is not None:
+                # Superseded before its switch time.
+                self._pending[0].close()
+                self._pending = None
+            if time.time() < switch_at:
+                logger.info("Opened generation %s (%s); serving it in %.1fs", new_gen.id, path, switch_at - time.time())
+                self._pending = (new_gen, switch_at)
+            else:
+                self._promote(new_gen)
+
+    def _reap(self) -> None:
+        """Close retired generations with no running requests. Caller holds _lock."""
+        keep = []
+        for gen in self._retired:
+            if gen.active == 0:
+                gen.close()
+                self._stats["generations_closed"] += 1
+                logger.info("Closed drained DB generation %s", gen.id)
+            else:
+                keep.append(gen)
+        self._retired = keep
+
+    @contextmanager
+    def cursor(self):
+        """Lease this thread's cursor on the current generation for the duration of a request."""
+        with self._lock:
+            gen = self._current_generation()
+            gen.active += 1
+            self._stats["leases_total"] += 1
+            cur = None
+            cached = getattr(self._local, "entry", None)
+            if cached is not None and cached[0] is gen:
+                cur = cached[1]
+            if cur is None:
+                cur = gen.new_cursor()
+                self._local.entry = (gen, cur)
+                self._stats["cursors_created"] += 1
+        try:
+            yield cur
+        finally:
+            with self._lock:
+                gen.active -= 1
+                if gen.retired and gen.active == 0:
+                    self._reap()
+
+    def identity(self) -> tuple[int, int, int] | None:
+        """File identity of the generation new requests are served from."""
+        with self._lock:
+            return self._current_generation().identity
+
+    def invalidate(self) -> None:
+        """Force a file check on the next lease (e.g. right after a swap)."""
+        with self._lock:
+            self._last_check = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            gen = self._current
+            return {
+                "db_path": gen.path if gen else self.resolve_path(),
+                "duckdb_threads": DUCKDB_THREADS or None,
+                "generation": gen.id if gen else None,
+                "generation_opened_at": gen.opened_at if gen else None,
+                "file_identity": list(gen.identity) if gen and gen.identity else None,
+                "pending_generation": (
+                    {"generation": self._pending[0].id, "db_path": self._pending[0].path, "switch_at": self._pending[1]}
+                    if self._pending else None
+                ),
+                "serving_signal": (
+                    {"path": self.signal_path, "seq": self._signal[1]["seq"] if self._signal[1] else None}
+                    if self.signal_path else None
+                ),
+                "active_leases": gen.active if gen else 0,
+                "open_cursors": len(gen.cursors) if gen else 0,
+                "retired_generations": [
+                    {"generation": g.id, "db_path": g.path, "active_leases": g.active} for g in self._retired
+                ],
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for gen in [self._current, *self._retired, self._pending[0] if self._pending else None]:
+                if gen is not None and not gen.closed:
+                    gen.close()
+            self._current = None
+            self._pending = None
+            self._retired = []
+        self._opener.shutdown(wait=False, cancel_futures=True)
+
 
+_manager: ConnectionManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> ConnectionManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConnectionManager()
+    return _manager
+
+
+class TimedCursor:
+    """Cursor proxy that reports each execute() to backend.metrics (latency, slow-query log)."""
+
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, query: str, parameters=None):
+        started = time.perf_counter()
+        try:
+            if parameters is None:
+                self._cur.execute(query)
+            else:
+                self._cur.execute(query, parameters)
+        finally:
+            observe_query(query, parameters, time.perf_counter() - started)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+@contextmanager
 def get_connection():
-    return duckdb.connect(config.DB_PATH, read_only=True)
+    """Context manager yielding a read-only cursor: `with get_connection() as con: ...`."""
+    with get_manager().cursor() as cur:
+        yield TimedCursor(cur)
+
+
+def pool_stats() -> dict:
+    return get_manager().stats()
+
+
+_manifest_state: tuple = (None, None)  # (manifest file identity, updated_at)
+
+
+def _manifest_updated_at() -> str | None:
+    """updated_at from ingest_manifest.json, re-read only when the file changes."""
+    global _manifest_state
+    identity = file_identity(config.MANIFEST_PATH)
+    if identity is None:
+        return None
+    if _manifest_state[0] != identity:
+        try:
+            with open(config.MANIFEST_PATH, "r", encoding="utf-8") as f:
+                updated_at = json.load(f).get("updated_at")
+        except (OSError, ValueError):
+            updated_at = None
+        _manifest_state = (identity, updated_at)
+    return _manifest_state[1]
+
+
+def db_exists() -> bool:
+    """Whether there is a DB to serve (published generation or data/lake.duckdb)."""
+    return os.path.isfile(config.served_db_path())
+
+
+def data_version() -> str:
+    """Token that changes whenever the served data can change: DB file identity + manifest updated_at."""
+    if not db_exists():
+        identity = None
+    else:
+        identity = get_manager().identity()
+    ident = "-".join(str(x) for x in identity) if identity else "nodb"
+    return f"{ident}:{_manifest_updated_at() or ''}"
+
+
+def last_modified() -> float | None:
+    """mtime (epoch seconds) of the DB generation being served, for HTTP Last-Modified."""
+    if not db_exists():
+        return None
+    identity = get_manager().identity()
+    return identity[1] / 1e9 if identity else None
+
+
+def _month_start(value: str) -> date | None:
+    """'YYYY-MM' -> first day of that month, or None if it doesn't parse."""
+    try:
+        y, m = value.split("-")[:2]
+        return date(int(y), int(m), 1)
+    except (ValueError, TypeError):
+        return None
 
 
 def month_filter(
@@ -21,19 +469,71 @@ def month_filter(
     selected_years: list[str] | None,
     from_month: str | None,
     to_month: str | None,
+    buyer: str | None = None,
 ) -> tuple[str, list]:
-    """Build WHERE fragment and params for month/year filter. Use table_alias 't' or 'a' when query has JOINs to avoid ambiguous 'month'."""
+    """
+    Build WHERE fragment and params for buyer + month/year filter. Use table_alias 't' or 'a' when query has JOINs to avoid ambiguous 'month'.
+    Predicates are plain ranges on the typed year / month_date columns so DuckDB can skip row groups by min/max;
+    buyer (a resolved name, see resolve_buyer; None = every buyer) is an equality on buyer_key, the leading sort key.
+    """
     prefix = f"{table_alias}." if table_alias else ""
     parts, params = [], []
+    if buyer is not None:
+        parts.append(f"{prefix}buyer_key = ?")
+        params.append(buyer_key(buyer))
     if selected_years:
-        placeholders = ",".join(["?" for _ in selected_years])
-        parts.append(f"SUBSTR({prefix}month, 1, 4) IN ({placeholders})")
-        params.extend(selected_years)
-    if from_month:
-        parts.append(f"{prefix}month >= ?")
-        params.append(from_month)
-    if to_month:
-        parts.append(f"{prefix}month <= ?")
-        params.append(to_month)
+        years = sorted({int(y) for y in selected_years if str(y).strip().isdigit()})
+        if not years:
+            parts.append("FALSE")
+        else:
+            parts.append(f"{prefix}year BETWEEN ? AND ?")
+            params.extend([years[0], years[-1]])
+            if len(years) != years[-1] - years[0] + 1:
+                # Gaps (e.g. 2024 and 2026): keep the range for pruning, then the exact list.
+                placeholders = ",".join(["?" for _ in years])
+                parts.append(f"{prefix}year IN ({placeholders})")
+                params.extend(years)
+    for value, op in ((from_month, ">="), (to_month, "<=")):
+        if not value:
+            continue
+        start = _month_start(value)
+        if start is not None:
+            parts.append(f"{prefix}month_date {op} ?")
+            params.append(start)
+        else:
+            parts.append(f"{prefix}month {op} ?")
+            params.append(value)
     where = " AND ".join(parts) if parts else "1=1"
     return where, params
+
+
+def _md5_key(name: str | None) -> int:
+    """Same as DuckDB md5_number_upper(COALESCE(name, '')): first 8 bytes of the md5, little-endian."""
+    return int.from_bytes(hashlib.md5((name or "").encode("utf-8")).digest()[:8], "little")
+
+
+def supplier_key(name: str | None) -> int:
+    """awards_by_supplier.supplier_key for a supplier name."""
+    return _md5_key(name)
+
+
+def buyer_key(name: str | None) -> int:
+    """buyer_key column value for a buyer name (every table carries it)."""
+    return _md5_key(name)
+
+
+def resolve_buyer(buyer: str | None) -> str | None:
+    """buyer= query value -> buyer name to filter on: omitted = config.DEFAULT_BUYER, 'all' = None (no filter)."""
+    buyer = (buyer or "").strip()
+    if not buyer:
+        return config.DEFAULT_BUYER
+    if buyer.lower() == ALL_BUYERS:
+        return None
+    return buyer
+
+
+def supplier_filter(name: str | None) -> tuple[str, list]:
+    """WHERE fragment and params selecting one supplier (None = awards without a supplier name) in awards_by_supplier."""
+    if name is None:
+        return "supplier_key = ? AND supplier_name IS NULL", [supplier_key(None)]
+    return "supplier_key = ? AND supplier_name = ?", [supplier_key(name), name]
@@ -0,0 +1,101 @@
+"""
+Bounded executor for the API's DuckDB work. Cached handlers run their query (and JSON encoding)
+on a fixed pool of API_QUERY_WORKERS threads instead of Starlette's open-ended threadpool, so a
+burst of requests queues up rather than oversubscribing the CPU. At most API_QUERY_QUEUE requests
+wait for a worker; beyond that the API answers 503 with Retry-After instead of letting latency grow.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+QUERY_WORKERS = int(os.getenv("API_QUERY_WORKERS", "4"))
+QUERY_QUEUE = int(os.getenv("API_QUERY_QUEUE", "32"))
+RETRY_AFTER_SECONDS = int(os.getenv("API_RETRY_AFTER_SECONDS", "2"))
+
+
+class QueryExecutor:
+    """Thread pool + admission counter: running + waiting is capped at workers + queue."""
+
+    def __init__(self, workers: int = QUERY_WORKERS, queue: int = QUERY_QUEUE):
+        self.workers = max(1, workers)
+        self.queue = max(0, queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="duckdb-query")
+        self._lock = threading.Lock()
+        self._pending = 0  # admitted, not finished (running or waiting)
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "max_pending": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+        }
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.workers + self.queue:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server busy, retry shortly",
+                    headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+                )
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+
+    def _call(self, fn, enqueued: float):
+        wait_ms = (time.perf_counter() - enqueued) * 1000
+        with self._lock:
+            self._running += 1
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _done(self, future) -> None:
+        # Also runs for futures cancelled before a worker picked them up (client went away).
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                return
+            self._stats["failed" if future.exception() is not None else "completed"] += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on a worker (in the caller's contextvars); 503 if the queue is full."""
+        self._admit()
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        future = self._pool.submit(self._call, call, time.perf_counter())
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._stats["completed"] + self._stats["failed"] + self._running
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue,
+                "running": self._running,
+                "waiting": self._pending - self._running,
+                **self._stats,
+                "wait_ms_avg": round(self._stats["wait_ms_total"] / started, 3) if started else 0.0,
+                "wait_ms_total": round(self._stats["wait_ms_total"], 3),
+                "wait_ms_max": round(self._stats["wait_ms_max"], 3),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+query_executor = QueryExecutor()
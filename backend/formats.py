@@ -0,0 +1,224 @@
+"""
+Response formats for the API. Tabular endpoints speak JSON rows (default), columnar JSON
+(?format=columns: {"columns": [...], "data": {col: [...]}}), Arrow IPC stream or Parquet,
+chosen by ?format= or the Accept header. Arrow/Parquet bodies are built from DuckDB's Arrow
+result directly; pyarrow is required only for those formats.
+
+JSON is encoded with orjson when installed (stdlib json otherwise), and the time spent encoding
+is recorded per endpoint and format (see serialization_stats).
+"""
+import datetime
+import decimal
+import functools
+import io
+import json
+import threading
+import time
+
+from fastapi import Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columns": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Accept header media types -> format (first match wins, in this order).
+_ACCEPT_TYPES = [
+    ("application/vnd.apache.arrow.stream", "arrow"),
+    ("application/vnd.apache.arrow.file", "arrow"),
+    ("application/vnd.apache.parquet", "parquet"),
+    ("application/x-parquet", "parquet"),
+]
+
+
+def negotiate_format(format_param: str | None, accept: str | None) -> str:
+    """?format= wins; else Arrow/Parquet if the Accept header names them; else JSON."""
+    if format_param:
+        fmt = format_param.strip().lower()
+        if fmt not in MEDIA_TYPES:
+            raise HTTPException(status_code=406, detail=f"Unknown format {format_param!r}. Valid: {', '.join(MEDIA_TYPES)}")
+        return fmt
+    if accept:
+        accepted = {part.split(";")[0].strip().lower() for part in accept.split(",")}
+        for media_type, fmt in _ACCEPT_TYPES:
+            if media_type in accepted:
+                return fmt
+    return "json"
+
+
+async def response_format(
+    format_param: str | None = Query(None, alias="format"),
+    accept: str | None = Header(None),
+) -> str:
+    """FastAPI dependency: negotiated format name for the request."""
+    return negotiate_format(format_param, accept)
+
+
+# Accept values under which a JSON body is acceptable.
+_JSON_ACCEPT = {"application/json", "application/*", "*/*"}
+
+
+def _takes_format(route) -> bool:
+    """Whether the route's handler depends on response_format (i.e. can produce other formats)."""
+    dependant = getattr(route, "dependant", None)
+    return dependant is not None and any(d.call is response_format for d in dependant.dependencies)
+
+
+@functools.cache
+def tabular_paths(app) -> frozenset[str]:
+    """Paths of the app's routes that negotiate a format; every other route only returns JSON."""
+    return frozenset(route.path for route in app.routes if _takes_format(route))
+
+
+def json_only_error(format_param: str | None, accept: str | None) -> str | None:
+    """Why a JSON-only endpoint can't answer this ?format= / Accept (None = JSON is fine)."""
+    if format_param is not None:
+        return None if format_param.strip().lower() == "json" else "only returns JSON (format=json)"
+    if negotiate_format(None, accept) == "json":
+        return None
+    accepted = {part.split(";")[0].strip().lower() for part in accept.split(",")}
+    return None if accepted & _JSON_ACCEPT else "only returns application/json"
+
+
+async def reject_unsupported_format(request: Request) -> None:
+    """
+    App-wide dependency: endpoints that only produce JSON answer 406 to any other ?format= and to
+    an Accept header asking for Arrow/Parquet without allowing JSON, instead of sending JSON anyway.
+    """
+    if _takes_format(request.scope.get("route")):
+        return
+    error = json_only_error(request.query_params.get("format"), request.headers.get("accept"))
+    if error:
+        raise HTTPException(status_code=406, detail=f"{request.url.path} {error}")
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """Compact UTF-8 JSON (same output shape as Starlette's JSONResponse)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_json_default)
+    return json.dumps(
+        payload, default=_json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class: JSONResponse rendered with dumps()."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+_stats_lock = threading.Lock()
+_serialization: dict[tuple[str, str], dict] = {}
+
+
+def _record(endpoint: str, fmt: str, seconds: float, size: int) -> None:
+    with _stats_lock:
+        entry = _serialization.setdefault((endpoint, fmt), {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0})
+        ms = seconds * 1000
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["bytes"] += size
+
+
+def serialization_stats() -> dict:
+    """{endpoint: {format: count, avg/max/total ms, avg bytes}} since process start."""
+    out: dict = {}
+    with _stats_lock:
+        for (endpoint, fmt), e in sorted(_serialization.items()):
+            out.setdefault(endpoint, {})[fmt] = {
+                "count": e["count"],
+                "avg_ms": round(e["total_ms"] / e["count"], 3),
+                "max_ms": round(e["max_ms"], 3),
+                "total_ms": round(e["total_ms"], 3),
+                "avg_bytes": e["bytes"] // e["count"],
+            }
+    return {"json_encoder": "orjson" if orjson is not None else "json", "endpoints": out}
+
+
+def payload_rows(payload) -> int | None:
+    """Row count of a JSON payload: list length, a page's items/tenders, or columnar data length."""
+    if isinstance(payload, list):
+        return len(payload)
+    if not isinstance(payload, dict):
+        return None
+    for key in ("items", "tenders"):
+        if isinstance(payload.get(key), list):
+            return len(payload[key])
+    data = payload.get("data")
+    if isinstance(data, dict) and "columns" in payload:
+        return len(next(iter(data.values()), ()))
+    return None
+
+
+def json_response(payload, endpoint: str, fmt: str = "json", headers: dict | None = None) -> Response:
+    """Encode payload once, timed; returned as a ready Response so FastAPI skips jsonable_encoder."""
+    started = time.perf_counter()
+    body = dumps(payload)
+    _record(endpoint, fmt, time.perf_counter() - started, len(body))
+    response = Response(content=body, media_type=MEDIA_TYPES["json"], headers=headers)
+    response.rows = payload_rows(payload)
+    return response
+
+
+def columnar(cur, rows: list | None = None) -> dict:
+    """{"columns", "data"} from a DuckDB cursor: one list per result column, no per-row dicts."""
+    columns = [d[0] for d in cur.description]
+    if rows is None:
+        rows = cur.fetchall()
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return {"columns": columns, "data": {c: list(v) for c, v in zip(columns, values)}}
+
+
+def fetch_arrow(cur):
+    """Arrow table of the cursor's pending result (API name differs across DuckDB versions)."""
+    to_table = getattr(cur, "to_arrow_table", None) or cur.fetch_arrow_table
+    try:
+        return to_table()
+    except ImportError as e:
+        raise HTTPException(status_code=406, detail="Arrow/Parquet output needs pyarrow installed on the server") from e
+
+
+def table_response(table, fmt: str, name: str, headers: dict | None = None) -> Response:
+    """Serialize an Arrow table as an Arrow IPC stream or a Parquet file."""
+    import pyarrow as pa
+
+    started = time.perf_counter()
+    buf = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(buf, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, buf, compression="zstd")
+        headers = {**(headers or {}), "Content-Disposition": f'attachment; filename="{name}.parquet"'}
+    body = buf.getvalue()
+    _record(name, fmt, time.perf_counter() - started, len(body))
+    response = Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
+    response.rows = table.num_rows
+    return response
+
+
+def tabular_response(cur, fmt: str, name: str) -> Response:
+    """Non-row response for a pending DuckDB result: columnar JSON, Arrow or Parquet."""
+    if fmt == "columns":
+        return json_response(columnar(cur), name, fmt)
+    return table_response(fetch_arrow(cur), fmt, name)
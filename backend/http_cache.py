@@ -0,0 +1,106 @@
+"""
+HTTP conditional caching for the API. Every cacheable GET gets an ETag derived from the data
+version (lake.duckdb generation + manifest) and the normalized query, plus Cache-Control and
+Last-Modified. A matching If-None-Match / If-Modified-Since is answered with 304 before the
+handler runs, so revalidations from browsers, the CDN or a proxy never reach DuckDB.
+"""
+import hashlib
+import os
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from backend.db import data_version, last_modified
+from backend.formats import json_only_error, negotiate_format, tabular_paths
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "300"))
+
+# Operational endpoints: always fresh, never 304.
+UNCACHED_PATHS = {
+    "/api/health",
+    "/api/ready",
+    "/api/diagnostic",
+    "/api/pool-stats",
+    "/api/cache-stats",
+    "/api/serialization-stats",
+    "/api/compression-stats",
+    "/api/metrics",
+}
+
+_lock = threading.Lock()
+_stats = {"etag_responses": 0, "not_modified": 0}
+
+
+def compute_etag(version: str, path: str, query_items: list[tuple[str, str]], fmt: str = "json") -> str:
+    """Weak ETag over data version + path + query params (sorted, so `years` order doesn't matter) + format."""
+    norm_query = "&".join(f"{k}={v}" for k, v in sorted(query_items))
+    digest = hashlib.sha1(f"{version}|{path}|{norm_query}|{fmt}".encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have 1s resolution.
+    return int(modified) <= since
+
+
+class ConditionalCacheMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if request.method not in ("GET", "HEAD") or not path.startswith("/api/") or path in UNCACHED_PATHS:
+            return await call_next(request)
+
+        format_param, accept = request.query_params.get("format"), request.headers.get("accept")
+        if path in tabular_paths(request.app):
+            try:
+                fmt = negotiate_format(format_param, accept)
+            except HTTPException:
+                # Unknown ?format=: let the handler answer 406.
+                return await call_next(request)
+        elif json_only_error(format_param, accept):
+            # A format this JSON-only endpoint doesn't produce: the handler answers 406.
+            return await call_next(request)
+        else:
+            fmt = "json"
+        etag = compute_etag(data_version(), path, request.query_params.multi_items(), fmt)
+        modified = last_modified()
+        # Same URL can be JSON, Arrow or Parquet depending on Accept.
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}", "Vary": "Accept"}
+        if modified is not None:
+            headers["Last-Modified"] = formatdate(modified, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+        if (if_none_match and _etag_matches(if_none_match, etag)) or (
+            not if_none_match and if_modified_since and modified is not None
+            and _not_modified_since(if_modified_since, modified)
+        ):
+            with _lock:
+                _stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers.update(headers)
+            with _lock:
+                _stats["etag_responses"] += 1
+        return response
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, max_age=HTTP_CACHE_MAX_AGE)
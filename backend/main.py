@@ -2,26 +2,66 @@
 FastAPI backend for transparency portal. Serves DuckDB data for Next.js frontend.
 Run from project root: uvicorn backend.main:app --reload
 """
-import json
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from typing import Any
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from fastapi import FastAPI, Query
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 import config
-from backend.db import get_connection, month_filter
-
-app = FastAPI(title="Transparencia Antigua API", version="0.1.0")
+from backend import warmup
+from backend.cache import cached, response_cache, single_flight
+from backend.compression import CompressionMiddleware, compression_stats
+from backend.concentration import DEFAULT_LORENZ_POINTS, DEFAULT_TOP_N, parse_top_n
+from backend.concentration import metrics as concentration_metrics
+from backend.dataset_meta import get_meta
+from backend.db import db_exists, get_connection, month_filter, pool_stats, resolve_buyer, supplier_filter
+from backend.executor import query_executor
+from backend.formats import (
+    FastJSONResponse,
+    fetch_arrow,
+    reject_unsupported_format,
+    response_format,
+    serialization_stats,
+    table_response,
+    tabular_response,
+)
+from backend.http_cache import ConditionalCacheMiddleware
+from backend.http_cache import stats as http_cache_stats
+from backend.metrics import MetricsMiddleware, exposition
+from backend.pagination import decode_cursor, encode_cursor, keyset_predicate, parse_fields
+from backend.search import KINDS as SEARCH_KINDS
+from backend.search import search as search_titles
+from backend.supplier_search import get_index as get_supplier_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm DuckDB and the caches in the background; /api/ready reports when that's done.
+    warmup.start(app)
+    yield
+    warmup.stop()
+
+
+app = FastAPI(
+    title="Transparencia Antigua API",
+    version="0.1.0",
+    default_response_class=FastJSONResponse,
+    # JSON-only endpoints refuse format=arrow / Accept: Arrow with 406 (tabular ones negotiate it).
+    dependencies=[Depends(reject_unsupported_format)],
+    lifespan=lifespan,
+)
 
 _extra_origins = [o.strip() for o in os.getenv("CORS_EXTRA_ORIGINS", "").split(",") if o.strip()]
 _allowed_origins = [
@@ -31,6 +71,11 @@ _allowed_origins = [
     *_extra_origins,
 ]
 
+# Added before CORS so 304s still pass through CORSMiddleware and carry its headers.
+app.add_middleware(ConditionalCacheMiddleware)
+# Outside ConditionalCacheMiddleware, so Vary: Accept-Encoding is appended to its Vary: Accept.
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     # Allow localhost + private LAN IPs on any port for local Next.js dev and mobile testing.
@@ -39,215 +84,295 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Mode"],
 )
 
+# Outermost, so latency covers the whole stack (including 304s and CORS preflights).
+app.add_middleware(MetricsMiddleware)
+
 
 def _wf_params(
     years: list[str] | None = None,
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
 ):
-    wf_t, params_t = month_filter("", years, from_month, to_month)
-    wf_a, params_a = month_filter("", years, from_month, to_month)
-    wf_t_alias, _ = month_filter("t", years, from_month, to_month)
-    wf_a_alias, _ = month_filter("a", years, from_month, to_month)
+    """WHERE fragments and params for the year/month filter and buyer= (omitted = config.DEFAULT_BUYER, 'all' = every buyer)."""
+    buyer_name = resolve_buyer(buyer)
+    wf_t, params_t = month_filter("", years, from_month, to_month, buyer_name)
+    wf_a, params_a = month_filter("", years, from_month, to_month, buyer_name)
+    wf_t_alias, _ = month_filter("t", years, from_month, to_month, buyer_name)
+    wf_a_alias, _ = month_filter("a", years, from_month, to_month, buyer_name)
     return wf_t, params_t, wf_a, params_a, wf_t_alias, wf_a_alias
 
 
 @app.get("/api/diagnostic")
-def get_diagnostic():
+async def get_diagnostic():
     """
     Lightweight DB check for debugging empty views (e.g. Por modalidad).
     Same DB as Streamlit used: data/lake.duckdb. Ingest writes to lake_next.duckdb; swap to lake.duckdb so API sees data.
+    Reads dataset_meta on query_executor, like the cached endpoints (503 when it is full).
     """
+    return await query_executor.run(_diagnostic)
+
+
+def _diagnostic() -> dict:
     out = {
-        "db_path": config.DB_PATH,
-        "db_exists": os.path.isfile(config.DB_PATH),
+        "db_path": config.served_db_path(),
+        "db_exists": db_exists(),
         "tenders_count": 0,
         "awards_count": 0,
         "distinct_modalities_count": 0,
         "buyer_names": [],
+        "built_at": None,
     }
     if not out["db_exists"]:
         return out
     try:
-        con = get_connection()
-        try:
-            out["tenders_count"] = con.execute("SELECT COUNT(*) FROM tenders_clean_all").fetchone()[0]
-            out["awards_count"] = con.execute("SELECT COUNT(*) FROM awards_clean_all").fetchone()[0]
-            out["distinct_modalities_count"] = con.execute(
-                "SELECT COUNT(DISTINCT COALESCE(procurement_method_details, '(null)')) FROM tenders_clean_all"
-            ).fetchone()[0]
-            out["buyer_names"] = [r[0] for r in con.execute("SELECT DISTINCT buyer_name FROM tenders_clean_all").fetchall()]
-        finally:
-            con.close()
+        meta = get_meta()
+        if meta:
+            out["tenders_count"] = meta["tenders_count"]
+            out["awards_count"] = meta["awards_count"]
+            out["distinct_modalities_count"] = len(meta["modalities"])
+            out["buyer_names"] = meta["buyer_names"]
+            out["built_at"] = meta["built_at"].isoformat() if meta["built_at"] else None
     except Exception as e:
         logger.exception("diagnostic failed: %s", e)
     return out
 
 
 @app.get("/api/filters")
-def get_filters():
-    """Available months and years for filter dropdowns."""
-    if not os.path.isfile(config.DB_PATH):
+@cached("filters")
+def get_filters(buyer: str | None = None):
+    """Available months and years for filter dropdowns (for buyer=, like every data endpoint)."""
+    if not db_exists():
         return {"months": [], "years": []}
-    con = get_connection()
-    try:
-        months = [
-            r[0]
-            for r in con.execute(
-                "SELECT DISTINCT month FROM tenders_clean_all WHERE month IS NOT NULL ORDER BY month"
-            ).fetchall()
-        ]
-        years = sorted(set(m[:4] for m in months)) if months else []
-        return {"months": months, "years": years}
-    finally:
-        con.close()
+    meta = get_meta(resolve_buyer(buyer))
+    if not meta:
+        return {"months": [], "years": []}
+    return {"months": meta["months"], "years": meta["years"]}
+
+
+@app.get("/api/buyers")
+@cached("buyers")
+def get_buyers(fmt: str = Depends(response_format)):
+    """Buyers in the lake (comprador is the buyer= value), largest total first; es_default marks the one shown without buyer=."""
+    if not db_exists():
+        return []
+    with get_connection() as con:
+        cur = con.execute(
+            """
+            SELECT
+                buyer_name AS comprador,
+                tenders_count AS procesos,
+                awards_count AS adjudicaciones,
+                ROUND(total_amount, 2) AS total_q,
+                first_month AS primer_mes,
+                last_month AS ultimo_mes,
+                buyer_name IS NOT DISTINCT FROM ? AS es_default
+            FROM buyers
+            ORDER BY total_amount DESC, buyer_name
+            """,
+            [config.DEFAULT_BUYER],
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "buyers")
+        cols = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+        return [{**dict(zip(cols, r)), "total_q": float(r[3])} for r in rows]
 
 
 @app.get("/api/kpis")
+@cached("kpis")
 def get_kpis(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
 ):
-    wf_t, params_t, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        tenders_count = con.execute(
-            f"SELECT COUNT(*) FROM tenders_clean_all WHERE {wf_t}", params_t
-        ).fetchone()[0]
-        awards_count = con.execute(
-            f"SELECT COUNT(*) FROM awards_clean_all WHERE {wf_a}", params_a
-        ).fetchone()[0]
-        total_amount = con.execute(
-            f"SELECT COALESCE(SUM(amount), 0) FROM awards_clean_all WHERE {wf_a}",
-            params_a,
-        ).fetchone()[0]
+    wf_t, params_t, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    with get_connection() as con:
+        tenders_count, awards_count, total_amount = con.execute(
+            f"""
+            SELECT
+                (SELECT COALESCE(SUM(tenders_count), 0) FROM tenders_by_month_modality WHERE {wf_t}),
+                COALESCE(SUM(awards_count), 0),
+                ROUND(COALESCE(SUM(total_amount), 0), 2)
+            FROM awards_by_month_band
+            WHERE {wf_a}
+            """,
+            list(params_t) + list(params_a),
+        ).fetchone()
         return {
             "tenders_count": tenders_count,
             "awards_count": awards_count,
             "total_amount": float(total_amount),
         }
-    finally:
-        con.close()
 
 
 @app.get("/api/summary-by-year")
-def get_summary_by_year():
-    """Aggregate tenders count, awards count, total amount per year (no filter)."""
-    if not os.path.isfile(config.DB_PATH):
+@cached("summary-by-year")
+def get_summary_by_year(buyer: str | None = None, fmt: str = Depends(response_format)):
+    """Aggregate tenders count, awards count, total amount per year (no month filter; buyer= applies)."""
+    if not db_exists():
         return []
-    con = get_connection()
-    try:
-        rows = con.execute(
-            """
+    wf, params = month_filter("", None, None, None, resolve_buyer(buyer))
+    with get_connection() as con:
+        cur = con.execute(
+            f"""
             WITH years AS (
-                SELECT DISTINCT SUBSTR(month, 1, 4) AS year FROM tenders_clean_all WHERE month IS NOT NULL
+                SELECT DISTINCT SUBSTR(month, 1, 4) AS year FROM tenders_clean_all WHERE month IS NOT NULL AND {wf}
             ),
             t_counts AS (
                 SELECT SUBSTR(month, 1, 4) AS year, COUNT(DISTINCT nog) AS tenders_count
-                FROM tenders_clean_all WHERE month IS NOT NULL GROUP BY 1
+                FROM tenders_clean_all WHERE month IS NOT NULL AND {wf} GROUP BY 1
             ),
             a_counts AS (
                 SELECT SUBSTR(month, 1, 4) AS year, COUNT(*) AS awards_count, COALESCE(SUM(amount), 0) AS total_amount
-                FROM awards_clean_all WHERE month IS NOT NULL GROUP BY 1
+                FROM awards_clean_all WHERE month IS NOT NULL AND {wf} GROUP BY 1
             )
-            SELECT y.year, COALESCE(t.tenders_count, 0), COALESCE(a.awards_count, 0), ROUND(COALESCE(a.total_amount, 0), 2)
+            SELECT
+                y.year,
+                COALESCE(t.tenders_count, 0) AS tenders_count,
+                COALESCE(a.awards_count, 0) AS awards_count,
+                ROUND(COALESCE(a.total_amount, 0), 2) AS total_amount
             FROM years y
             LEFT JOIN t_counts t ON y.year = t.year
             LEFT JOIN a_counts a ON y.year = a.year
             ORDER BY COALESCE(a.total_amount, 0) DESC, y.year DESC
-            """
-        ).fetchall()
+            """,
+            params * 3,
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "summary-by-year")
+        rows = cur.fetchall()
         return [
             {"year": r[0], "tenders_count": r[1], "awards_count": r[2], "total_amount": float(r[3])}
             for r in rows
         ]
-    finally:
-        con.close()
 
 
 @app.get("/api/suppliers")
+@cached("suppliers")
 def get_suppliers(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        rows = con.execute(
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    with get_connection() as con:
+        cur = con.execute(
             f"""
             SELECT
                 COALESCE(supplier_name, '(Sin nombre)') AS proveedor,
-                COUNT(*) AS adjudicaciones,
-                ROUND(SUM(amount), 2) AS total_q
-            FROM awards_clean_all
+                CAST(SUM(awards_count) AS BIGINT) AS adjudicaciones,
+                ROUND(SUM(total_amount), 2) AS total_q
+            FROM awards_by_month_supplier
             WHERE {wf_a}
             GROUP BY supplier_name
             ORDER BY total_q DESC
             """,
             params_a,
-        ).fetchall()
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "suppliers")
+        rows = cur.fetchall()
         return [
             {"proveedor": r[0], "adjudicaciones": r[1], "total_q": float(r[2])}
             for r in rows
         ]
-    finally:
-        con.close()
+
+
+def _concentration_section(
+    names: list[str | None],
+    totals: list[float],
+    top_n=DEFAULT_TOP_N,
+    lorenz_points: int = DEFAULT_LORENZ_POINTS,
+) -> dict:
+    """distinct_suppliers / top5_pct (as before) plus HHI, Gini, top-N shares and Lorenz curve."""
+    out = concentration_metrics(totals, top_n, lorenz_points)
+    total = sum(max(float(t or 0), 0.0) for t in totals)
+    top5 = sum(sorted((max(float(t or 0), 0.0) for t in totals), reverse=True)[:5])
+    return {
+        "distinct_suppliers": sum(1 for n in names if n is not None),
+        "top5_pct": round(top5 / total * 100, 1) if total > 0 else 0,
+        **out,
+    }
 
 
 @app.get("/api/concentration")
+@cached("concentration")
 def get_concentration(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    top: list[str] | None = Query(None),
+    points: int = Query(DEFAULT_LORENZ_POINTS, ge=2, le=1001),
+    by: str | None = None,
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
+    """
+    Supplier concentration for the filter: HHI, Gini, top-N shares (top=1,5,10 ...) and the
+    Lorenz curve sampled to `points`. by=modality adds the same metrics per modality.
+    One grouped query over the supplier rollups; the metrics are computed from its totals.
+    """
     try:
-        total_q = con.execute(
-            f"SELECT COALESCE(SUM(amount), 0) FROM awards_clean_all WHERE {wf_a}",
-            params_a,
-        ).fetchone()[0]
-        total_q = float(total_q)
-        distinct_suppliers = con.execute(
-            f"SELECT COUNT(DISTINCT supplier_name) FROM awards_clean_all WHERE {wf_a}",
-            params_a,
-        ).fetchone()[0]
-        top5_q = con.execute(
-            f"""
-            SELECT COALESCE(SUM(s.total_q), 0) FROM (
-                SELECT SUM(amount) AS total_q
-                FROM awards_clean_all
-                WHERE {wf_a}
-                GROUP BY supplier_name
-                ORDER BY total_q DESC
-                LIMIT 5
-            ) s
-            """,
-            params_a,
-        ).fetchone()[0]
-        top5_pct = (float(top5_q) / total_q * 100) if total_q and total_q > 0 else 0
-        return {
-            "distinct_suppliers": distinct_suppliers,
-            "top5_pct": round(top5_pct, 1),
-        }
-    finally:
-        con.close()
+        top_n = parse_top_n(top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if by not in (None, "modality"):
+        raise HTTPException(status_code=400, detail="by must be 'modality'")
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    # Overall totals from awards_by_month_supplier (every award); per-modality from the
+    # tender-joined rollup. Both in one statement: modalidad is NULL on the overall rows.
+    sql = f"""
+        SELECT NULL AS modalidad, supplier_name, SUM(total_amount) AS total
+        FROM awards_by_month_supplier
+        WHERE {wf_a}
+        GROUP BY supplier_name
+    """
+    params = list(params_a)
+    if by == "modality":
+        sql += f"""
+        UNION ALL
+        SELECT COALESCE(procurement_method_details, '(Sin especificar)'), supplier_name, SUM(total_amount)
+        FROM awards_by_month_modality_supplier
+        WHERE {wf_a}
+        GROUP BY procurement_method_details, supplier_name
+        """
+        params += list(params_a)
+    with get_connection() as con:
+        rows = con.execute(sql, params).fetchall()
+
+    groups: dict[str | None, tuple[list, list]] = {}
+    for modalidad, name, total in rows:
+        names, totals = groups.setdefault(modalidad, ([], []))
+        names.append(name)
+        totals.append(total)
+    overall_names, overall_totals = groups.pop(None, ([], []))
+    out = _concentration_section(overall_names, overall_totals, top_n, points)
+    if by == "modality":
+        out["by_modality"] = [
+            {"modalidad": modalidad, **_concentration_section(names, totals, top_n, points)}
+            for modalidad, (names, totals) in sorted(groups.items())
+        ]
+    return out
 
 
 @app.get("/api/supplier-names")
+@cached("supplier-names")
 def get_supplier_names(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        rows = con.execute(
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    with get_connection() as con:
+        cur = con.execute(
             f"""
             SELECT DISTINCT COALESCE(supplier_name, '(Sin nombre)') AS name
             FROM awards_clean_all
@@ -255,38 +380,88 @@ def get_supplier_names(
             ORDER BY name
             """,
             params_a,
-        ).fetchall()
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "supplier-names")
+        rows = cur.fetchall()
         return [r[0] for r in rows]
-    finally:
-        con.close()
+
+
+@app.get("/api/supplier-search")
+async def search_suppliers(q: str = "", limit: int = Query(10, ge=1, le=50), buyer: str | None = None):
+    """
+    Typeahead over the buyer's supplier names (accent/case-insensitive prefix, then fuzzy trigram match).
+    Served from an in-memory index per buyer rebuilt when the data version changes; not in response_cache.
+    Runs on query_executor (the index build after a swap queries DuckDB), so it gets the same 503 back-pressure.
+    """
+    if not db_exists():
+        return []
+    return await query_executor.run(_search_suppliers, q, limit, resolve_buyer(buyer))
+
+
+def _search_suppliers(q: str, limit: int, buyer: str | None) -> list[dict]:
+    return get_supplier_index(buyer).search(q, limit)
+
+
+@app.get("/api/search")
+@cached("search")
+def search_processes(
+    q: str = "",
+    kind: str = "all",
+    years: list[str] | None = Query(None, alias="years"),
+    from_month: str | None = None,
+    to_month: str | None = None,
+    buyer: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    fmt: str = Depends(response_format),
+):
+    """
+    Tenders and awards whose title matches every word of q, best BM25 score first (mode "bm25"), or
+    newest first when the full-text index is unavailable (mode "scan"). kind= tender | award | all;
+    keyset-paginated with next_cursor like /api/tenders, including for format=arrow / parquet.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q is required")
+    if kind != "all" and kind not in SEARCH_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be all, {' or '.join(SEARCH_KINDS)}")
+    wf, params, _, _, _, _ = _wf_params(years, from_month, to_month, buyer)
+    if kind != "all":
+        wf, params = f"{wf} AND kind = ?", params + [kind]
+    try:
+        return search_titles(q, wf, params, limit, cursor, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/supplier-detail")
+@cached("supplier-detail")
 def get_supplier_detail(
     supplier: str,
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
     raw_name = None if supplier == "(Sin nombre)" else supplier
-    con = get_connection()
-    try:
-        if raw_name is None:
-            wf = f"{wf_a} AND supplier_name IS NULL"
-            params = list(params_a)
-        else:
-            wf = f"{wf_a} AND supplier_name = ?"
-            params = list(params_a) + [raw_name]
-        rows = con.execute(
+    wf_s, params_s = supplier_filter(raw_name)
+    wf = f"{wf_a} AND {wf_s}"
+    params = list(params_a) + params_s
+    with get_connection() as con:
+        cur = con.execute(
             f"""
             SELECT nog, title, award_date, amount, currency
-            FROM awards_clean_all
+            FROM awards_by_supplier
             WHERE {wf}
             ORDER BY award_date DESC NULLS LAST
             """,
             params,
-        ).fetchall()
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "supplier-detail")
+        rows = cur.fetchall()
         return [
             {
                 "nog": r[0],
@@ -297,283 +472,459 @@ def get_supplier_detail(
             }
             for r in rows
         ]
-    finally:
-        con.close()
 
 
-def _resolve_years(con, years: list[str] | None) -> list[str]:
-    """If years is None or empty, return distinct years from tenders_clean_all so queries always have a valid filter."""
+def _resolve_years(years: list[str] | None) -> list[str]:
+    """If years is None or empty, return every year in the DB (dataset_meta) so queries always have a valid filter."""
     if years:
         return years
-    try:
-        rows = con.execute(
-            "SELECT DISTINCT SUBSTR(month, 1, 4) AS y FROM tenders_clean_all WHERE month IS NOT NULL ORDER BY y"
-        ).fetchall()
-        return [r[0] for r in rows] if rows else []
-    except Exception:
-        return []
+    meta = get_meta()
+    return list(meta["years"]) if meta else []
 
 
 @app.get("/api/modalities")
+@cached("modalities")
 def get_modalities(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    if not os.path.isfile(config.DB_PATH):
+    if not db_exists():
         return []
-    try:
-        con = get_connection()
-        try:
-            resolved_years = _resolve_years(con, years)
-            _, params_t, _, _, wf_t_alias, _ = _wf_params(resolved_years, from_month, to_month)
-            rows = con.execute(
-                f"""
-                SELECT
-                    COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
-                    COUNT(DISTINCT t.nog) AS procesos,
-                    ROUND(COALESCE(SUM(a.amount), 0), 2) AS total_q
-                FROM tenders_clean_all t
-                LEFT JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
+    resolved_years = _resolve_years(years)
+    with get_connection() as con:
+        _, params_t, _, _, wf_t_alias, wf_a_alias = _wf_params(resolved_years, from_month, to_month, buyer)
+        cur = con.execute(
+            f"""
+            WITH t AS (
+                SELECT procurement_method_details, CAST(SUM(procesos) AS BIGINT) AS procesos
+                FROM tenders_by_month_modality t
                 WHERE {wf_t_alias}
-                GROUP BY t.procurement_method_details
-                ORDER BY total_q DESC
-                """,
-                params_t,
-            ).fetchall()
-            return [
-                {"modalidad": r[0], "procesos": r[1], "total_q": float(r[2])}
-                for r in rows
-            ]
-        finally:
-            con.close()
-    except Exception as e:
-        logger.exception("get_modalities failed: %s", e)
-        return []
+                GROUP BY procurement_method_details
+            ),
+            a AS (
+                SELECT procurement_method_details, SUM(total_amount) AS total_amount
+                FROM awards_by_month_modality_supplier a
+                WHERE {wf_a_alias}
+                GROUP BY procurement_method_details
+            )
+            SELECT
+                COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
+                t.procesos,
+                ROUND(COALESCE(a.total_amount, 0), 2) AS total_q
+            FROM t
+            LEFT JOIN a ON t.procurement_method_details IS NOT DISTINCT FROM a.procurement_method_details
+            ORDER BY total_q DESC
+            """,
+            list(params_t) + list(params_t),
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "modalities")
+        rows = cur.fetchall()
+        return [
+            {"modalidad": r[0], "procesos": r[1], "total_q": float(r[2])}
+            for r in rows
+        ]
 
 
 @app.get("/api/top-suppliers-by-modality")
+@cached("top-suppliers-by-modality")
 def get_top_suppliers_by_modality(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    if not os.path.isfile(config.DB_PATH):
-        return []
-    try:
-        con = get_connection()
-        try:
-            resolved_years = _resolve_years(con, years)
-            _, params_t, _, _, wf_t_alias, _ = _wf_params(resolved_years, from_month, to_month)
-            rows = con.execute(
-                f"""
-                WITH by_mod_supplier AS (
-                    SELECT
-                        COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
-                        COALESCE(a.supplier_name, '(Sin nombre)') AS proveedor,
-                        ROUND(SUM(a.amount), 2) AS total_q,
-                        COUNT(*) AS adjudicaciones
-                    FROM tenders_clean_all t
-                    JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
-                    WHERE {wf_t_alias}
-                    GROUP BY t.procurement_method_details, a.supplier_name
-                ),
-                ranked AS (
-                    SELECT *, ROW_NUMBER() OVER (PARTITION BY modalidad ORDER BY total_q DESC) AS rn
-                    FROM by_mod_supplier
-                )
-                SELECT modalidad, proveedor, total_q, adjudicaciones, rn
-                FROM ranked
-                WHERE rn <= 10
-                ORDER BY modalidad, rn
-                """,
-                params_t,
-            ).fetchall()
-            return [
-                {
-                    "modalidad": r[0],
-                    "proveedor": r[1],
-                    "total_q": float(r[2]),
-                    "adjudicaciones": r[3],
-                    "rn": r[4],
-                }
-                for r in rows
-            ]
-        finally:
-            con.close()
-    except Exception as e:
-        logger.exception("get_top_suppliers_by_modality failed: %s", e)
+    if not db_exists():
         return []
+    resolved_years = _resolve_years(years)
+    with get_connection() as con:
+        _, params_t, _, _, wf_t_alias, _ = _wf_params(resolved_years, from_month, to_month, buyer)
+        cur = con.execute(
+            f"""
+            WITH by_mod_supplier AS (
+                SELECT
+                    COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
+                    COALESCE(t.supplier_name, '(Sin nombre)') AS proveedor,
+                    ROUND(SUM(t.total_amount), 2) AS total_q,
+                    CAST(SUM(t.awards_count) AS BIGINT) AS adjudicaciones
+                FROM awards_by_month_modality_supplier t
+                WHERE {wf_t_alias}
+                GROUP BY t.procurement_method_details, t.supplier_name
+            ),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY modalidad ORDER BY total_q DESC) AS rn
+                FROM by_mod_supplier
+            )
+            SELECT modalidad, proveedor, total_q, adjudicaciones, rn
+            FROM ranked
+            WHERE rn <= 10
+            ORDER BY modalidad, rn
+            """,
+            params_t,
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "top-suppliers-by-modality")
+        rows = cur.fetchall()
+        return [
+            {
+                "modalidad": r[0],
+                "proveedor": r[1],
+                "total_q": float(r[2]),
+                "adjudicaciones": r[3],
+                "rn": r[4],
+            }
+            for r in rows
+        ]
 
 
 @app.get("/api/low-competition")
+@cached("low-competition")
 def get_low_competition(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    wf_t, params_t, _, _, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        count = con.execute(
-            f"""
-            SELECT COUNT(*) FROM tenders_clean_all
-            WHERE ({wf_t}) AND (number_of_tenderers IS NULL OR number_of_tenderers <= 1)
-            """,
-            params_t,
-        ).fetchone()[0]
+    """
+    Tenders with 0 or 1 bidders or no bidder count (competition_level '0' / '1' / 'unknown'),
+    newest first and keyset-paginated like /api/tenders, plus count and breakdowns by level,
+    modality and month for the whole filter. Reads the low_competition_tenders side table.
+    format=columns returns the page as columns next to the breakdowns; Arrow/Parquet carry the
+    page only (next cursor in X-Next-Cursor), like /api/tenders.
+    """
+    wf_t, params_t, _, _, _, _ = _wf_params(years, from_month, to_month, buyer)
+    page = _list_rows(
+        "low-competition", "low_competition_tenders", "date_published", "nog", wf_t, params_t, limit, cursor, None, fmt
+    )
+    if fmt in ("arrow", "parquet"):
+        return page
+    with get_connection() as con:
         rows = con.execute(
             f"""
-            SELECT nog, title, procurement_method_details, number_of_tenderers, date_published, month
-            FROM tenders_clean_all
-            WHERE ({wf_t}) AND (number_of_tenderers IS NULL OR number_of_tenderers <= 1)
-            ORDER BY date_published DESC NULLS LAST
-            LIMIT 50
+            SELECT
+                GROUPING(competition_level) AS g_level,
+                GROUPING(procurement_method_details) AS g_modality,
+                GROUPING(month) AS g_month,
+                competition_level, procurement_method_details, month,
+                COUNT(*) AS n
+            FROM low_competition_tenders
+            WHERE {wf_t}
+            GROUP BY GROUPING SETS ((), (competition_level), (procurement_method_details), (month))
             """,
             params_t,
         ).fetchall()
-        return {
-            "count": count,
-            "tenders": [
-                {
-                    "nog": r[0],
-                    "title": r[1],
-                    "procurement_method_details": r[2],
-                    "number_of_tenderers": r[3],
-                    "date_published": r[4],
-                    "month": r[5],
-                }
-                for r in rows
-            ],
-        }
-    finally:
-        con.close()
+    count, by_level, by_modality, by_month = 0, [], [], []
+    for g_level, g_modality, g_month, level, modality, month, n in rows:
+        if not g_level:
+            by_level.append({"competition_level": level, "count": n})
+        elif not g_modality:
+            by_modality.append({"modalidad": modality or "(Sin especificar)", "count": n})
+        elif not g_month:
+            by_month.append({"mes": month, "count": n})
+        else:
+            count = n
+    rows_out = {"columns": page["columns"], "data": page["data"]} if fmt == "columns" else {"tenders": page["items"]}
+    return {
+        "count": count,
+        **rows_out,
+        "next_cursor": page["next_cursor"],
+        "by_level": sorted(by_level, key=lambda r: r["competition_level"] or ""),
+        "by_modality": sorted(by_modality, key=lambda r: (-r["count"], r["modalidad"])),
+        "by_month": sorted(by_month, key=lambda r: r["mes"] or ""),
+    }
 
 
 @app.get("/api/bands")
+@cached("bands")
 def get_bands(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        rows = con.execute(
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    with get_connection() as con:
+        cur = con.execute(
             f"""
             SELECT
-                CASE
-                    WHEN amount < 25000 THEN '< Q25,000 (baja cuantía)'
-                    WHEN amount < 90000 THEN 'Q25,000 - Q90,000 (compra directa)'
-                    ELSE '> Q90,000 (licitación)'
-                END AS rango,
-                COUNT(*) AS adjudicaciones,
-                ROUND(SUM(amount), 2) AS total_q
-            FROM awards_clean_all
+                band AS rango,
+                CAST(SUM(awards_count) AS BIGINT) AS adjudicaciones,
+                ROUND(SUM(total_amount), 2) AS total_q
+            FROM awards_by_month_band
             WHERE {wf_a}
-            GROUP BY 1
-            ORDER BY MIN(amount)
+            GROUP BY band
+            ORDER BY MIN(min_amount)
             """,
             params_a,
-        ).fetchall()
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "bands")
+        rows = cur.fetchall()
         return [
             {"rango": r[0], "adjudicaciones": r[1], "total_q": float(r[2])}
             for r in rows
         ]
-    finally:
-        con.close()
 
 
 @app.get("/api/trend")
+@cached("trend")
 def get_trend(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
+    buyer: str | None = None,
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    con = get_connection()
-    try:
-        rows = con.execute(
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    with get_connection() as con:
+        cur = con.execute(
             f"""
-            SELECT month AS mes, COUNT(*) AS adjudicaciones, ROUND(SUM(amount), 2) AS total_q
-            FROM awards_clean_all
+            SELECT month AS mes, CAST(SUM(awards_count) AS BIGINT) AS adjudicaciones, ROUND(SUM(total_amount), 2) AS total_q
+            FROM awards_by_month_band
             WHERE {wf_a}
             GROUP BY month
             ORDER BY month
             """,
             params_a,
-        ).fetchall()
+        )
+        if fmt != "json":
+            return tabular_response(cur, fmt, "trend")
+        rows = cur.fetchall()
         return [
             {"mes": r[0], "adjudicaciones": r[1], "total_q": float(r[2])}
             for r in rows
         ]
-    finally:
-        con.close()
+
+
+DASHBOARD_SECTIONS = ("kpis", "suppliers", "concentration", "supplier-names", "bands", "trend")
+
+
+def _parse_sections(sections: list[str] | None) -> list[str]:
+    """Accept repeated and/or comma-separated sections=; default is all of them."""
+    if not sections:
+        return list(DASHBOARD_SECTIONS)
+    wanted = {s.strip() for item in sections for s in item.split(",") if s.strip()}
+    unknown = wanted - set(DASHBOARD_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))}. Valid: {', '.join(DASHBOARD_SECTIONS)}",
+        )
+    return [s for s in DASHBOARD_SECTIONS if s in wanted]
+
+
+@app.get("/api/dashboard")
+@cached("dashboard")
+def get_dashboard(
+    years: list[str] | None = Query(None, alias="years"),
+    from_month: str | None = None,
+    to_month: str | None = None,
+    buyer: str | None = None,
+    sections: list[str] | None = Query(None),
+):
+    """
+    kpis, suppliers, concentration, supplier-names, bands and trend in one response, read from the
+    same rollups as the standalone endpoints (one UNION ALL statement over the requested sections);
+    each section has the same shape as its standalone endpoint.
+    """
+    wanted = _parse_sections(sections)
+    wf_t, params_t, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    # (section, key, count, amount, min amount) per group; key is NULL for the totals.
+    parts, params = [], []
+    if {"suppliers", "concentration", "supplier-names"} & set(wanted):
+        parts.append(f"""
+            SELECT 'supplier' AS section, supplier_name AS key, SUM(awards_count) AS n,
+                SUM(total_amount) AS total, NULL AS min_amount
+            FROM awards_by_month_supplier WHERE {wf_a} GROUP BY supplier_name""")
+        params += params_a
+    if "bands" in wanted:
+        parts.append(f"""
+            SELECT 'band', band, SUM(awards_count), SUM(total_amount), MIN(min_amount)
+            FROM awards_by_month_band WHERE {wf_a} GROUP BY band""")
+        params += params_a
+    if "trend" in wanted:
+        parts.append(f"""
+            SELECT 'month', month, SUM(awards_count), SUM(total_amount), NULL
+            FROM awards_by_month_band WHERE {wf_a} GROUP BY month""")
+        params += params_a
+    if "kpis" in wanted:
+        parts.append(f"""
+            SELECT 'awards', NULL, COALESCE(SUM(awards_count), 0), COALESCE(SUM(total_amount), 0), NULL
+            FROM awards_by_month_band WHERE {wf_a}
+            UNION ALL
+            SELECT 'tenders', NULL, COALESCE(SUM(tenders_count), 0), NULL, NULL
+            FROM tenders_by_month_modality WHERE {wf_t}""")
+        params += list(params_a) + list(params_t)
+    with get_connection() as con:
+        rows = con.execute("\n            UNION ALL".join(parts), params).fetchall()
+
+    groups: dict[str, list[tuple]] = {}
+    for section, key, n, total, min_amount in rows:
+        groups.setdefault(section, []).append((key, int(n), total, min_amount))
+    by_supplier = groups.get("supplier", [])
+
+    out: dict[str, Any] = {}
+    if "kpis" in wanted:
+        (_, awards_count, total_amount, _), = groups["awards"]
+        (_, tenders_count, _, _), = groups["tenders"]
+        out["kpis"] = {
+            "tenders_count": tenders_count,
+            "awards_count": awards_count,
+            "total_amount": round(float(total_amount), 2),
+        }
+    if "suppliers" in wanted:
+        ranked = sorted(by_supplier, key=lambda r: (r[2] is None, -round(r[2] or 0, 2)))
+        out["suppliers"] = [
+            {"proveedor": _or_sin_nombre(name), "adjudicaciones": n, "total_q": round(float(total), 2)}
+            for name, n, total, _ in ranked
+        ]
+    if "concentration" in wanted:
+        out["concentration"] = _concentration_section([r[0] for r in by_supplier], [r[2] for r in by_supplier])
+    if "supplier-names" in wanted:
+        out["supplier-names"] = sorted({_or_sin_nombre(r[0]) for r in by_supplier})
+    if "bands" in wanted:
+        ranked = sorted(groups.get("band", []), key=lambda r: (r[3] is None, r[3] or 0))
+        out["bands"] = [{"rango": band, "adjudicaciones": n, "total_q": round(float(total), 2)} for band, n, total, _ in ranked]
+    if "trend" in wanted:
+        ranked = sorted(groups.get("month", []), key=lambda r: (r[0] is None, r[0] or ""))
+        out["trend"] = [{"mes": month, "adjudicaciones": n, "total_q": round(float(total), 2)} for month, n, total, _ in ranked]
+    return out
+
+
+def _or_sin_nombre(name: str | None) -> str:
+    return name if name is not None else "(Sin nombre)"
+
+
+# Internal columns not exposed by the row-listing endpoints.
+_HIDDEN_COLUMNS = "EXCLUDE (year, month_date, buyer_key)"
+
+
+def _list_rows(
+    kind: str,
+    table: str,
+    date_col: str,
+    id_col: str,
+    where: str,
+    params: list,
+    limit: int,
+    cursor: str | None,
+    fields: list[str] | None,
+    fmt: str = "json",
+):
+    """
+    One keyset page of `table` ordered by (date_col DESC NULLS LAST, id_col DESC).
+    Arrow/Parquet pages carry the next cursor in the X-Next-Cursor header instead of the body;
+    format=columns returns {"columns", "data", "next_cursor"}.
+    """
+    id_expr = f"COALESCE({id_col}, '')"
+    with get_connection() as con:
+        con.execute(f"SELECT * {_HIDDEN_COLUMNS} FROM {table} LIMIT 0")
+        available = [d[0] for d in con.description]
+        try:
+            columns = parse_fields(fields, available)
+            if cursor:
+                pred, pred_params = keyset_predicate(date_col, id_expr, *decode_cursor(kind, cursor))
+                where, params = f"({where}) AND {pred}", list(params) + pred_params
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        select = ", ".join(columns) if columns else f"* {_HIDDEN_COLUMNS}"
+        cur = con.execute(
+            f"""
+            SELECT {select}, {date_col} AS _cursor_date, {id_expr} AS _cursor_id
+            FROM {table}
+            WHERE {where}
+            ORDER BY {date_col} DESC NULLS LAST, {id_expr} DESC
+            LIMIT ?
+            """,
+            list(params) + [limit + 1],
+        )
+        if fmt in ("arrow", "parquet"):
+            table_page = fetch_arrow(cur)
+            headers = {}
+            if table_page.num_rows > limit:
+                last = limit - 1
+                headers["X-Next-Cursor"] = encode_cursor(
+                    kind, table_page["_cursor_date"][last].as_py(), table_page["_cursor_id"][last].as_py()
+                )
+            table_page = table_page.slice(0, limit).drop_columns(["_cursor_date", "_cursor_id"])
+            return table_response(table_page, fmt, kind, headers=headers)
+        rows = cur.fetchall()
+        description = cur.description
+    cols = [d[0] for d in description][:-2]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(kind, rows[-1][-2], rows[-1][-1])
+    if fmt == "columns":
+        data = list(zip(*rows))[:-2] if rows else [()] * len(cols)
+        return {"columns": cols, "data": {c: list(v) for c, v in zip(cols, data)}, "next_cursor": next_cursor}
+    return {
+        "items": [dict(zip(cols, r[:-2])) for r in rows],
+        "next_cursor": next_cursor,
+    }
 
 
 @app.get("/api/tenders")
+@cached("tenders")
 def get_tenders(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
-    limit: int = Query(100, le=500),
+    buyer: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: list[str] | None = Query(None),
+    fmt: str = Depends(response_format),
 ):
-    wf_t, params_t, _, _, _, _ = _wf_params(years, from_month, to_month)
-    params_t = list(params_t) + [limit]
-    con = get_connection()
-    try:
-        rows = con.execute(
-            f"SELECT * FROM tenders_clean_all WHERE {wf_t} ORDER BY date_published DESC NULLS LAST LIMIT ?",
-            params_t,
-        ).fetchall()
-        cols = [d[0] for d in con.description]
-        return [dict(zip(cols, r)) for r in rows]
-    finally:
-        con.close()
+    """
+    Tenders, newest first, keyset-paginated: pass the previous page's next_cursor as cursor=.
+    fields= (repeated or comma-separated) limits the columns returned.
+    """
+    wf_t, params_t, _, _, _, _ = _wf_params(years, from_month, to_month, buyer)
+    return _list_rows("tenders", "tenders_clean_all", "date_published", "nog", wf_t, params_t, limit, cursor, fields, fmt)
 
 
 @app.get("/api/awards")
+@cached("awards")
 def get_awards(
     years: list[str] | None = Query(None, alias="years"),
     from_month: str | None = None,
     to_month: str | None = None,
-    limit: int = Query(100, le=500),
+    buyer: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: list[str] | None = Query(None),
+    fmt: str = Depends(response_format),
 ):
-    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month)
-    params_a = list(params_a) + [limit]
-    con = get_connection()
-    try:
-        rows = con.execute(
-            f"SELECT * FROM awards_clean_all WHERE {wf_a} ORDER BY award_date DESC NULLS LAST LIMIT ?",
-            params_a,
-        ).fetchall()
-        cols = [d[0] for d in con.description]
-        return [dict(zip(cols, r)) for r in rows]
-    finally:
-        con.close()
+    """Awards, newest first; same cursor= / fields= paging as /api/tenders."""
+    _, _, wf_a, params_a, _, _ = _wf_params(years, from_month, to_month, buyer)
+    return _list_rows("awards", "awards_clean_all", "award_date", "award_id", wf_a, params_a, limit, cursor, fields, fmt)
 
 
 @app.get("/api/data-reference")
+@cached("data-reference")
 def get_data_reference():
-    """Manifest info for data attribution."""
-    if not os.path.isfile(config.MANIFEST_PATH):
-        return {}
-    with open(config.MANIFEST_PATH, "r", encoding="utf-8") as f:
-        ref = json.load(f)
-    if not ref.get("files"):
+    """Manifest info for data attribution (summary stored in dataset_meta at ingest)."""
+    meta = get_meta() if db_exists() else None
+    if not meta or not meta["manifest_files"]:
         return {}
-    files = ref["files"]
-    downloaded_dates = [v.get("downloaded_at") for v in files.values() if v.get("downloaded_at")]
-    package_dates = [v.get("package_published_date") for v in files.values() if v.get("package_published_date")]
-    last_downloaded = max(downloaded_dates) if downloaded_dates else None
+    last_downloaded = meta["last_downloaded"]
     from datetime import datetime
     try:
         dt = datetime.fromisoformat(last_downloaded.replace("Z", "+00:00"))
         last_downloaded_label = dt.strftime("%d/%m/%Y %H:%M UTC")
     except Exception:
         last_downloaded_label = last_downloaded or ""
-    min_pub = min(package_dates)[:10] if package_dates else ""
-    max_pub = max(package_dates)[:10] if package_dates else ""
+    min_pub = (meta["package_published_min"] or "")[:10]
+    max_pub = (meta["package_published_max"] or "")[:10]
     return {
         "last_downloaded": last_downloaded_label,
         "package_date_range": f"{min_pub} — {max_pub}" if min_pub else "",
@@ -583,3 +934,70 @@ def get_data_reference():
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/api/ready")
+def ready():
+    """
+    Readiness for the load balancer: 503 until the startup warm-up has run the default-filter
+    queries, and while the last warm-up failed outright (every request errored). A warm-up with
+    some failed requests is status "degraded" (200, errors listed) and is retried. Re-warming
+    after a DB swap is reported (status "warming") but keeps the previous outcome's status code,
+    since the instance keeps serving normally meanwhile.
+    """
+    snapshot = warmup.state.snapshot()
+    return FastJSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@app.get("/api/pool-stats")
+def get_pool_stats():
+    """Shared DuckDB handle (generation, open cursors, leases, reopens) and the query executor queue."""
+    return {**pool_stats(), "executor": query_executor.stats()}
+
+
+@app.get("/api/cache-stats")
+def get_cache_stats():
+    """
+    Response cache size, hit/miss/eviction counters and the data version it holds; single-flight
+    executions vs coalesced misses (queries saved); HTTP 304 counters.
+    """
+    return {**response_cache.stats(), "single_flight": single_flight.stats(), "http": http_cache_stats()}
+
+
+@app.get("/api/serialization-stats")
+def get_serialization_stats():
+    """Time spent encoding responses (JSON / columns / Arrow / Parquet) per endpoint; cache hits are not encoded."""
+    return serialization_stats()
+
+
+@app.get("/api/compression-stats")
+def get_compression_stats():
+    """gzip / brotli bodies per endpoint: times compressed vs served (cache hits reuse bytes), ratio and CPU ms."""
+    return compression_stats()
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus text format: request latency/status/bytes/rows per route and filter shape,
+    DuckDB statement latency per route and table, slow queries (API_SLOW_QUERY_MS), and
+    response cache / executor / HTTP 304 gauges.
+    """
+    cache = response_cache.stats()
+    flights = single_flight.stats()
+    executor = query_executor.stats()
+    http = http_cache_stats()
+    gauges = {
+        "api_cache_entries": ("Response cache entries.", cache["entries"]),
+        "api_cache_hits": ("Response cache hits since start.", cache["hits"]),
+        "api_cache_misses": ("Response cache misses since start.", cache["misses"]),
+        "api_cache_evictions": ("Response cache LRU evictions since start.", cache["evictions"]),
+        "api_singleflight_in_flight": ("Distinct cache misses being computed.", flights["in_flight"]),
+        "api_singleflight_executions": ("Cache misses computed since start.", flights["executions"]),
+        "api_singleflight_coalesced": ("Cache misses that waited on an identical in-flight one (executions saved).", flights["coalesced"]),
+        "api_executor_running": ("Queries running on the executor.", executor["running"]),
+        "api_executor_waiting": ("Queries waiting for an executor worker.", executor["waiting"]),
+        "api_executor_rejected": ("Requests rejected with 503 since start.", executor["rejected"]),
+        "api_http_not_modified": ("304 responses since start.", http["not_modified"]),
+    }
+    return PlainTextResponse(exposition(gauges), media_type="text/plain; version=0.0.4")
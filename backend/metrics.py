@@ -0,0 +1,184 @@
+"""
+Request and DuckDB query metrics for /api/metrics (Prometheus text format), plus an optional
+slow-query log. MetricsMiddleware times every request and labels it by route and filter shape
+(which of years / from_month / to_month were given); get_connection() cursors report each SQL
+statement's execution time under the same labels via a context variable.
+Slow-query log: set API_SLOW_QUERY_MS (e.g. 200) to log statements slower than that.
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("backend.slow_query")
+
+SLOW_QUERY_MS = float(os.getenv("API_SLOW_QUERY_MS", "0"))  # 0 = off
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+FILTER_PARAMS = ("buyer", "years", "from_month", "to_month")
+
+# (endpoint, filter shape) of the request being served; read by cursors and the response cache.
+request_labels: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar(
+    "request_labels", default=("none", "none")
+)
+
+_FROM_TABLE = re.compile(r"\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def filter_shape(query_params) -> str:
+    """'years+from_month', 'none', ... - bounded label instead of the raw filter values."""
+    present = [p for p in FILTER_PARAMS if query_params.get(p)]
+    return "+".join(present) or "none"
+
+
+def statement_table(sql: str) -> str:
+    """First table in FROM (skipping CTE names isn't worth it: the first FROM is usually the real table)."""
+    m = _FROM_TABLE.search(sql)
+    return m.group(1).lower() if m else "none"
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last = +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Counters and histograms keyed by label tuples; rendered on demand."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._meta: dict[str, tuple[str, str, tuple[str, ...]]] = {}  # name -> (type, help, label names)
+
+    def _declare(self, name: str, kind: str, help_text: str, labels: tuple[str, ...]) -> None:
+        self._meta.setdefault(name, (kind, help_text, labels))
+
+    def observe(self, name: str, help_text: str, labels: dict, value: float, buckets=REQUEST_BUCKETS) -> None:
+        key = tuple(labels.values())
+        with self._lock:
+            self._declare(name, "histogram", help_text, tuple(labels))
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name: str, help_text: str, labels: dict, value: float = 1) -> None:
+        key = tuple(labels.values())
+        with self._lock:
+            self._declare(name, "counter", help_text, tuple(labels))
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in sorted(self._meta.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for key, value in sorted(self._counters.get(name, {}).items()):
+                        lines.append(f"{name}{_labels(label_names, key)} {_num(value)}")
+                    continue
+                for key, hist in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip((*hist.buckets, "+Inf"), hist.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _num(bound)
+                        lines.append(f"{name}_bucket{_labels((*label_names, 'le'), (*key, le))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(label_names, key)} {_num(hist.sum)}")
+                    lines.append(f"{name}_count{_labels(label_names, key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+
+def observe_query(sql: str, params, seconds: float) -> None:
+    """Called by db cursors after each execute()."""
+    endpoint, shape = request_labels.get()
+    table = statement_table(sql)
+    labels = {"endpoint": endpoint, "filter": shape, "table": table}
+    registry.observe(
+        "duckdb_query_duration_seconds", "DuckDB statement execution time.", labels, seconds, QUERY_BUCKETS
+    )
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        registry.inc("duckdb_slow_queries_total", f"Statements slower than API_SLOW_QUERY_MS ({SLOW_QUERY_MS:g} ms).", labels)
+        slow_query_logger.warning(
+            "SLOW_QUERY ms=%.1f endpoint=%s filter=%s table=%s sql=%s params=%s",
+            seconds * 1000, endpoint, shape, table, _WHITESPACE.sub(" ", sql).strip(), params,
+        )
+
+
+def observe_rows(rows: int | None) -> None:
+    """Rows in a response body (list length, page size, Arrow num_rows); called by the response cache."""
+    if rows is None:
+        return
+    endpoint, shape = request_labels.get()
+    registry.inc("api_response_rows_total", "Rows returned in response bodies.", {"endpoint": endpoint, "filter": shape}, rows)
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if not path.startswith("/api/"):
+            return await call_next(request)
+        shape = filter_shape(request.query_params)
+        token = request_labels.set((path, shape))
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            request_labels.reset(token)
+            # Unknown paths share one label so scanners can't blow up the series count.
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            labels = {"endpoint": endpoint, "filter": shape}
+            registry.observe("api_request_duration_seconds", "API request latency.", labels, elapsed)
+            registry.inc("api_requests_total", "API requests by status.", {**labels, "status": str(status)})
+            if status == 200 or status == 304:
+                size = response.headers.get("content-length")
+                if size is not None:
+                    registry.inc("api_response_bytes_total", "Response body bytes sent.", labels, int(size))
+
+
+def exposition(gauges: dict[str, tuple[str, float]]) -> str:
+    """Prometheus text: registry series plus point-in-time gauges {name: (help, value)}."""
+    lines = [registry.render().rstrip("\n")]
+    for name, (help_text, value) in gauges.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_num(value)}"]
+    return "\n".join(lines) + "\n"
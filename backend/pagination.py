@@ -0,0 +1,49 @@
+"""
+Keyset (cursor) pagination helpers for the row-listing endpoints (/api/tenders, /api/awards).
+Rows are ordered by (date DESC NULLS LAST, id DESC); a cursor is the opaque, URL-safe encoding
+of the last row's key, so each page is a range predicate + LIMIT instead of an OFFSET scan.
+"""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(kind: str, date_value, id_value) -> str:
+    raw = json.dumps([kind, date_value, id_value], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(kind: str, token: str) -> tuple:
+    """(date, id) from a cursor issued by the same endpoint; InvalidCursor otherwise."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        cursor_kind, date_value, id_value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if cursor_kind != kind or not isinstance(id_value, str):
+        raise InvalidCursor(f"Cursor was not issued by /api/{kind}")
+    return date_value, id_value
+
+
+def keyset_predicate(date_col: str, id_col: str, date_value, id_value) -> tuple[str, list]:
+    """Rows strictly after (date_value, id_value) in `date DESC NULLS LAST, id DESC` order."""
+    if date_value is None:
+        return f"({date_col} IS NULL AND {id_col} < ?)", [id_value]
+    return (
+        f"({date_col} < ? OR ({date_col} = ? AND {id_col} < ?) OR {date_col} IS NULL)",
+        [date_value, date_value, id_value],
+    )
+
+
+def parse_fields(fields: list[str] | None, available: list[str]) -> list[str] | None:
+    """Repeated and/or comma-separated fields= -> validated column list (None = all columns)."""
+    if not fields:
+        return None
+    wanted = [f.strip() for item in fields for f in item.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid: {', '.join(available)}")
+    return list(dict.fromkeys(wanted))
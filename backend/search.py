@@ -0,0 +1,121 @@
+"""
+/api/search: keyword search over tender and award titles (search_docs). Ranked by BM25 with the
+full-text index built at ingest (DuckDB fts extension: Spanish stemming, accents folded) when this
+process can load fts and the DB has the index; otherwise falls back to a title scan where every
+query word must appear (accent/case-insensitive), newest first. The mode is checked per data version.
+"""
+import logging
+import threading
+
+from backend.db import data_version, get_connection
+from backend.formats import columnar, fetch_arrow, table_response
+from backend.pagination import decode_cursor, encode_cursor, keyset_predicate
+from backend.supplier_search import normalize
+
+logger = logging.getLogger(__name__)
+
+FTS_SCHEMA = "fts_main_search_docs"
+KINDS = ("tender", "award")
+_COLUMNS = "doc_id, kind, nog, title, doc_date, procurement_method_details, supplier_name, amount, month"
+
+_lock = threading.Lock()
+_state: tuple[str, dict] = ("", {})  # (data version, {"bm25": bool, "stopwords": set})
+
+
+def _probe() -> dict:
+    with get_connection() as con:
+        try:
+            con.execute("LOAD fts")
+            loaded = True
+        except Exception:
+            loaded = False
+        indexed = con.execute(
+            "SELECT COUNT(*) FROM duckdb_schemas() WHERE database_name = current_database() AND schema_name = ?",
+            [FTS_SCHEMA],
+        ).fetchone()[0] > 0
+        stopwords = {r[0] for r in con.execute("SELECT sw FROM search_stopwords").fetchall()}
+    return {"bm25": loaded and indexed, "stopwords": stopwords}
+
+
+def _current() -> dict:
+    global _state
+    version = data_version()
+    current = _state
+    if current[0] == version:
+        return current[1]
+    with _lock:
+        if _state[0] != version:
+            _state = (version, _probe())
+            if not _state[1]["bm25"]:
+                logger.info("Search: no fts extension or index, scanning titles (data version %s)", version)
+        return _state[1]
+
+
+def query_terms(q: str, stopwords: set[str]) -> list[str]:
+    """Normalized, de-duplicated query words without stopwords."""
+    return list(dict.fromkeys(w for w in normalize(q).split() if w not in stopwords))
+
+
+def search(q: str, where: str, params: list, limit: int, cursor: str | None, fmt: str = "json"):
+    """
+    One page of hits for q within `where` (a search_docs filter), best first; ValueError on a bad cursor.
+    {"items", "next_cursor", "mode": "bm25" | "scan"}; format=columns returns {"columns", "data",
+    "next_cursor", "mode"}; Arrow/Parquet pages carry next cursor and mode in the X-Next-Cursor and
+    X-Search-Mode headers.
+    """
+    after = None
+    if cursor:
+        score, doc_id = decode_cursor("search", cursor)
+        after = (score, int(doc_id))
+    state = _current()
+    mode = "bm25" if state["bm25"] else "scan"
+    terms = query_terms(q, state["stopwords"])
+    params = list(params)
+    if not terms:
+        # Only stopwords: no hits, but the same columns (an empty Arrow table still has a schema).
+        source = f"SELECT {_COLUMNS}, CAST(NULL AS DOUBLE) AS score FROM search_docs WHERE FALSE"
+        params = []
+    elif mode == "bm25":
+        source = f"""
+            SELECT {_COLUMNS}, ROUND({FTS_SCHEMA}.match_bm25(doc_id, ?, conjunctive := 1), 6) AS score
+            FROM search_docs
+            WHERE {where}
+        """
+        params = [" ".join(terms)] + params
+    else:
+        source = f"""
+            SELECT {_COLUMNS}, CAST(0 AS DOUBLE) AS score
+            FROM search_docs
+            WHERE {where}{" AND strip_accents(lower(title)) LIKE ?" * len(terms)}
+        """
+        params += [f"%{t}%" for t in terms]
+    outer = "score IS NOT NULL"
+    if after is not None:
+        pred, pred_params = keyset_predicate("score", "doc_id", *after)
+        outer, params = f"{outer} AND {pred}", params + pred_params
+    with get_connection() as con:
+        cur = con.execute(
+            f"""
+            SELECT * FROM ({source}) hits
+            WHERE {outer}
+            ORDER BY score DESC, doc_id DESC
+            LIMIT ?
+            """,
+            params + [limit + 1],
+        )
+        if fmt in ("arrow", "parquet"):
+            table = fetch_arrow(cur)
+            headers = {"X-Search-Mode": mode}
+            if table.num_rows > limit:
+                last = limit - 1
+                headers["X-Next-Cursor"] = encode_cursor("search", table["score"][last].as_py(), str(table["doc_id"][last].as_py()))
+            return table_response(table.slice(0, limit), fmt, "search", headers=headers)
+        cols = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("search", rows[-1][-1], str(rows[-1][0]))
+        if fmt == "columns":
+            return {**columnar(cur, rows), "next_cursor": next_cursor, "mode": mode}
+    return {"items": [dict(zip(cols, r)) for r in rows], "next_cursor": next_cursor, "mode": mode}
@@ -0,0 +1,106 @@
+"""
+Multi-worker API server: uvicorn with N worker processes, each with its own read-only DuckDB handle
+on the served DB, so JSON building and query dispatch use N interpreters instead of one GIL.
+Usage: python -m backend.serve [--workers N] [--host 0.0.0.0] [--port 8000]
+
+Only this supervisor process watches for a new DB (published generation or `mv` over lake.duckdb,
+as single-process mode does). It checks the new file once (backend.db.validate_db, the same check
+scripts/publish_generation.py runs), then rewrites the serving signal (API_SERVING_SIGNAL, default
+data/serving.json): DB path, file identity and a switch time API_SWITCH_DELAY_SECONDS ahead. Workers poll that small file instead of the DB, open the new
+generation when it appears and start serving it at the switch time, all together: every worker
+answers with the same data version (ETag, response cache) at any moment.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import config
+from backend.db import SWAP_CHECK_SECONDS, file_identity, read_signal, validate_db
+
+logger = logging.getLogger("backend.serve")
+
+SIGNAL_PATH = os.getenv("API_SERVING_SIGNAL") or os.path.join(config.DATA_DIR, "serving.json")
+# Time workers get to open (and page in) a new generation before they all switch to it.
+SWITCH_DELAY_SECONDS = float(os.getenv("API_SWITCH_DELAY_SECONDS", "2"))
+
+
+def write_signal(path: str, seq: int, db_path: str, identity: tuple, switch_at: float) -> None:
+    """Atomically replace the serving signal (readers never see a partial file)."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"seq": seq, "path": db_path, "identity": list(identity), "switch_at": switch_at}, f)
+    os.replace(tmp, path)
+
+
+class SignalWriter:
+    """Checks the served DB every SWAP_CHECK_SECONDS and signals each new one that passes validate_db."""
+
+    def __init__(self, signal_path: str = SIGNAL_PATH, delay: float = SWITCH_DELAY_SECONDS):
+        self.signal_path = signal_path
+        self.delay = delay
+        previous = read_signal(signal_path)
+        self.seq = previous["seq"] if previous else 0
+        self.signalled: tuple | None = None
+        self.rejected: tuple | None = None
+        self._stop = threading.Event()
+
+    def check(self, switch_now: bool = False) -> bool:
+        """Signal the served DB if it changed and is servable; True if a new signal was written."""
+        path = config.served_db_path()
+        identity = file_identity(path)
+        if identity is None or (path, identity) in (self.signalled, self.rejected):
+            return False
+        problems = validate_db(path)
+        if problems:
+            self.rejected = (path, identity)
+            logger.error("New DB %s not signalled (%s); workers keep serving the previous one", path, "; ".join(problems))
+            return False
+        self.seq += 1
+        switch_at = time.time() if switch_now else time.time() + self.delay
+        write_signal(self.signal_path, self.seq, path, identity, switch_at)
+        self.signalled = (path, identity)
+        logger.info("Signalled %s (seq %s); workers switch in %.1fs", path, self.seq, switch_at - time.time())
+        return True
+
+    def run(self) -> None:
+        while not self._stop.wait(max(SWAP_CHECK_SECONDS, 0.2)):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Serving signal check failed")
+
+    def start(self) -> None:
+        threading.Thread(target=self.run, name="serving-signal", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "0")) or os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    import uvicorn
+
+    # Inherited by the workers: follow the signal, and share the cores instead of each taking all of them.
+    os.environ["API_SERVING_SIGNAL"] = os.path.abspath(SIGNAL_PATH)
+    os.environ.setdefault("DUCKDB_THREADS", str(max(1, (os.cpu_count() or 1) // args.workers)))
+    writer = SignalWriter(os.environ["API_SERVING_SIGNAL"])
+    writer.check(switch_now=True)
+    writer.start()
+    try:
+        uvicorn.run("backend.main:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+    finally:
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+In-memory supplier name index for /api/supplier-search (typeahead). Built per buyer from the
+awards_by_month_supplier rollup once per data version, then queried without touching DuckDB.
+Matching ignores case and accents ("constructora perez" finds "CONSTRUCTORA PÉREZ"):
+whole-name prefix first, then every query word as a word prefix, then trigram similarity for typos.
+"""
+import bisect
+import logging
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from backend.db import data_version, get_connection, month_filter
+
+logger = logging.getLogger(__name__)
+
+# Minimum share of the query's trigrams a name must contain to count as a fuzzy match.
+MIN_TRIGRAM_SIMILARITY = 0.4
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents, collapse punctuation/whitespace to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    no_marks = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", no_marks.casefold()).strip()
+
+
+def trigrams(norm: str) -> set[str]:
+    """Trigrams of each word, padded like pg_trgm ("  perez " -> "  p", " pe", "per", ...)."""
+    grams = set()
+    for word in norm.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SupplierIndex:
+    """Sorted names for prefix lookups plus a trigram -> name ids inverted index."""
+
+    def __init__(self, rows: list[tuple[str, int, float]]):
+        # rows: (display name, awards count, total amount)
+        self.names = [r[0] for r in rows]
+        self.awards = [r[1] for r in rows]
+        self.totals = [r[2] for r in rows]
+        norms = [normalize(name) for name in self.names]
+        self._full = sorted((n, i) for i, n in enumerate(norms))
+        self._words = sorted({(w, i) for i, n in enumerate(norms) for w in n.split()})
+        self._trigram_ids: dict[str, list[int]] = defaultdict(list)
+        for i, n in enumerate(norms):
+            for gram in trigrams(n):
+                self._trigram_ids[gram].append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _prefix_ids(entries: list[tuple[str, int]], prefix: str) -> set[int]:
+        out = set()
+        pos = bisect.bisect_left(entries, (prefix, -1))
+        while pos < len(entries) and entries[pos][0].startswith(prefix):
+            out.add(entries[pos][1])
+            pos += 1
+        return out
+
+    def search(self, q: str, limit: int = 10) -> list[dict]:
+        norm = normalize(q)
+        if not norm:
+            return []
+        # (tier, -similarity, -total amount, name) ranks exact-ish matches first, then bigger suppliers.
+        scored: dict[int, tuple] = {}
+
+        def add(ids, tier: int, similarity: float = 1.0) -> None:
+            for i in ids:
+                key = (tier, -similarity, -self.totals[i], self.names[i])
+                if i not in scored or key < scored[i]:
+                    scored[i] = key
+
+        add(self._prefix_ids(self._full, norm), 0)
+        words = norm.split()
+        word_hits = None
+        for w in words:
+            ids = self._prefix_ids(self._words, w)
+            word_hits = ids if word_hits is None else word_hits & ids
+            if not word_hits:
+                break
+        add(word_hits or (), 1)
+
+        if len(scored) < limit and len(norm) >= 3:
+            query_grams = trigrams(norm)
+            counts: dict[int, int] = defaultdict(int)
+            for gram in query_grams:
+                for i in self._trigram_ids.get(gram, ()):
+                    counts[i] += 1
+            for i, shared in counts.items():
+                similarity = shared / len(query_grams)
+                if similarity >= MIN_TRIGRAM_SIMILARITY:
+                    add((i,), 2, similarity)
+
+        best = sorted(scored.items(), key=lambda item: item[1])[:limit]
+        return [
+            {"name": self.names[i], "adjudicaciones": self.awards[i], "total_q": round(self.totals[i], 2)}
+            for i, _ in best
+        ]
+
+
+_lock = threading.Lock()
+_indexes: tuple[str, dict[str | None, SupplierIndex]] = ("", {})  # (data version, buyer -> index)
+
+
+def _build(buyer: str | None) -> SupplierIndex:
+    where, params = month_filter("", None, None, None, buyer)
+    with get_connection() as con:
+        rows = con.execute(
+            f"""
+            SELECT
+                COALESCE(supplier_name, '(Sin nombre)') AS name,
+                CAST(SUM(awards_count) AS BIGINT) AS adjudicaciones,
+                COALESCE(SUM(total_amount), 0) AS total_q
+            FROM awards_by_month_supplier
+            WHERE {where}
+            GROUP BY supplier_name
+            """,
+            params,
+        ).fetchall()
+    return SupplierIndex([(r[0], r[1], float(r[2])) for r in rows])
+
+
+def get_index(buyer: str | None) -> SupplierIndex:
+    """Index of buyer's suppliers (None = every buyer) for the current data version, rebuilt (once) after a swap."""
+    global _indexes
+    version = data_version()
+    current_version, indexes = _indexes
+    if current_version == version and buyer in indexes:
+        return indexes[buyer]
+    with _lock:
+        if _indexes[0] != version:
+            _indexes = (version, {})
+        indexes = _indexes[1]
+        if buyer in indexes:
+            return indexes[buyer]
+        index = _build(buyer)
+        # Unknown buyer= values are not kept, so arbitrary names can't grow the dict.
+        if len(index):
+            indexes[buyer] = index
+            logger.info("Supplier search index built: %d names (buyer %s, data version %s)", len(index), buyer, version)
+        return index
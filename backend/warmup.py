@@ -0,0 +1,213 @@
+"""
+Warm-up for the API: after startup and after every DB swap, replay the requests the portal makes
+on first load (default filter = every year) through the app itself, so DuckDB has read the file
+and response_cache / the supplier search index are filled before real traffic arrives.
+Progress is reported by /api/ready; a warm-up with failed requests is reported as degraded (or
+failed, if none succeeded) and retried every WARMUP_POLL_SECONDS until it runs clean.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+from backend.db import data_version, resolve_buyer
+from backend.supplier_search import get_index as get_supplier_index
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("API_WARMUP", "1") not in ("0", "false", "no")
+# How often (seconds) the warm-up thread checks for a new data version.
+WARMUP_POLL_SECONDS = float(os.getenv("API_WARMUP_POLL_SECONDS", "5"))
+
+# (path, extra query) as the frontend sends them; years= (all years) is added unless noted.
+_NO_YEARS = {"/api/filters", "/api/data-reference", "/api/summary-by-year"}
+WARMUP_REQUESTS = [
+    ("/api/filters", {}),
+    ("/api/data-reference", {}),
+    ("/api/summary-by-year", {}),
+    ("/api/kpis", {}),
+    ("/api/dashboard", {}),
+    ("/api/dashboard", {"sections": "suppliers,concentration,supplier-names"}),
+    ("/api/dashboard", {"sections": "bands,trend"}),
+    ("/api/concentration", {}),
+    ("/api/modalities", {}),
+    ("/api/top-suppliers-by-modality", {}),
+    ("/api/low-competition", {"limit": "50"}),
+    ("/api/tenders", {"limit": "100"}),
+    ("/api/awards", {"limit": "100"}),
+]
+
+
+class WarmupState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = "disabled" if not WARMUP_ENABLED else "pending"
+        self.version: str | None = None  # data version the last completed warm-up ran on
+        self.outcome: str | None = None  # last completed warm-up: "ready", "degraded" or "failed"
+        self.warmups = 0
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.duration_ms: float | None = None
+        self.done = 0
+        self.total = 0
+        self.errors: list[str] = []
+
+    def begin(self, total: int) -> None:
+        with self._lock:
+            self.status = "warming"
+            self.started_at = time.time()
+            self.finished_at = None
+            self.done = 0
+            self.total = total
+            self.errors = []
+
+    def step(self, error: str | None = None) -> None:
+        with self._lock:
+            self.done += 1
+            if error:
+                self.errors.append(error)
+
+    def finish(self, version: str) -> None:
+        """Outcome "ready" (no errors), "failed" (every step failed) or "degraded" (some did)."""
+        with self._lock:
+            if not self.errors:
+                self.outcome = "ready"
+            elif len(self.errors) >= self.done:
+                self.outcome = "failed"
+            else:
+                self.outcome = "degraded"
+            self.status = self.outcome
+            self.version = version
+            self.warmups += 1
+            self.finished_at = time.time()
+            self.duration_ms = round((self.finished_at - self.started_at) * 1000, 1)
+
+    @property
+    def ready(self) -> bool:
+        """True once a warm-up has completed without failing outright (or warm-up is disabled)."""
+        return self.status == "disabled" or self.outcome in ("ready", "degraded")
+
+    @property
+    def needs_retry(self) -> bool:
+        """The last warm-up had errors: run it again even if the data version hasn't changed."""
+        return self.outcome in ("degraded", "failed")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "status": self.status,
+                "outcome": self.outcome,
+                "warmed_version": self.version,
+                "warmups": self.warmups,
+                "progress": {"done": self.done, "total": self.total},
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration_ms": self.duration_ms,
+                "errors": list(self.errors),
+            }
+
+
+state = WarmupState()
+
+
+async def _asgi_get(app, path: str, query: str) -> tuple[int, bytes]:
+    """GET path?query through the whole ASGI app (middleware, response cache); (status, body)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"user-agent", b"api-warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    status = 0
+    body = []
+    sent_request = False
+    complete = asyncio.Event()
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                complete.set()
+
+    await app(scope, receive, send)
+    return status, b"".join(body)
+
+
+async def _warm(app, version: str) -> None:
+    state.begin(len(WARMUP_REQUESTS) + 1)
+    logger.info("API warm-up started (data version %s)", version)
+    years: list[str] = []
+    for path, extra in WARMUP_REQUESTS:
+        params = list(extra.items())
+        if path not in _NO_YEARS:
+            params = [("years", y) for y in years] + params
+        try:
+            status, body = await _asgi_get(app, path, urlencode(params))
+            if path == "/api/filters" and status == 200:
+                years = json.loads(body).get("years", [])
+            state.step(None if status == 200 else f"{path}: HTTP {status}")
+        except Exception as e:
+            logger.exception("Warm-up request %s failed", path)
+            state.step(f"{path}: {e}")
+    try:
+        await asyncio.to_thread(get_supplier_index, resolve_buyer(None))
+        state.step()
+    except Exception as e:
+        logger.exception("Warm-up of supplier search index failed")
+        state.step(f"supplier-search index: {e}")
+    state.finish(version)
+    logger.info("API warm-up finished in %s ms (%d errors)", state.duration_ms, len(state.errors))
+
+
+def _run(app, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            version = data_version()
+            if version != state.version or state.needs_retry:
+                asyncio.run(_warm(app, version))
+        except Exception:
+            logger.exception("API warm-up failed")
+        stop.wait(WARMUP_POLL_SECONDS)
+
+
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+
+
+def start(app) -> None:
+    """Warm up in a background thread now and again whenever the data version changes."""
+    global _thread
+    if not WARMUP_ENABLED or _thread is not None:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, args=(app, _stop), name="api-warmup", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    _thread = None
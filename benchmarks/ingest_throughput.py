@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Ingest throughput: generates synthetic OCDS months (benchmarks/ocds_generator.py) in a temp data
+directory, then times scripts/ingest.py month by month and scripts/ingest_all.py end to end
+(including the final table sort), each into a fresh lake_next.duckdb. The scripts run as
+subprocesses with DATA_DIR pointing at the temp directory, exactly as cron runs them.
+Usage: python benchmarks/ingest_throughput.py [generator options] [--repeat 1] [--output PATH]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.ocds_generator import add_arguments, generate, month_range
+from benchmarks.results import write_results
+
+
+def _run(args: list[str], data_dir: str) -> float:
+    env = {**os.environ, "DATA_DIR": data_dir}
+    started = time.perf_counter()
+    r = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if r.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{(r.stderr or r.stdout).strip()}")
+    return elapsed
+
+
+def _fresh_db(data_dir: str) -> str:
+    db_path = os.path.join(data_dir, "lake_next.duckdb")
+    for suffix in ("", ".wal"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    return db_path
+
+
+def _ingested_rows(db_path: str) -> dict:
+    import duckdb
+
+    con = duckdb.connect(db_path, read_only=True)
+    try:
+        tenders = con.execute("SELECT COUNT(*) FROM tenders_clean_all").fetchone()[0]
+        awards = con.execute("SELECT COUNT(*) FROM awards_clean_all").fetchone()[0]
+    finally:
+        con.close()
+    return {"tenders": tenders, "awards": awards, "db_bytes": os.path.getsize(db_path)}
+
+
+def build_lake(data_dir: str, args) -> dict:
+    """Generate months into data_dir and ingest them into data_dir/lake.duckdb (for the load harness)."""
+    months = month_range(args.from_month, args.to_month)
+    generated = generate(data_dir, months, args)
+    _fresh_db(data_dir)
+    years = sorted({m[:4] for m in months})
+    _run(["scripts/ingest_all.py", "--from-year", years[0], "--to-year", years[-1]], data_dir)
+    os.replace(os.path.join(data_dir, "lake_next.duckdb"), os.path.join(data_dir, "lake.duckdb"))
+    return {k: v for k, v in generated.items() if k != "files"}
+
+
+def _throughput(seconds: float, records: int, input_bytes: int) -> dict:
+    return {
+        "seconds": round(seconds, 3),
+        "records_per_s": round(records / seconds, 1) if seconds else 0.0,
+        "mb_per_s": round(input_bytes / 1e6 / seconds, 3) if seconds else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per script; the fastest is reported")
+    parser.add_argument("--output", help="results JSON (default benchmarks/results/ingest-<commit>.json)")
+    args = parser.parse_args()
+
+    months = month_range(args.from_month, args.to_month)
+    data_dir = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        started = time.perf_counter()
+        generated = generate(data_dir, months, args)
+        generate_s = time.perf_counter() - started
+        print(
+            f"Generated {generated['records']:,} records ({generated['bytes'] / 1e6:.1f} MB) "
+            f"over {len(months)} months in {generate_s:.1f}s"
+        )
+        records, input_bytes = generated["records"], generated["bytes"]
+
+        ingest_one = ingest_all = None
+        per_month: list[float] = []
+        for _ in range(max(1, args.repeat)):
+            db_path = _fresh_db(data_dir)
+            run_months = [_run(["scripts/ingest.py", m], data_dir) for m in months]
+            if ingest_one is None or sum(run_months) < ingest_one:
+                ingest_one, per_month = sum(run_months), run_months
+            db_path = _fresh_db(data_dir)
+            years = sorted({m[:4] for m in months})
+            elapsed = _run(
+                ["scripts/ingest_all.py", "--from-year", years[0], "--to-year", years[-1]], data_dir
+            )
+            ingest_all = elapsed if ingest_all is None else min(ingest_all, elapsed)
+        rows = _ingested_rows(db_path)
+
+        results = {
+            "generated": {k: v for k, v in generated.items() if k != "files"},
+            "ingest_py": {
+                **_throughput(ingest_one, records, input_bytes),
+                "month_seconds_max": round(max(per_month), 3),
+                "month_seconds_mean": round(ingest_one / len(per_month), 3),
+            },
+            "ingest_all_py": _throughput(ingest_all, records, input_bytes),
+            "ingested": rows,
+        }
+        print(f"ingest.py (per month): {results['ingest_py']}")
+        print(f"ingest_all.py:         {results['ingest_all_py']}")
+        print(f"Ingested: {rows}")
+        params = {k: v for k, v in vars(args).items() if k != "output"}
+        print(f"Results: {write_results('ingest', params, results, args.output)}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
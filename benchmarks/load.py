@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Load harness for the API: replays portal traffic and reports p50/p95/p99 latency and requests/s
+per endpoint. Each simulated visit loads the dashboard the way the frontend does (the warm-up
+request list, see backend/warmup.py) under a random filter (all years, one year, two years or
+a month range), then drills into a few suppliers (Zipf-weighted: big suppliers are opened more
+often), a supplier search and the next low-competition page. --buyer sends buyer= with every
+request (e.g. one buyer of a --synthetic --buyers N lake, or 'all').
+
+Targets backend/main.py in-process through httpx's ASGI transport (default; same event loop as
+the clients, so compare numbers between commits rather than with production), or a running
+server with --url. --synthetic builds a generated lake first (benchmarks/ocds_generator.py options).
+Usage: python benchmarks/load.py [--url http://localhost:8000] [--data-dir DIR | --synthetic ...]
+           [--buyer NAME|all] [--concurrency 16] [--duration 30] [--cache-entries N] [--output PATH]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.ocds_generator import add_arguments as add_generator_arguments
+from benchmarks.results import latency_summary, write_results
+
+# Drill-downs per visit after the dashboard load.
+SUPPLIER_DETAILS_PER_VISIT = 3
+SEARCH_PREFIX_LENGTHS = (3, 5, 8)
+
+
+class Traffic:
+    """Builds visits (lists of (path, query params)) from the dataset's years and suppliers."""
+
+    def __init__(self, years: list[str], suppliers: list[str], rng: random.Random, buyer: list[tuple[str, str]]):
+        from backend.warmup import _NO_YEARS, WARMUP_REQUESTS
+
+        self.years = years
+        self.suppliers = suppliers
+        self.rng = rng
+        self.buyer = buyer
+        self.dashboard = WARMUP_REQUESTS
+        self.no_years = _NO_YEARS
+        # /api/suppliers is ordered by amount: rank r gets weight 1/r.
+        self._weights = [1 / r for r in range(1, len(suppliers) + 1)]
+
+    def _filter(self) -> list[tuple[str, str]]:
+        shape = self.rng.random()
+        if shape < 0.4 or not self.years:
+            return [("years", y) for y in self.years]
+        if shape < 0.7:
+            return [("years", self.rng.choice(self.years))]
+        if shape < 0.85 and len(self.years) > 1:
+            return [("years", y) for y in self.rng.sample(self.years, 2)]
+        year = self.rng.choice(self.years)
+        start = self.rng.randint(1, 10)
+        return [("from_month", f"{year}-{start:02d}"), ("to_month", f"{year}-{start + 2:02d}")]
+
+    def visit(self) -> list[tuple[str, list[tuple[str, str]]]]:
+        filt = self._filter()
+        out = []
+        for path, extra in self.dashboard:
+            params = self.buyer + list(extra.items())
+            if path not in self.no_years:
+                params = filt + params
+            out.append((path, params))
+        filt = self.buyer + filt
+        if self.suppliers:
+            for name in self.rng.choices(self.suppliers, weights=self._weights, k=SUPPLIER_DETAILS_PER_VISIT):
+                out.append(("/api/supplier-detail", [("supplier", name)] + filt))
+            name = self.rng.choice(self.suppliers)
+            query = [("q", name[: self.rng.choice(SEARCH_PREFIX_LENGTHS)])]
+            out.append(("/api/supplier-search", self.buyer + query))
+        out.append(("/api/low-competition", filt + [("limit", "50"), ("cursor", "next")]))
+        return out
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def add(self, path: str, ms: float, status: int | None) -> None:
+        if status is None:
+            self.errors[path] += 1
+            return
+        self.latencies[path].append(ms)
+        self.statuses[path][status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        every = []
+        for path in sorted(self.latencies.keys() | self.errors.keys()):
+            ms = self.latencies.get(path, [])
+            every.extend(ms)
+            endpoints[path] = {
+                **latency_summary(ms),
+                "rps": round(len(ms) / elapsed, 2),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[path].items())},
+                "errors": self.errors.get(path, 0),
+            }
+        return {
+            "duration_s": round(elapsed, 3),
+            "total": {**latency_summary(every), "rps": round(len(every) / elapsed, 2), "errors": sum(self.errors.values())},
+            "endpoints": endpoints,
+        }
+
+
+async def _get(client, recorder: Recorder, path: str, params: list) -> dict | None:
+    started = time.perf_counter()
+    try:
+        r = await client.get(path, params=params)
+    except Exception:
+        recorder.add(path, 0.0, None)
+        return None
+    recorder.add(path, (time.perf_counter() - started) * 1000, r.status_code)
+    if r.status_code == 200 and r.headers.get("content-type", "").startswith("application/json"):
+        return r.json()
+    return None
+
+
+async def _worker(client, traffic: Traffic, recorder: Recorder, deadline: float, budget: list[int]) -> None:
+    while time.perf_counter() < deadline and budget[0] > 0:
+        next_cursor = None
+        for path, params in traffic.visit():
+            if budget[0] <= 0 or time.perf_counter() >= deadline:
+                return
+            if ("cursor", "next") in params:
+                if not next_cursor:
+                    continue
+                params = [p for p in params if p != ("cursor", "next")] + [("cursor", next_cursor)]
+            budget[0] -= 1
+            body = await _get(client, recorder, path, params)
+            if path == "/api/low-competition" and isinstance(body, dict):
+                next_cursor = body.get("next_cursor")
+
+
+async def run(client, args) -> dict:
+    buyer = [("buyer", args.buyer)] if args.buyer else []
+    r = await client.get("/api/filters", params=buyer)
+    r.raise_for_status()
+    years = [str(y) for y in r.json().get("years", [])]
+    r = await client.get("/api/suppliers", params=buyer + [("years", y) for y in years])
+    r.raise_for_status()
+    suppliers = [row["proveedor"] for row in r.json() if row.get("proveedor")]
+    traffic = Traffic(years, suppliers, random.Random(args.seed), buyer)
+
+    if args.warmup:
+        for path, params in traffic.visit():
+            await client.get(path, params=[p for p in params if p != ("cursor", "next")])
+
+    recorder = Recorder()
+    budget = [args.requests or sys.maxsize]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(_worker(client, traffic, recorder, deadline, budget) for _ in range(args.concurrency)))
+    results = recorder.summary(time.perf_counter() - started)
+    results["dataset"] = {"buyer": args.buyer, "years": years, "suppliers": len(suppliers)}
+    return results
+
+
+async def _main(args) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+            return await run(client, args)
+    from backend.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60, limits=limits) as client:
+        return await run(client, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="running API to target (default: backend.main in-process)")
+    parser.add_argument("--data-dir", help="in-process: data directory holding lake.duckdb")
+    parser.add_argument("--synthetic", action="store_true", help="in-process: generate and ingest a lake first")
+    parser.add_argument("--buyer", help="buyer= for every request (default: the API's default buyer; 'all' = every buyer)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--requests", type=int, default=0, help="stop after N requests (0 = duration only)")
+    parser.add_argument("--cache-entries", type=int, help="in-process: API_CACHE_MAX_ENTRIES (0 = no response cache)")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="skip one untimed visit first")
+    parser.add_argument("--output", help="results JSON (default benchmarks/results/load-<commit>.json)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    tmpdir = None
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    try:
+        if args.url is None:
+            os.environ["API_WARMUP"] = "0"  # the harness warms up itself (or not, with --no-warmup)
+            if args.cache_entries is not None:
+                os.environ["API_CACHE_MAX_ENTRIES"] = str(args.cache_entries)
+            if args.synthetic:
+                from benchmarks.ingest_throughput import build_lake
+
+                tmpdir = tempfile.mkdtemp(prefix="bench_load_")
+                params["generated"] = build_lake(tmpdir, args)
+                print(f"Synthetic lake: {params['generated']}")
+                os.environ["DATA_DIR"] = tmpdir
+            elif args.data_dir:
+                os.environ["DATA_DIR"] = os.path.abspath(args.data_dir)
+
+        results = asyncio.run(_main(args))
+        total = results["total"]
+        print(f"{'endpoint':<32} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+        for path, e in results["endpoints"].items():
+            print(f"{path:<32} {e['count']:>7} {e['p50_ms']:>9.2f} {e['p95_ms']:>9.2f} {e['p99_ms']:>9.2f} {e['rps']:>8.1f}")
+        print(f"{'total':<32} {total['count']:>7} {total['p50_ms']:>9.2f} {total['p95_ms']:>9.2f} {total['p99_ms']:>9.2f} {total['rps']:>8.1f}")
+        print(f"Results: {write_results('load', params, results, args.output)}")
+    finally:
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
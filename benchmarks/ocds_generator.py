@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Synthetic Guatecompras OCDS files for benchmarks: writes {YYYY-MM}_Guatecompras.json in the
+records[].compiledRelease shape that scripts/ingest.py reads, at a configurable scale.
+Value distributions follow the real Antigua Guatemala data (mostly direct purchases, 0-11
+tenderers, log-normal amounts) and supplier sizes follow a Zipf law (--supplier-skew).
+The first buyer is config.BUYER_ANTIGUA (the API's default buyer); ingest keeps every buyer.
+Usage: python benchmarks/ocds_generator.py OUT_DIR [--from 2024-01] [--to 2024-12]
+           [--buyers 1] [--tenders 500] [--awards-per-tender 1.0] [--suppliers 2000]
+           [--supplier-skew 1.1] [--seed 42]
+"""
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+import sys
+from itertools import accumulate
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import config
+
+# (procurementMethodDetails, weight), as in the real data.
+MODALITIES = [
+    ("Compra Directa con Oferta Electrónica (Art. 43 LCE Inciso b)", 426),
+    ("Cotización (Art. 38 LCE)", 20),
+    ("Licitación Pública (Art. 17 LCE)", 14),
+    ("Arrendamiento o Adquisición de Bienes Inmuebles (Art.43 inciso e)", 7),
+    ("Adquisición Directa por Ausencia de Oferta", 7),
+    ("Adquisiciones con proveedor único (Art.43 inciso c)", 2),
+    ("Arrendamientos por Licitación Pública(Art.43 inciso d )", 1),
+]
+# (status, statusDetails, awarded?, weight)
+STATUSES = [
+    ("complete", "Adjudicado", True, 325),
+    ("withdrawn", "Prescindido", False, 64),
+    ("unsuccessful", "Desierto", False, 36),
+    ("active", "No adjudicado", False, 23),
+    ("active", "Evaluación", False, 11),
+    ("active", "Suspendido", False, 7),
+    ("active", "Vigente", False, 3),
+]
+TENDERER_WEIGHTS = [65, 185, 90, 52, 31, 19, 15, 6, 4, 3, 5, 2]  # index = numberOfTenderers
+ITEMS = [
+    "MATERIALES DE CONSTRUCCION", "COMBUSTIBLE", "PAPELERIA Y UTILES DE OFICINA", "SERVICIO DE MANTENIMIENTO",
+    "UNIFORMES", "ALIMENTOS", "EQUIPO DE COMPUTO", "BASUREROS METALICOS", "PUENTE PEATONAL", "ASFALTO",
+    "SERVICIOS PROFESIONALES", "ARRENDAMIENTO DE MAQUINARIA", "PRODUCTOS DE LIMPIEZA", "LUMINARIAS",
+]
+SURNAMES = ["HERNÁNDEZ", "RODAS", "LÓPEZ", "GARCÍA", "PÉREZ", "MORALES", "CASTILLO", "JUÁREZ", "RAMÍREZ", "CHÁVEZ"]
+GIVEN = ["MIRNA", "RONY", "JOSÉ", "MARÍA", "CARLOS", "ANA", "LUIS", "SANDRA", "EFRAÍN", "ROXANNA"]
+COMPANY = ["CONSTRUCTORA", "DISTRIBUIDORA", "SERVICIOS", "COMERCIAL", "INVERSIONES", "FERRETERÍA"]
+
+
+def month_range(start: str, end: str) -> list[str]:
+    y, m = (int(x) for x in start.split("-"))
+    end_y, end_m = (int(x) for x in end.split("-"))
+    out = []
+    while (y, m) <= (end_y, end_m):
+        out.append(f"{y}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def supplier_names(n: int, rng: random.Random) -> list[tuple[str, str]]:
+    """(name, NIT) pairs: individuals in the Guatecompras 'SURNAME,SURNAME,,GIVEN,GIVEN' form and companies."""
+    out = []
+    for i in range(n):
+        if rng.random() < 0.6:
+            name = f"{rng.choice(SURNAMES)},{rng.choice(SURNAMES)},,{rng.choice(GIVEN)},{rng.choice(GIVEN)}"
+        else:
+            name = f"{rng.choice(COMPANY)} {rng.choice(SURNAMES)} {i}, SOCIEDAD ANONIMA"
+        out.append((name, f"{10_000_000 + i * 7919 % 90_000_000}"))
+    return out
+
+
+def buyers(n: int) -> list[tuple[str, str]]:
+    """(id, name); the first is the API's default buyer."""
+    names = [config.BUYER_ANTIGUA] + [f"MUNICIPALIDAD SINTÉTICA {i}, GUATEMALA" for i in range(1, n)]
+    return [(f"GT-UC-{1000 + i}", name) for i, name in enumerate(names)]
+
+
+class _Weighted:
+    """O(log n) weighted choice over a fixed distribution."""
+
+    def __init__(self, weights):
+        self.cumulative = list(accumulate(weights))
+
+    def pick(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1])
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method; means here are small (awards per tender).
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def record(month: str, seq: int, buyer: tuple[str, str], suppliers, args, pickers, rng: random.Random) -> dict:
+    year, month_num = (int(x) for x in month.split("-"))
+    nog = f"{30_000_000 + seq}"
+    day = rng.randint(1, 28)
+    published = f"{year}-{month_num:02d}-{day:02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+    modality = MODALITIES[pickers["modality"].pick(rng)][0]
+    status, status_details, awarded, _ = STATUSES[pickers["status"].pick(rng)]
+    tenderers = pickers["tenderers"].pick(rng)
+    awards = []
+    if awarded:
+        for a in range(max(1, _poisson(rng, args.awards_per_tender))):
+            name, nit = suppliers[pickers["supplier"].pick(rng)]
+            award_day = min(28, day + rng.randint(0, 20))
+            awards.append({
+                "id": f"GT-ADJ-{nog}-{nit}" + (f"-{a}" if a else ""),
+                "date": f"{year}-{month_num:02d}-{award_day:02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                "status": "active",
+                "value": {"amount": round(rng.lognormvariate(11.2, 1.3), 2), "currency": "GTQ"},
+                "suppliers": [{"id": f"GT-NIT-{nit}", "name": name}],
+            })
+    return {
+        "ocid": f"ocds-xqjsxa-{nog}",
+        "compiledRelease": {
+            "ocid": f"ocds-xqjsxa-{nog}",
+            "id": f"ocds-xqjsxa-{nog}-{published[:10]}",
+            "date": published,
+            "tag": ["tender", "award"] if awards else ["tender"],
+            "language": "es",
+            "initiationType": "tender",
+            "buyer": {"id": buyer[0], "name": buyer[1]},
+            "tender": {
+                "id": f"GT-NOG-{nog}",
+                "title": f"{rng.choice(ITEMS)} {seq}",
+                "status": status,
+                "statusDetails": status_details,
+                "procurementMethod": "direct" if modality.startswith("Compra Directa") else "open",
+                "procurementMethodDetails": modality,
+                "datePublished": published,
+                "numberOfTenderers": tenderers,
+                "value": {"amount": round(rng.lognormvariate(11.4, 1.3), 2), "currency": "GTQ"},
+            },
+            "awards": awards,
+        },
+    }
+
+
+def generate(out_dir: str, months: list[str], args) -> dict:
+    """Write one file per month; returns counts and bytes written."""
+    rng = random.Random(args.seed)
+    os.makedirs(out_dir, exist_ok=True)
+    suppliers = supplier_names(args.suppliers, rng)
+    buyer_list = buyers(args.buyers)
+    pickers = {
+        "modality": _Weighted([w for _, w in MODALITIES]),
+        "status": _Weighted([s[3] for s in STATUSES]),
+        "tenderers": _Weighted(TENDERER_WEIGHTS),
+        # Zipf: supplier rank r gets weight 1 / r^skew.
+        "supplier": _Weighted([1 / (r ** args.supplier_skew) for r in range(1, args.suppliers + 1)]),
+    }
+    totals = {"months": len(months), "records": 0, "awards": 0, "bytes": 0, "files": []}
+    seq = 0
+    for month in months:
+        path = os.path.join(out_dir, f"{month}_Guatecompras.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"uri": "https://ocds.guatecompras.gt", "version": "1.1", "records": [\n')
+            first = True
+            for buyer in buyer_list:
+                for _ in range(args.tenders):
+                    seq += 1
+                    rec = record(month, seq, buyer, suppliers, args, pickers, rng)
+                    totals["records"] += 1
+                    totals["awards"] += len(rec["compiledRelease"]["awards"])
+                    f.write(("" if first else ",\n") + json.dumps(rec, ensure_ascii=False))
+                    first = False
+            f.write("\n]}\n")
+        totals["bytes"] += os.path.getsize(path)
+        totals["files"].append(path)
+    return totals
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--from", dest="from_month", default="2024-01", metavar="YYYY-MM")
+    parser.add_argument("--to", dest="to_month", default="2024-12", metavar="YYYY-MM")
+    parser.add_argument("--buyers", type=int, default=1, help="buyers per file (each gets --tenders per month)")
+    parser.add_argument("--tenders", type=int, default=500, help="tenders per buyer per month")
+    parser.add_argument("--awards-per-tender", type=float, default=1.0, help="mean awards per awarded tender")
+    parser.add_argument("--suppliers", type=int, default=2000)
+    parser.add_argument("--supplier-skew", type=float, default=1.1, help="Zipf exponent (0 = uniform)")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("out_dir")
+    add_arguments(parser)
+    args = parser.parse_args()
+    totals = generate(args.out_dir, month_range(args.from_month, args.to_month), args)
+    print(
+        f"Wrote {totals['months']} files, {totals['records']:,} records, {totals['awards']:,} awards, "
+        f"{totals['bytes'] / 1e6:.1f} MB to {args.out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
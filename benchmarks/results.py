@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark result files: one JSON document per run, tagged with the git commit and environment
+so runs can be compared across commits.
+Compare two runs: python -m benchmarks.results old.json new.json
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(ms: list[float]) -> dict:
+    values = sorted(ms)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment() -> dict:
+    try:
+        import duckdb
+        duckdb_version = duckdb.__version__
+    except ImportError:
+        duckdb_version = None
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "duckdb": duckdb_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(suite: str, params: dict, results: dict, output: str | None = None) -> str:
+    """Write {suite, created_at, environment, params, results} to output (default results/<suite>-<commit>.json)."""
+    env = environment()
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{suite}-{env['commit'] or 'nogit'}.json")
+    doc = {
+        "suite": suite,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": env,
+        "params": params,
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+    return output
+
+
+def _numbers(prefix: str, value, out: dict) -> None:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _numbers(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+
+
+def compare(old: dict, new: dict) -> list[tuple[str, float, float, float | None]]:
+    """(metric path, old, new, % change) for every numeric result present in both runs."""
+    a, b = {}, {}
+    _numbers("", old["results"], a)
+    _numbers("", new["results"], b)
+    rows = []
+    for key in sorted(a.keys() & b.keys()):
+        change = (b[key] - a[key]) / a[key] * 100 if a[key] else None
+        rows.append((key, a[key], b[key], change))
+    return rows
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print("Usage: python -m benchmarks.results OLD.json NEW.json")
+        sys.exit(1)
+    with open(sys.argv[1]) as f:
+        old = json.load(f)
+    with open(sys.argv[2]) as f:
+        new = json.load(f)
+    if old.get("suite") != new.get("suite"):
+        print(f"Warning: comparing suite {old.get('suite')!r} with {new.get('suite')!r}")
+    print(f"{old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+    for key, a, b, change in compare(old, new):
+        pct = f"{change:+7.1f}%" if change is not None else "      -"
+        print(f"  {key:<60} {a:>12.3f} {b:>12.3f} {pct}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/supplier-detail's query on awards_clean_all (month-ordered, full scan per
+supplier) vs awards_by_supplier (sorted by supplier_key, row groups pruned by the key).
+Builds a synthetic DB of --awards rows (default 10M) with skewed supplier sizes in a temp
+directory, using the same derived-table SQL and sort order as ingest.
+Usage: python benchmarks/supplier_detail.py [--awards 10000000] [--suppliers 50000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from backend.db import month_filter, supplier_filter
+from scripts.derived_tables import cluster_tables, refresh_rollups
+
+DETAIL_SQL = """
+    SELECT nog, title, award_date, amount, currency
+    FROM {table}
+    WHERE {where} AND {supplier_where}
+    ORDER BY award_date DESC NULLS LAST
+"""
+
+
+def build(con, awards: int, suppliers: int) -> None:
+    """Synthetic awards_clean_all over 2019-01..2026-12, appended month by month like ingest."""
+    with open(os.path.join(PROJECT_ROOT, "sql", "schema.sql")) as f:
+        con.execute(f.read())
+    # Supplier i gets weight ~ 1/(i+1): a few large suppliers, a long tail of small ones.
+    con.execute(f"""
+        INSERT INTO awards_clean_all
+        WITH a AS (
+            SELECT i,
+                CAST(FLOOR(POW({suppliers}, random())) AS BIGINT) - 1 AS s,
+                DATE '2019-01-01' + CAST(i * 2922 // {awards} AS INTEGER) AS d
+            FROM range({awards}) t(i)
+        )
+        SELECT
+            'ocds-bench-' || i, 'GT-NOG-' || i, 'MUNICIPALIDAD DE PRUEBA', 'Adquisición ' || i,
+            'GT-ADJ-' || i, strftime(d, '%Y-%m-%d') || ' 10:00:00', ROUND(random() * 500000, 2), 'GTQ',
+            'PROVEEDOR ' || LPAD(CAST(s AS VARCHAR), 6, '0') || ', SOCIEDAD ANONIMA', 'GT-NIT-' || s,
+            strftime(d, '%Y-%m'), YEAR(d), DATE_TRUNC('month', d), md5_number_upper('MUNICIPALIDAD DE PRUEBA')
+        FROM a ORDER BY i
+    """)
+    refresh_rollups(con)
+    cluster_tables(con)
+
+
+def time_queries(con, table: str, names: list[str], where: str, params: list) -> list[float]:
+    out = []
+    for name in names:
+        if table == "awards_by_supplier":
+            supplier_where, supplier_params = supplier_filter(name)
+        else:
+            supplier_where, supplier_params = "supplier_name = ?", [name]
+        sql = DETAIL_SQL.format(table=table, where=where, supplier_where=supplier_where)
+        started = time.perf_counter()
+        con.execute(sql, params + supplier_params).fetchall()
+        out.append((time.perf_counter() - started) * 1000)
+    return out
+
+
+def summarize(label: str, ms: list[float]) -> None:
+    ms = sorted(ms)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {label:<20} p50 {statistics.median(ms):8.2f} ms   p95 {p95:8.2f} ms   mean {statistics.fmean(ms):8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--awards", type=int, default=10_000_000)
+    parser.add_argument("--suppliers", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=0, help="DuckDB threads (0 = default)")
+    parser.add_argument("--keep", metavar="PATH", help="keep the generated DB at PATH")
+    args = parser.parse_args()
+
+    import duckdb
+
+    tmpdir = tempfile.mkdtemp(prefix="bench_supplier_")
+    path = args.keep or os.path.join(tmpdir, "bench.duckdb")
+    try:
+        con = duckdb.connect(path)
+        if args.threads:
+            con.execute(f"SET threads = {args.threads}")
+        started = time.perf_counter()
+        build(con, args.awards, args.suppliers)
+        print(f"Built {args.awards:,} awards / {args.suppliers:,} suppliers in {time.perf_counter() - started:.1f}s")
+
+        names = [r[0] for r in con.execute("SELECT DISTINCT supplier_name FROM awards_clean_all").fetchall()]
+        rng = random.Random(42)
+        sample = [rng.choice(names) for _ in range(args.queries)]
+        for label, (where, params) in (
+            ("all months", ("1=1", [])),
+            ("years=2025", month_filter("", ["2025"], None, None)),
+        ):
+            print(f"{label} ({args.queries} random suppliers):")
+            for table in ("awards_clean_all", "awards_by_supplier"):
+                time_queries(con, table, sample[:5], where, params)  # warm
+                summarize(table, time_queries(con, table, sample, where, params))
+        con.close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Multi-worker throughput: for each worker count, starts `python -m backend.serve --workers N` on a
+free port and drives it with benchmarks/load.py (--url) from several client processes (one client
+process would be the bottleneck), then reports requests/s, latency and the speed-up over the
+first worker count. The response cache is off by default (--cache-entries 0) so every request
+runs its DuckDB query and builds its JSON; set it to compare cached serving.
+Needs uvicorn. Usage: python benchmarks/workers.py [--workers 1 2 4] [--clients 4] [--concurrency 8]
+           [--duration 20] [--data-dir DIR | --synthetic ...] [--buyer NAME|all] [--output PATH]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.ocds_generator import add_arguments as add_generator_arguments
+from benchmarks.results import write_results
+
+READY_TIMEOUT_SECONDS = 180
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, workers: int, proc: subprocess.Popen) -> None:
+    """Until /api/ready answers 200 several times in a row (each worker warms up on its own)."""
+    import httpx
+
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    streak = 0
+    while streak < 3 * workers:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"server not ready after {READY_TIMEOUT_SECONDS}s")
+        try:
+            ok = httpx.get(f"{url}/api/ready", timeout=5).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if not ok:
+            time.sleep(0.5)
+
+
+def _run_clients(url: str, args, workdir: str, workers: int) -> dict:
+    """Start --clients load.py processes together; sum their requests/s, worst-client latencies."""
+    outputs, procs = [], []
+    for i in range(args.clients):
+        output = os.path.join(workdir, f"client-{workers}-{i}.json")
+        cmd = [
+            sys.executable, os.path.join(PROJECT_ROOT, "benchmarks", "load.py"),
+            "--url", url, "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+            "--seed", str(args.seed + i), "--output", output,
+        ]
+        if args.buyer:
+            cmd += ["--buyer", args.buyer]
+        outputs.append(output)
+        procs.append(subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL))
+    for proc in procs:
+        if proc.wait() != 0:
+            raise RuntimeError(f"load client exited with {proc.returncode}")
+    totals = []
+    for output in outputs:
+        with open(output) as f:
+            totals.append(json.load(f)["results"]["total"])
+    return {
+        "rps": round(sum(t["rps"] for t in totals), 2),
+        "requests": sum(t["count"] for t in totals),
+        "errors": sum(t["errors"] for t in totals),
+        **{k: max(t[k] for t in totals) for k in ("p50_ms", "p95_ms", "p99_ms")},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="load.py processes per run")
+    parser.add_argument("--concurrency", type=int, default=8, help="per client process")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--buyer", help="buyer= for every request (see benchmarks/load.py)")
+    parser.add_argument("--cache-entries", type=int, default=0, help="API_CACHE_MAX_ENTRIES (0 = no response cache)")
+    parser.add_argument("--data-dir", help="data directory holding lake.duckdb (default: the project's)")
+    parser.add_argument("--synthetic", action="store_true", help="generate and ingest a lake first")
+    parser.add_argument("--output", help="results JSON (default benchmarks/results/workers-<commit>.json)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_workers_")
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    try:
+        env = {**os.environ, "API_CACHE_MAX_ENTRIES": str(args.cache_entries)}
+        if args.synthetic:
+            from benchmarks.ingest_throughput import build_lake
+
+            params["generated"] = build_lake(workdir, args)
+            print(f"Synthetic lake: {params['generated']}")
+            env["DATA_DIR"] = workdir
+        elif args.data_dir:
+            env["DATA_DIR"] = os.path.abspath(args.data_dir)
+
+        runs = {}
+        for workers in args.workers:
+            port = _free_port()
+            url = f"http://127.0.0.1:{port}"
+            run_env = {**env, "API_SERVING_SIGNAL": os.path.join(workdir, f"serving-{workers}.json")}
+            server = subprocess.Popen(
+                [sys.executable, "-m", "backend.serve", "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+                cwd=PROJECT_ROOT,
+                env=run_env,
+            )
+            try:
+                _wait_ready(url, workers, server)
+                runs[str(workers)] = _run_clients(url, args, workdir, workers)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            print(f"workers={workers}: {runs[str(workers)]}")
+
+        base = runs[str(args.workers[0])]["rps"]
+        for workers in args.workers:
+            run = runs[str(workers)]
+            run["speedup"] = round(run["rps"] / base, 2) if base else None
+            run["efficiency"] = round(run["speedup"] * args.workers[0] / workers, 2) if base else None
+        print(f"{'workers':>8} {'req/s':>9} {'speedup':>8} {'effic.':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for workers in args.workers:
+            r = runs[str(workers)]
+            print(
+                f"{workers:>8} {r['rps']:>9.1f} {r['speedup']:>8.2f} {r['efficiency']:>7.2f} "
+                f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+            )
+        print(f"Results: {write_results('workers', params, {'runs': runs}, args.output)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
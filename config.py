@@ -5,15 +5,34 @@ Project config: buyer filter and paths. Single source for app and scripts.
 import os
 
 BUYER_ANTIGUA = "MUNICIPALIDAD DE ANTIGUA GUATEMALA, SACATEPÉQUEZ"
+# Buyer the API shows when a request has no ?buyer= (ingest keeps every buyer; buyer=all = no filter).
+DEFAULT_BUYER = os.getenv("PORTAL_BUYER") or BUYER_ANTIGUA
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+# DATA_DIR env overrides the data directory (e.g. benchmarks ingest synthetic months into a temp dir).
+DATA_DIR = os.getenv("DATA_DIR") or os.path.join(PROJECT_ROOT, "data")
 LOGS_DIR = os.path.join(DATA_DIR, "logs")
 BACKUPS_DIR = os.path.join(DATA_DIR, "backups")
 MANIFEST_PATH = os.path.join(DATA_DIR, "ingest_manifest.json")
 CHANGELOG_PATH = os.path.join(DATA_DIR, "data_changelog.md")
 DB_PATH = os.path.join(DATA_DIR, "lake.duckdb")
 DB_PATH_NEXT = os.path.join(DATA_DIR, "lake_next.duckdb")
+# Published DB generations: generations/<name>/lake.duckdb, with generations/current holding
+# the name being served (written by scripts/publish_generation.py).
+GENERATIONS_DIR = os.path.join(DATA_DIR, "generations")
+CURRENT_GENERATION_PATH = os.path.join(GENERATIONS_DIR, "current")
+GENERATION_DB_NAME = "lake.duckdb"
 
 GUATECOMPRAS_BASE_URL = "https://www.guatecompras.gt"
 GUATECOMPRAS_OCDS_JSON_BASE = "https://ocds.guatecompras.gt/file/json"
+
+
+def served_db_path() -> str:
+    """DB the portal reads: the current published generation if there is one, else DB_PATH."""
+    try:
+        with open(CURRENT_GENERATION_PATH, "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return DB_PATH
+    path = os.path.join(GENERATIONS_DIR, name, GENERATION_DB_NAME)
+    return path if name and os.path.isfile(path) else DB_PATH
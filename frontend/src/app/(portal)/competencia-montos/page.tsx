@@ -3,11 +3,11 @@
 import { useEffect, useMemo, useState } from "react";
 import { useFilterParams } from "@/hooks/use-filter-params";
 import {
-  fetchBands,
+  fetchDashboard,
   fetchFilters,
   fetchLowCompetition,
-  fetchTrend,
   type FilterParams,
+  type LowCompetition,
 } from "@/lib/api";
 import { Card, CardContent } from "@/components/ui/card";
 import {
@@ -29,6 +29,7 @@ import {
   ResponsiveContainer,
   Cell,
 } from "recharts";
+import { Button } from "@/components/ui/button";
 import { Collapsible, CollapsibleContent, CollapsibleTrigger } from "@/components/ui/collapsible";
 
 function buildParams(params: FilterParams, yearsFallback: string[]): FilterParams {
@@ -65,10 +66,8 @@ export default function CompetenciaMontosPage() {
   const { params } = useFilterParams();
   const [filters, setFilters] = useState<{ years: string[] }>({ years: [] });
   const [isMobile, setIsMobile] = useState(false);
-  const [lowComp, setLowComp] = useState<{
-    count: number;
-    tenders: { nog: string; title: string; procurement_method_details: string | null; number_of_tenderers: number | null; date_published: string | null; month: string | null }[];
-  } | null>(null);
+  const [lowComp, setLowComp] = useState<LowCompetition | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [bands, setBands] = useState<
     { rango: string; adjudicaciones: number; total_q: number }[]
   >([]);
@@ -102,11 +101,31 @@ export default function CompetenciaMontosPage() {
     const effective = { ...q, years: q.years ?? filters.years };
     Promise.all([
       fetchLowCompetition(effective).then(setLowComp),
-      fetchBands(effective).then(setBands),
-      fetchTrend(effective).then(setTrend),
+      fetchDashboard(effective, ["bands", "trend"]).then((d) => {
+        setBands(d.bands ?? []);
+        setTrend(d.trend ?? []);
+      }),
     ]).catch(() => setError("Error al cargar datos")).finally(() => setLoading(false));
   }, [params.years, params.from_month, params.to_month, filters.years]);
 
+  const effectiveParams = () => {
+    const q = buildParams(params, filters.years);
+    return { ...q, years: q.years ?? filters.years };
+  };
+
+  const loadMoreLowComp = () => {
+    if (!lowComp?.next_cursor) return;
+    setLoadingMore(true);
+    fetchLowCompetition(effectiveParams(), lowComp.next_cursor)
+      .then((page) =>
+        setLowComp((prev) =>
+          prev ? { ...prev, tenders: [...prev.tenders, ...page.tenders], next_cursor: page.next_cursor } : page
+        )
+      )
+      .catch(() => setError("Error al cargar datos"))
+      .finally(() => setLoadingMore(false));
+  };
+
   const totalAdj = useMemo(() => trend.reduce((s, t) => s + t.total_q, 0), [trend]);
   const totalCount = useMemo(() => trend.reduce((s, t) => s + t.adjudicaciones, 0), [trend]);
   const trendPointWidth = trend.length <= 6 ? 58 : 48;
@@ -377,6 +396,16 @@ export default function CompetenciaMontosPage() {
                       </TableBody>
                     </Table>
                   </div>
+                  {lowComp.next_cursor && (
+                    <div className="px-4 py-3 border-t border-border flex items-center justify-between gap-3">
+                      <span className="text-xs text-muted-foreground">
+                        Mostrando {lowComp.tenders.length} de {lowComp.count}
+                      </span>
+                      <Button variant="outline" size="sm" onClick={loadMoreLowComp} disabled={loadingMore}>
+                        {loadingMore ? "Cargando…" : "Cargar más"}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               </CollapsibleContent>
             </Card>
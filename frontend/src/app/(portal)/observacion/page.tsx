@@ -3,11 +3,10 @@
 import { useEffect, useMemo, useState } from "react";
 import { useFilterParams } from "@/hooks/use-filter-params";
 import {
-  fetchConcentration,
+  fetchDashboard,
   fetchFilters,
   fetchSupplierDetail,
-  fetchSupplierNames,
-  fetchSuppliers,
+  type Concentration,
   type FilterParams,
 } from "@/lib/api";
 import { Card } from "@/components/ui/card";
@@ -34,10 +33,7 @@ export default function ObservacionPage() {
   const [suppliers, setSuppliers] = useState<
     { proveedor: string; adjudicaciones: number; total_q: number }[]
   >([]);
-  const [concentration, setConcentration] = useState<{
-    distinct_suppliers: number;
-    top5_pct: number;
-  } | null>(null);
+  const [concentration, setConcentration] = useState<Concentration | null>(null);
   const [supplierNames, setSupplierNames] = useState<string[]>([]);
   const [selectedSupplier, setSelectedSupplier] = useState<string>("");
   const [supplierDetail, setSupplierDetail] = useState<
@@ -56,14 +52,16 @@ export default function ObservacionPage() {
     setLoading(true);
     setError(null);
     const effective = { ...q, years: q.years ?? filters.years };
-    Promise.all([
-      fetchSuppliers(effective).then(setSuppliers),
-      fetchConcentration(effective).then(setConcentration),
-      fetchSupplierNames(effective).then((names) => {
+    fetchDashboard(effective, ["suppliers", "concentration", "supplier-names"])
+      .then((d) => {
+        setSuppliers(d.suppliers ?? []);
+        setConcentration(d.concentration ?? null);
+        const names = d["supplier-names"] ?? [];
         setSupplierNames(names);
         if (names.length && !names.includes(selectedSupplier)) setSelectedSupplier(names[0]);
-      }),
-    ]).catch(() => setError("Error al cargar datos")).finally(() => setLoading(false));
+      })
+      .catch(() => setError("Error al cargar datos"))
+      .finally(() => setLoading(false));
   }, [params.years, params.from_month, params.to_month, filters.years]);
 
   useEffect(() => {
@@ -125,6 +123,12 @@ export default function ObservacionPage() {
               {concentration != null ? `${concentration.top5_pct}%` : "—"}
             </p>
             <p className="text-xs text-muted-foreground">del monto total</p>
+            {concentration != null && concentration.suppliers > 0 && (
+              <p className="text-xs text-muted-foreground mt-1 tabular-nums">
+                HHI {concentration.hhi.toLocaleString("es-GT", { maximumFractionDigits: 0 })} · Gini{" "}
+                {concentration.gini.toLocaleString("es-GT", { maximumFractionDigits: 2 })}
+              </p>
+            )}
           </div>
         </Card>
       </div>
@@ -2,18 +2,13 @@
 
 import { useCallback, useEffect, useState } from "react";
 import {
-  fetchBands,
-  fetchConcentration,
+  fetchDashboard,
   fetchDataReference,
   fetchFilters,
-  fetchKpis,
   fetchLowCompetition,
   fetchModalities,
   fetchSupplierDetail,
-  fetchSupplierNames,
-  fetchSuppliers,
   fetchTopSuppliersByModality,
-  fetchTrend,
   fetchAwards,
   fetchTenders,
   type FilterParams,
@@ -124,18 +119,19 @@ export function Dashboard() {
     setError(null);
     const q = { ...p, years: p.years?.length ? p.years : filters.years };
     Promise.all([
-      fetchKpis(q).then(setKpis),
-      fetchSuppliers(q).then(setSuppliers),
-      fetchConcentration(q).then(setConcentration),
-      fetchSupplierNames(q).then((names) => {
+      fetchDashboard(q).then((d) => {
+        setKpis(d.kpis ?? null);
+        setSuppliers(d.suppliers ?? []);
+        setConcentration(d.concentration ?? null);
+        const names = d["supplier-names"] ?? [];
         setSupplierNames(names);
         if (names.length && !names.includes(selectedSupplier)) setSelectedSupplier(names[0]);
+        setBands(d.bands ?? []);
+        setTrend(d.trend ?? []);
       }),
       fetchModalities(q).then(setModalities),
       fetchTopSuppliersByModality(q).then(setTopByModality),
       fetchLowCompetition(q).then(setLowComp),
-      fetchBands(q).then(setBands),
-      fetchTrend(q).then(setTrend),
       fetchTenders(q).then(setTenders),
       fetchAwards(q).then(setAwards),
     ]).catch(() => setError("Error al cargar datos")).finally(() => setLoading(false));
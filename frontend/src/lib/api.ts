@@ -69,11 +69,23 @@ export async function fetchSuppliers(params: FilterParams) {
   return r.json() as Promise<{ proveedor: string; adjudicaciones: number; total_q: number }[]>;
 }
 
-export async function fetchConcentration(params: FilterParams) {
-  const q = searchParams(params);
+/** Supplier concentration: HHI (0-10,000), Gini (0-1), top-N % shares, Lorenz curve [suppliers, amount] shares. */
+export type Concentration = {
+  distinct_suppliers: number;
+  top5_pct: number;
+  suppliers: number;
+  total_q: number;
+  hhi: number;
+  gini: number;
+  top_shares: { n: number; pct: number }[];
+  lorenz: [number, number][];
+};
+
+export async function fetchConcentration(params: FilterParams, top?: number[]) {
+  const q = searchParams(params) + (top?.length ? `&top=${top.join(",")}` : "");
   const r = await fetch(`${API_BASE}/api/concentration?${q}`);
   if (!r.ok) throw new Error("Failed to fetch concentration");
-  return r.json() as Promise<{ distinct_suppliers: number; top5_pct: number }>;
+  return r.json() as Promise<Concentration>;
 }
 
 export async function fetchSupplierNames(params: FilterParams) {
@@ -83,6 +95,13 @@ export async function fetchSupplierNames(params: FilterParams) {
   return r.json() as Promise<string[]>;
 }
 
+/** Typeahead: accent/case-insensitive supplier name search across all periods. */
+export async function searchSuppliers(q: string, limit = 10) {
+  const r = await fetch(`${API_BASE}/api/supplier-search?q=${encodeURIComponent(q)}&limit=${limit}`);
+  if (!r.ok) throw new Error("Failed to search suppliers");
+  return r.json() as Promise<{ name: string; adjudicaciones: number; total_q: number }[]>;
+}
+
 export async function fetchSupplierDetail(supplier: string, params: FilterParams) {
   const q = searchParams(params);
   const r = await fetch(`${API_BASE}/api/supplier-detail?supplier=${encodeURIComponent(supplier)}&${q}`);
@@ -108,21 +127,63 @@ export async function fetchTopSuppliersByModality(params: FilterParams) {
   >;
 }
 
-export async function fetchLowCompetition(params: FilterParams) {
-  const q = searchParams(params);
+export type LowCompetitionTender = {
+  nog: string;
+  title: string;
+  procurement_method_details: string | null;
+  number_of_tenderers: number | null;
+  competition_level: "0" | "1" | "unknown";
+  date_published: string | null;
+  month: string | null;
+};
+
+export type LowCompetition = {
+  count: number;
+  tenders: LowCompetitionTender[];
+  next_cursor: string | null;
+  by_level: { competition_level: string; count: number }[];
+  by_modality: { modalidad: string; count: number }[];
+  by_month: { mes: string; count: number }[];
+};
+
+/** One page of low-competition tenders (plus count and breakdowns); pass next_cursor as cursor for more. */
+export async function fetchLowCompetition(params: FilterParams, cursor?: string | null, limit = 50) {
+  const q = searchParams(params) + `&limit=${limit}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
   const r = await fetch(`${API_BASE}/api/low-competition?${q}`);
   if (!r.ok) throw new Error("Failed to fetch low competition");
-  return r.json() as Promise<{
-    count: number;
-    tenders: {
-      nog: string;
-      title: string;
-      procurement_method_details: string | null;
-      number_of_tenderers: number | null;
-      date_published: string | null;
-      month: string | null;
-    }[];
-  }>;
+  return r.json() as Promise<LowCompetition>;
+}
+
+export type SearchHit = {
+  doc_id: number;
+  kind: "tender" | "award";
+  nog: string | null;
+  title: string | null;
+  doc_date: string | null;
+  procurement_method_details: string | null;
+  supplier_name: string | null;
+  amount: number | null;
+  month: string;
+  score: number;
+};
+
+export type SearchPage = { items: SearchHit[]; next_cursor: string | null; mode: "bm25" | "scan" };
+
+/** Tenders and awards by title keywords, best match first; pass next_cursor as cursor for more. */
+export async function searchProcesses(
+  text: string,
+  params: FilterParams,
+  kind: "all" | "tender" | "award" = "all",
+  cursor?: string | null,
+  limit = 20,
+) {
+  const q =
+    searchParams(params) +
+    `&q=${encodeURIComponent(text)}&kind=${kind}&limit=${limit}` +
+    (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+  const r = await fetch(`${API_BASE}/api/search?${q}`);
+  if (!r.ok) throw new Error("Failed to search");
+  return r.json() as Promise<SearchPage>;
 }
 
 export async function fetchBands(params: FilterParams) {
@@ -139,18 +200,47 @@ export async function fetchTrend(params: FilterParams) {
   return r.json() as Promise<{ mes: string; adjudicaciones: number; total_q: number }[]>;
 }
 
+export type DashboardSection = "kpis" | "suppliers" | "concentration" | "supplier-names" | "bands" | "trend";
+
+export type DashboardBundle = {
+  kpis?: { tenders_count: number; awards_count: number; total_amount: number };
+  suppliers?: { proveedor: string; adjudicaciones: number; total_q: number }[];
+  concentration?: Concentration;
+  "supplier-names"?: string[];
+  bands?: { rango: string; adjudicaciones: number; total_q: number }[];
+  trend?: { mes: string; adjudicaciones: number; total_q: number }[];
+};
+
+/** Several award aggregates in one request (one query over the monthly rollups). Omit sections for all. */
+export async function fetchDashboard(params: FilterParams, sections?: DashboardSection[]) {
+  const q = searchParams(params) + (sections?.length ? `&sections=${sections.join(",")}` : "");
+  const r = await fetch(`${API_BASE}/api/dashboard?${q}`);
+  if (!r.ok) throw new Error("Failed to fetch dashboard");
+  return r.json() as Promise<DashboardBundle>;
+}
+
+/** Keyset page from /api/tenders or /api/awards; pass next_cursor back as cursor for the next page. */
+export type RowPage = { items: Record<string, unknown>[]; next_cursor: string | null };
+
+export async function fetchRowPage(
+  kind: "tenders" | "awards",
+  params: FilterParams,
+  limit = 100,
+  cursor?: string,
+) {
+  const q =
+    searchParams(params) + (limit ? `&limit=${limit}` : "") + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+  const r = await fetch(`${API_BASE}/api/${kind}?${q}`);
+  if (!r.ok) throw new Error(`Failed to fetch ${kind}`);
+  return r.json() as Promise<RowPage>;
+}
+
 export async function fetchTenders(params: FilterParams, limit = 100) {
-  const q = searchParams(params) + (limit ? `&limit=${limit}` : "");
-  const r = await fetch(`${API_BASE}/api/tenders?${q}`);
-  if (!r.ok) throw new Error("Failed to fetch tenders");
-  return r.json() as Promise<Record<string, unknown>[]>;
+  return (await fetchRowPage("tenders", params, limit)).items;
 }
 
 export async function fetchAwards(params: FilterParams, limit = 100) {
-  const q = searchParams(params) + (limit ? `&limit=${limit}` : "");
-  const r = await fetch(`${API_BASE}/api/awards?${q}`);
-  if (!r.ok) throw new Error("Failed to fetch awards");
-  return r.json() as Promise<Record<string, unknown>[]>;
+  return (await fetchRowPage("awards", params, limit)).items;
 }
 
 export async function fetchDataReference() {
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 """
-Check DuckDB contents: row counts, buyers, modalities. Use to verify data after ingest.
+Check DuckDB contents: row counts, buyers, modalities, awards_fact consistency. Use to verify data after ingest.
 The API uses data/lake.duckdb. Ingest writes to data/lake_next.duckdb; swap with:
   mv data/lake_next.duckdb data/lake.duckdb
 Usage: python scripts/check_db.py [lake.duckdb|lake_next.duckdb]
-  Default: lake.duckdb (what the FastAPI backend reads).
+  Default: lake.duckdb (what the FastAPI backend reads: the current published generation, if any).
 """
 import os
 import sys
@@ -13,6 +13,7 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 import config
+from scripts.derived_tables import check_awards_fact
 
 
 def main() -> None:
@@ -20,7 +21,7 @@ def main() -> None:
     if which == "lake_next.duckdb":
         path = config.DB_PATH_NEXT
     else:
-        path = config.DB_PATH
+        path = config.served_db_path()
 
     if not os.path.isfile(path):
         print(f"DB not found: {path}")
@@ -38,7 +39,7 @@ def main() -> None:
         print(f"awards_clean_all:  {a_count} rows\n")
 
         if t_count == 0:
-            print("No tenders. Ingest uses WHERE buyer.name = ? (Antigua). Ensure your JSON contains that buyer.")
+            print("No tenders. Check that ingest ran for at least one month and the JSON has records.")
             return
 
         buyers = con.execute(
@@ -70,6 +71,16 @@ def main() -> None:
         print(f"Months in DB: {len(months)}")
         if months:
             print(f"  First: {months[0][0]}, Last: {months[-1][0]}")
+        print()
+
+        try:
+            problems = check_awards_fact(con)
+        except duckdb.CatalogException as e:
+            print(f"awards_fact check skipped ({e}); run scripts/derived_tables.py to upgrade the DB")
+        else:
+            print(f"awards_fact vs tenders JOIN awards: {'OK' if not problems else f'{len(problems)} mismatches'}")
+            for problem in problems:
+                print(f"  {problem}")
     finally:
         con.close()
 
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Build tables derived from tenders_clean_all / awards_clean_all (awards_fact, month-level rollups
+per buyer, the supplier-sorted copy of awards, search_docs and its full-text index, the buyers
+list and dataset_meta). ingest.py
+refreshes only the month it loaded; ingest_all.py re-sorts tables at the end (by buyer then
+month, or by supplier for awards_by_supplier).
+Run this script to backfill typed month columns and buyer_key, rebuild every month and re-sort,
+e.g. on a DB created before a derived table existed; it then checks awards_fact against the join.
+Usage: python scripts/derived_tables.py [lake.duckdb|lake_next.duckdb]
+  Default: lake_next.duckdb (what ingest writes). Swap to lake.duckdb as usual.
+"""
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import config
+
+# Same bands as /api/bands (baja cuantía / compra directa / licitación).
+AMOUNT_BAND_SQL = """CASE
+            WHEN amount < 25000 THEN '< Q25,000 (baja cuantía)'
+            WHEN amount < 90000 THEN 'Q25,000 - Q90,000 (compra directa)'
+            ELSE '> Q90,000 (licitación)'
+        END"""
+
+# tenders_clean_all.competition_level from the bidder count: '0', '1', '2+' or 'unknown'.
+def competition_level_sql(col: str = "number_of_tenderers") -> str:
+    return f"""CASE
+            WHEN {col} IS NULL THEN 'unknown'
+            WHEN {col} <= 0 THEN '0'
+            WHEN {col} = 1 THEN '1'
+            ELSE '2+'
+        END"""
+
+
+# buyer_key for a buyer name column; same as backend.db.buyer_key (first 8 bytes of md5, like supplier_key).
+def buyer_key_sql(col: str = "buyer_name") -> str:
+    return f"md5_number_upper(COALESCE({col}, ''))"
+
+
+# Levels listed by /api/low-competition (no bidding or a single bidder, or count not reported).
+LOW_COMPETITION_LEVELS = ("0", "1", "unknown")
+
+# Awards with their tender's attributes: the only tenders x awards join, done once per month at ingest.
+# LEFT JOIN, so every award is kept (has_tender false when its tender isn't in the month's file).
+AWARDS_FACT_SELECT = """
+        SELECT a.ocid, a.nog, a.title, a.award_id, a.award_date, a.amount, a.currency,
+            a.supplier_name, a.supplier_id,
+            t.procurement_method_details, t.tender_status, t.number_of_tenderers, t.date_published,
+            t.nog IS NOT NULL AS has_tender,
+            a.month, a.year, a.month_date, a.buyer_key
+        FROM (SELECT * FROM awards_clean_all WHERE {where_a}) a
+        LEFT JOIN tenders_clean_all t ON t.nog = a.nog AND t.month = a.month AND t.buyer_key = a.buyer_key
+    """
+
+# table -> SELECT producing its rows (matched BY NAME); {where_a} restricts to one month (or all).
+ROLLUPS = {
+    "awards_by_month_supplier": """
+        SELECT buyer_key, month, year, month_date, supplier_name,
+            COUNT(*) AS awards_count, SUM(amount) AS total_amount
+        FROM awards_clean_all
+        WHERE {where_a}
+        GROUP BY buyer_key, month, year, month_date, supplier_name
+    """,
+    "awards_by_month_band": f"""
+        SELECT buyer_key, month, year, month_date, {AMOUNT_BAND_SQL} AS band,
+            COUNT(*) AS awards_count, SUM(amount) AS total_amount, MIN(amount) AS min_amount
+        FROM awards_clean_all
+        WHERE {{where_a}}
+        GROUP BY buyer_key, month, year, month_date, band
+    """,
+    "awards_by_month_modality_supplier": """
+        SELECT buyer_key, month, year, month_date, procurement_method_details, supplier_name,
+            COUNT(*) AS awards_count, SUM(amount) AS total_amount
+        FROM awards_fact
+        WHERE {where_a} AND has_tender
+        GROUP BY buyer_key, month, year, month_date, procurement_method_details, supplier_name
+    """,
+    "tenders_by_month_modality": """
+        SELECT buyer_key, month, year, month_date, procurement_method_details,
+            COUNT(*) AS tenders_count, COUNT(DISTINCT nog) AS procesos
+        FROM tenders_clean_all
+        WHERE {where_a}
+        GROUP BY buyer_key, month, year, month_date, procurement_method_details
+    """,
+}
+
+# Award rows for supplier drill-downs (/api/supplier-detail), kept sorted by supplier_key.
+# Names share long prefixes ("CONSTRUCTORA ...", "SERVICIOS ...") and DuckDB's string min/max
+# only keep a short prefix, so the integer key (first 8 bytes of md5, see backend.db.supplier_key)
+# is what lets `supplier_key = ?` skip every row group but that supplier's.
+SUPPLIER_AWARDS_SELECT = """
+        SELECT md5_number_upper(COALESCE(supplier_name, '')) AS supplier_key,
+            supplier_name, award_date, nog, title, amount, currency, month, year, month_date, buyer_key
+        FROM awards_clean_all
+        WHERE {where_a}
+    """
+
+# Low-competition tenders, kept in the API's listing order (newest first) for keyset paging.
+LOW_COMPETITION_SELECT = f"""
+        SELECT nog, title, procurement_method_details, number_of_tenderers, competition_level,
+            date_published, month, year, month_date, buyer_key
+        FROM tenders_clean_all
+        WHERE {{where_a}} AND competition_level IN ({", ".join(f"'{level}'" for level in LOW_COMPETITION_LEVELS)})
+    """
+
+# Titles for /api/search (tenders, then awards with their tender's modality); doc_id keys the
+# full-text index built by build_search_index().
+SEARCH_DOCS_SELECT = """
+        SELECT nextval('search_doc_id') AS doc_id, 'tender' AS kind, nog, title, date_published AS doc_date,
+            procurement_method_details, CAST(NULL AS VARCHAR) AS supplier_name, CAST(NULL AS DOUBLE) AS amount,
+            month, year, month_date, buyer_key
+        FROM tenders_clean_all
+        WHERE {where_a}
+        UNION ALL
+        SELECT nextval('search_doc_id'), 'award', nog, title, award_date,
+            procurement_method_details, supplier_name, amount, month, year, month_date, buyer_key
+        FROM awards_fact
+        WHERE {where_a}
+    """
+
+# Refreshed in this order (awards_fact feeds awards_by_month_modality_supplier and search_docs).
+DERIVED = {
+    "awards_fact": AWARDS_FACT_SELECT,
+    **ROLLUPS,
+    "awards_by_supplier": SUPPLIER_AWARDS_SELECT,
+    "low_competition_tenders": LOW_COMPETITION_SELECT,
+    "search_docs": SEARCH_DOCS_SELECT,
+}
+
+# Dropped from titles and queries before BM25 scoring: articles, prepositions and conjunctions
+# that appear in nearly every title (lowercase, no accents, like the indexed tokens).
+SEARCH_STOPWORDS = (
+    "a", "al", "ante", "con", "contra", "de", "del", "desde", "e", "el", "en", "entre", "hacia",
+    "hasta", "la", "las", "lo", "los", "o", "para", "por", "que", "se", "segun", "sin", "sobre",
+    "su", "sus", "u", "un", "una", "unas", "unos", "y",
+)
+
+# One row per buyer for /api/buyers, from the tenders and awards rollups (rebuilt whole: cheap).
+BUYERS_SELECT = """
+        WITH t AS (
+            SELECT buyer_key, SUM(tenders_count) AS tenders_count, MIN(month) AS first_month, MAX(month) AS last_month
+            FROM tenders_by_month_modality GROUP BY buyer_key
+        ), a AS (
+            SELECT buyer_key, SUM(awards_count) AS awards_count, SUM(total_amount) AS total_amount
+            FROM awards_by_month_band GROUP BY buyer_key
+        ), n AS (
+            SELECT buyer_key, MIN(buyer_name) AS buyer_name FROM tenders_clean_all GROUP BY buyer_key
+        )
+        SELECT t.buyer_key, n.buyer_name, t.tenders_count, COALESCE(a.awards_count, 0) AS awards_count,
+            COALESCE(a.total_amount, 0) AS total_amount, t.first_month, t.last_month
+        FROM t JOIN n USING (buyer_key) LEFT JOIN a USING (buyer_key)
+    """
+
+# dataset_meta: filter options and counts per buyer (GROUPING SETS: buyer_key NULL = whole DB), from
+# the rollups and buyers; the manifest columns are bound as parameters (see manifest_summary).
+DATASET_META_SELECT = """
+        WITH t AS (
+            SELECT buyer_key,
+                list_sort(list(DISTINCT month) FILTER (WHERE month IS NOT NULL)) AS months,
+                list_sort(list(DISTINCT SUBSTR(month, 1, 4)) FILTER (WHERE month IS NOT NULL)) AS years,
+                list_sort(list(DISTINCT COALESCE(procurement_method_details, '(Sin especificar)'))) AS modalities,
+                SUM(tenders_count) AS tenders_count
+            FROM tenders_by_month_modality
+            GROUP BY GROUPING SETS ((buyer_key), ())
+        ), a AS (
+            SELECT buyer_key, SUM(awards_count) AS awards_count
+            FROM awards_by_month_band
+            GROUP BY GROUPING SETS ((buyer_key), ())
+        ), b AS (
+            SELECT buyer_key, list_sort(list(buyer_name)) AS buyer_names
+            FROM buyers
+            GROUP BY GROUPING SETS ((buyer_key), ())
+        )
+        SELECT t.buyer_key,
+            COALESCE(t.months, []) AS months,
+            COALESCE(t.years, []) AS years,
+            COALESCE(t.modalities, []) AS modalities,
+            COALESCE(b.buyer_names, []) AS buyer_names,
+            COALESCE(t.tenders_count, 0) AS tenders_count,
+            COALESCE(a.awards_count, 0) AS awards_count,
+            ? AS manifest_updated_at, ? AS manifest_files, ? AS last_downloaded,
+            ? AS package_published_min, ? AS package_published_max,
+            CAST(now() AS TIMESTAMP) AS built_at
+        FROM t
+        LEFT JOIN a ON t.buyer_key IS NOT DISTINCT FROM a.buyer_key
+        LEFT JOIN b ON t.buyer_key IS NOT DISTINCT FROM b.buyer_key
+    """
+
+# Tables the API filters by buyer and month; kept physically ordered by (buyer_key, month_date) so a
+# buyer's rows share row groups and both predicates prune them by min/max.
+MONTH_CLUSTERED = [
+    ("tenders_clean_all", "buyer_key, month_date, date_published"),
+    ("awards_clean_all", "buyer_key, month_date, award_date"),
+    ("awards_fact", "buyer_key, month_date, award_date"),
+    *((table, "buyer_key, month_date") for table in ROLLUPS),
+]
+
+# table -> sort order restored by cluster_tables().
+CLUSTERED = [
+    *MONTH_CLUSTERED,
+    ("awards_by_supplier", "supplier_key, award_date DESC NULLS LAST"),
+    ("low_competition_tenders", "buyer_key, date_published DESC NULLS LAST, COALESCE(nog, '') DESC"),
+]
+
+
+def refresh_rollups(con, month: str | None = None) -> None:
+    """Recompute derived rows for one month, or for all months if month is None. Caller owns the transaction."""
+    if month is None:
+        where_a, params = "1=1", []
+    else:
+        where_a, params = "month = ?", [month]
+    for table, select in DERIVED.items():
+        con.execute(f"DELETE FROM {table} WHERE {where_a}", params)
+        con.execute(f"INSERT INTO {table} BY NAME {select.format(where_a=where_a)}", params * select.count("{where_a}"))
+
+
+def refresh_buyers(con) -> None:
+    """Rebuild the buyers table from the rollups. Caller owns the transaction."""
+    con.execute("DELETE FROM buyers")
+    con.execute(f"INSERT INTO buyers BY NAME {BUYERS_SELECT}")
+
+
+def manifest_summary() -> list:
+    """updated_at, file count, last download and package publish range from ingest_manifest.json (NULLs if absent)."""
+    try:
+        with open(config.MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return [None] * 5
+    files = (manifest.get("files") or {}).values()
+    downloaded = [v["downloaded_at"] for v in files if v.get("downloaded_at")]
+    published = [v["package_published_date"] for v in files if v.get("package_published_date")]
+    return [
+        manifest.get("updated_at"),
+        len(files),
+        max(downloaded) if downloaded else None,
+        min(published) if published else None,
+        max(published) if published else None,
+    ]
+
+
+def refresh_dataset_meta(con) -> None:
+    """Rebuild dataset_meta from the rollups, buyers and the manifest. Caller owns the transaction."""
+    con.execute("DELETE FROM dataset_meta")
+    con.execute(f"INSERT INTO dataset_meta BY NAME {DATASET_META_SELECT}", manifest_summary())
+
+
+# Award count / amount per (buyer_key, month, k) that check_awards_fact() compares with the join.
+_JOINED_BY_MODALITY = """
+    SELECT a.buyer_key, a.month, t.procurement_method_details AS k, COUNT(*) AS n, SUM(a.amount) AS total
+    FROM tenders_clean_all t
+    JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month AND t.buyer_key = a.buyer_key
+    GROUP BY ALL
+"""
+FACT_CHECKS = [
+    (
+        "awards_fact vs awards_clean_all",
+        "SELECT buyer_key, month, NULL AS k, COUNT(*) AS n, SUM(amount) AS total FROM awards_fact GROUP BY ALL",
+        "SELECT buyer_key, month, NULL AS k, COUNT(*) AS n, SUM(amount) AS total FROM awards_clean_all GROUP BY ALL",
+    ),
+    (
+        "awards_fact vs tenders JOIN awards",
+        """SELECT buyer_key, month, procurement_method_details AS k, COUNT(*) AS n, SUM(amount) AS total
+        FROM awards_fact WHERE has_tender GROUP BY ALL""",
+        _JOINED_BY_MODALITY,
+    ),
+    # /api/modalities sums the per-month procesos; that equals COUNT(DISTINCT nog) only while no
+    # NOG of a buyer and modality spans two months, so a lake where one does fails the build.
+    (
+        "tenders_by_month_modality procesos vs COUNT(DISTINCT nog)",
+        """SELECT buyer_key, NULL AS month, procurement_method_details AS k, SUM(procesos) AS n, NULL AS total
+        FROM tenders_by_month_modality GROUP BY ALL""",
+        """SELECT buyer_key, NULL AS month, procurement_method_details AS k, COUNT(DISTINCT nog) AS n, NULL AS total
+        FROM tenders_clean_all GROUP BY ALL""",
+    ),
+    (
+        "awards_by_month_modality_supplier vs tenders JOIN awards",
+        """SELECT buyer_key, month, procurement_method_details AS k, SUM(awards_count) AS n, SUM(total_amount) AS total
+        FROM awards_by_month_modality_supplier GROUP BY ALL""",
+        _JOINED_BY_MODALITY,
+    ),
+]
+
+
+def check_awards_fact(con, limit: int = 20) -> list[str]:
+    """
+    Mismatches between the denormalized award tables and the tenders x awards join they replace
+    (award count and amount per buyer, month and modality), and NOGs counted in more than one
+    month of tenders_by_month_modality; empty list = consistent.
+    """
+    problems = []
+    for label, left, right in FACT_CHECKS:
+        rows = con.execute(f"""
+            WITH l AS ({left}), r AS ({right})
+            SELECT COALESCE(l.buyer_key, r.buyer_key), COALESCE(l.month, r.month), COALESCE(l.k, r.k),
+                l.n, r.n, l.total, r.total
+            FROM l FULL JOIN r
+                ON l.buyer_key IS NOT DISTINCT FROM r.buyer_key
+                AND l.month IS NOT DISTINCT FROM r.month
+                AND l.k IS NOT DISTINCT FROM r.k
+            WHERE l.n IS DISTINCT FROM r.n OR ABS(COALESCE(l.total, 0) - COALESCE(r.total, 0)) > 0.01
+            ORDER BY 2, 3
+            LIMIT {int(limit)}
+        """).fetchall()
+        problems.extend(
+            f"{label}: buyer_key={bk} month={m} modality={k!r} count {ln} vs {rn}, amount {lt} vs {rt}"
+            for bk, m, k, ln, rn, lt, rt in rows
+        )
+    return problems
+
+
+def backfill_typed_months(con) -> None:
+    """Fill year / month_date on rows ingested before those columns existed."""
+    for table in ("tenders_clean_all", "awards_clean_all"):
+        con.execute(f"""
+            UPDATE {table}
+            SET year = CAST(SUBSTR(month, 1, 4) AS SMALLINT),
+                month_date = CAST(month || '-01' AS DATE)
+            WHERE month_date IS NULL AND month IS NOT NULL
+        """)
+
+
+def backfill_competition_level(con) -> None:
+    """Fill competition_level on tenders ingested before the column existed."""
+    con.execute(f"""
+        UPDATE tenders_clean_all
+        SET competition_level = {competition_level_sql()}
+        WHERE competition_level IS NULL
+    """)
+
+
+def backfill_buyer_key(con) -> None:
+    """Fill buyer_key on rows ingested before the column existed."""
+    for table in ("tenders_clean_all", "awards_clean_all"):
+        con.execute(f"UPDATE {table} SET buyer_key = {buyer_key_sql()} WHERE buyer_key IS NULL")
+
+
+def cluster_tables(con) -> None:
+    """
+    Rewrite tables in their CLUSTERED order (buyer, month_date; supplier / listing order for the side tables).
+    Per-month ingest appends, so a re-ingested old month ends up after newer ones and a month's
+    suppliers after everyone else's; sorting restores tight min/max per row group.
+    """
+    for table, order in CLUSTERED:
+        con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM {table} ORDER BY {order}")
+
+
+def build_search_index(con) -> bool:
+    """
+    (Re)build the BM25 full-text index over search_docs.title (schema fts_main_search_docs): Spanish
+    stemmer, lowercased, accents stripped, SEARCH_STOPWORDS dropped. Needs DuckDB's fts extension
+    (installed on first use); without it returns False and /api/search scans titles instead.
+    Run outside a transaction, after search_docs is final (the index does not follow later inserts).
+    """
+    import duckdb
+    con.execute("DELETE FROM search_stopwords")
+    con.execute("INSERT INTO search_stopwords SELECT UNNEST(?::VARCHAR[])", [list(SEARCH_STOPWORDS)])
+    try:
+        con.execute("INSTALL fts")
+        con.execute("LOAD fts")
+    except duckdb.Error:
+        return False
+    con.execute(r"""
+        PRAGMA create_fts_index('search_docs', 'doc_id', 'title', stemmer = 'spanish',
+            stopwords = 'search_stopwords', ignore = '(\.|[^a-z0-9])+',
+            strip_accents = 1, lower = 1, overwrite = 1)
+    """)
+    return True
+
+
+def refresh_all(con, month: str | None = None) -> None:
+    """Every derived table, for one month or the whole DB."""
+    if month is None:
+        backfill_typed_months(con)
+        backfill_competition_level(con)
+        backfill_buyer_key(con)
+    refresh_rollups(con, month)
+    refresh_buyers(con)
+    refresh_dataset_meta(con)
+
+
+def main() -> None:
+    which = sys.argv[1] if len(sys.argv) > 1 else "lake_next.duckdb"
+    path = config.DB_PATH if which == "lake.duckdb" else config.DB_PATH_NEXT
+    if not os.path.isfile(path):
+        print(f"DB not found: {path}", file=sys.stderr)
+        sys.exit(1)
+
+    import duckdb
+    con = duckdb.connect(path)
+    try:
+        with open(os.path.join(PROJECT_ROOT, "sql", "schema.sql")) as f:
+            con.execute(f.read())
+        con.execute("BEGIN")
+        try:
+            refresh_all(con)
+            cluster_tables(con)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        print(f"Derived tables rebuilt in {path}")
+        if build_search_index(con):
+            print("Full-text index rebuilt")
+        else:
+            print("Full-text index not built: DuckDB fts extension unavailable", file=sys.stderr)
+        problems = check_awards_fact(con)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Write a lake holding one buyer's rows, with every derived table rebuilt for them: the artifact the
+daily workflow commits as data/lake.duckdb. Ingest keeps every buyer in Guatemala, which is far too
+big to commit to git every day; the portal's default buyer stays small.
+Usage: python scripts/export_buyer_lake.py [--buyer NAME] [--source PATH] [OUTPUT]
+  Defaults: buyer config.DEFAULT_BUYER, source the served DB (current generation, else lake.duckdb),
+  output data/lake.duckdb. The output is built next to OUTPUT, checked like a published generation
+  (tables, awards_fact against the join) and renamed over it only if it passes.
+"""
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import config
+from backend.db import buyer_key, validate_db
+from scripts.derived_tables import build_search_index, check_awards_fact, cluster_tables, refresh_all
+
+# Ingested tables; everything else is derived from them.
+BASE_TABLES = ("tenders_clean_all", "awards_clean_all")
+
+
+def export(source: str, output: str, buyer: str) -> dict:
+    """Build output from source's rows for buyer; returns row counts. ValueError if the result is unusable."""
+    import duckdb
+
+    tmp = f"{output}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = duckdb.connect(tmp)
+    try:
+        with open(os.path.join(PROJECT_ROOT, "sql", "schema.sql")) as f:
+            con.execute(f.read())
+        con.execute(f"ATTACH '{source.replace(chr(39), chr(39) * 2)}' AS src (READ_ONLY)")
+        counts = {}
+        con.execute("BEGIN")
+        try:
+            for table in BASE_TABLES:
+                con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM src.{table} WHERE buyer_key = ?", [buyer_key(buyer)])
+                counts[table] = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            refresh_all(con)
+            cluster_tables(con)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("DETACH src")
+        if not build_search_index(con):
+            print("Full-text index not built: DuckDB fts extension unavailable", file=sys.stderr)
+        problems = check_awards_fact(con)
+    finally:
+        con.close()
+    problems += validate_db(tmp)
+    if problems:
+        os.remove(tmp)
+        raise ValueError(f"{buyer!r} lake not written: {'; '.join(problems)}")
+    os.replace(tmp, output)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a single-buyer lake (the committed data/lake.duckdb)")
+    parser.add_argument("output", nargs="?", default=config.DB_PATH)
+    parser.add_argument("--buyer", default=config.DEFAULT_BUYER, help="buyer name (default: config.DEFAULT_BUYER)")
+    parser.add_argument("--source", default=None, help="full lake (default: the served DB)")
+    args = parser.parse_args()
+
+    source = os.path.abspath(args.source) if args.source else config.served_db_path()
+    output = os.path.abspath(args.output)
+    if not os.path.isfile(source):
+        print(f"DB not found: {source}", file=sys.stderr)
+        sys.exit(1)
+    if source == output:
+        print("Source and output are the same file; pass --source or another output", file=sys.stderr)
+        sys.exit(1)
+    try:
+        counts = export(source, output, args.buyer)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {output} for {args.buyer}: {counts['tenders_clean_all']} tenders, {counts['awards_clean_all']} awards")
+
+
+if __name__ == "__main__":
+    main()
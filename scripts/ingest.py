@@ -4,17 +4,22 @@ Ingest one month of Guatecompras OCDS: JSON -> NDJSON -> DuckDB.
 Usage: python scripts/ingest.py 2026-02 [path_to_json]
   If path_to_json omitted, uses data/2026-02_Guatecompras.json
   Builds data/lake_next.duckdb (or appends if existing); atomic swap is separate.
+  Keeps every buyer in the file, keyed by buyer_key (the API filters on it).
+  Also refreshes that month's rows in the derived tables (scripts/derived_tables.py) and rebuilds
+  the full-text index (skipped with INGEST_SEARCH_INDEX=0; ingest_all.py builds it once at the end).
   Logs to data/logs/ingest.log (and console).
 """
 import os
 import subprocess
 import sys
 import traceback
+from datetime import date
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 import config
+from scripts.derived_tables import build_search_index, buyer_key_sql, competition_level_sql, refresh_all
 from scripts.ingest_logging import setup_ingest_logging
 
 logger = setup_ingest_logging("ingest.one")
@@ -25,6 +30,12 @@ def main() -> None:
         logger.error("Usage: python scripts/ingest.py YYYY-MM [path_to_json]")
         sys.exit(1)
     month = sys.argv[1]
+    try:
+        year, month_num = (int(x) for x in month.split("-"))
+        month_date = date(year, month_num, 1)
+    except ValueError:
+        logger.error("Invalid month %r, expected YYYY-MM", month)
+        sys.exit(1)
     json_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
         config.DATA_DIR, f"{month}_Guatecompras.json"
     )
@@ -50,14 +61,12 @@ def main() -> None:
         with open(os.path.join(sql_dir, "schema.sql")) as f:
             con.execute(f.read())
 
-        buyer = config.BUYER_ANTIGUA
-
         con.execute("BEGIN")
         try:
             con.execute("DELETE FROM tenders_clean_all WHERE month = ?", [month])
             con.execute("DELETE FROM awards_clean_all WHERE month = ?", [month])
 
-            con.execute("""
+            con.execute(f"""
             INSERT INTO tenders_clean_all
             SELECT
                 ocid,
@@ -69,12 +78,13 @@ def main() -> None:
                 compiledRelease.tender.numberOfTenderers,
                 compiledRelease.tender.status,
                 compiledRelease.tender.statusDetails,
-                ?
+                ?, ?, ?,
+                {competition_level_sql("compiledRelease.tender.numberOfTenderers")},
+                {buyer_key_sql("compiledRelease.buyer.name")}
             FROM read_json_auto(?)
-            WHERE compiledRelease.buyer.name = ?
-        """, [month, ndjson_path, buyer])
+        """, [month, year, month_date, ndjson_path])
 
-            con.execute("""
+            con.execute(f"""
             INSERT INTO awards_clean_all
             SELECT
                 r.ocid,
@@ -87,17 +97,21 @@ def main() -> None:
                 unnest.value.currency,
                 unnest.suppliers[1].name,
                 unnest.suppliers[1].id,
-                ?
+                ?, ?, ?,
+                {buyer_key_sql("r.compiledRelease.buyer.name")}
             FROM read_json_auto(?) r,
                  unnest(r.compiledRelease.awards)
-            WHERE r.compiledRelease.buyer.name = ?
-        """, [month, ndjson_path, buyer])
+        """, [month, year, month_date, ndjson_path])
+
+            refresh_all(con, month)
 
             con.execute("COMMIT")
         except Exception:
             con.execute("ROLLBACK")
             raise
 
+        if os.getenv("INGEST_SEARCH_INDEX", "1") != "0" and not build_search_index(con):
+            logger.warning("Full-text index not built: DuckDB fts extension unavailable")
         con.close()
         logger.info("INGEST_FINISH month=%s success=True db_path=%s", month, db_path)
     except subprocess.CalledProcessError as e:
@@ -2,7 +2,10 @@
 """
 Run ingest for a range of months (JSON -> NDJSON -> DuckDB).
 Usage: python scripts/ingest_all.py [--from-year 2024] [--to-year 2026] [--to-month 2]
-  Default: 2024-01 through 2026-02. Writes to lake_next.duckdb; atomic swap is separate.
+  Default: 2024-01 through 2026-02. Writes to lake_next.duckdb; publishing it (scripts/publish_generation.py) is separate.
+  After the last month, tables are re-sorted by month or supplier (see scripts/derived_tables.py)
+  and awards_fact is checked against the tenders x awards join (exit 1 on mismatch); the full-text
+  index over titles is built once, after the last month.
   Logs to data/logs/ingest.log (and console). On failure, full error is in the log.
 """
 import argparse
@@ -15,6 +18,7 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
 
 import config
+from scripts.derived_tables import build_search_index, check_awards_fact, cluster_tables
 from scripts.ingest_logging import setup_ingest_logging
 
 logger = setup_ingest_logging("ingest.all")
@@ -43,6 +47,7 @@ def main() -> None:
     )
     start_sec = time.time()
     ingested = 0
+    ingest_env = {**os.environ, "INGEST_SEARCH_INDEX": "0"}
 
     try:
         for i, month in enumerate(months):
@@ -58,6 +63,7 @@ def main() -> None:
                 capture_output=True,
                 text=True,
                 timeout=600,
+                env=ingest_env,
             )
 
             if r.returncode != 0:
@@ -68,12 +74,29 @@ def main() -> None:
                 sys.exit(1)
             ingested += 1
 
+        if ingested:
+            logger.info("Sorting tables by month / supplier db_path=%s", config.DB_PATH_NEXT)
+            import duckdb
+            con = duckdb.connect(config.DB_PATH_NEXT)
+            try:
+                cluster_tables(con)
+                problems = check_awards_fact(con)
+                if not build_search_index(con):
+                    logger.warning("Full-text index not built: DuckDB fts extension unavailable")
+            finally:
+                con.close()
+            if problems:
+                for problem in problems:
+                    logger.error("AWARDS_FACT_MISMATCH %s", problem)
+                logger.error("INGEST_ALL_FINISH status=failure reason=awards_fact_mismatch db_path=%s", config.DB_PATH_NEXT)
+                sys.exit(1)
+
         duration_sec = round(time.time() - start_sec, 1)
         logger.info(
             "INGEST_ALL_FINISH status=success ingested=%s skipped=%s duration_sec=%s db_path=%s",
             ingested, skipped, duration_sec, config.DB_PATH_NEXT,
         )
-        logger.info("Atomic swap when ready: mv data/lake_next.duckdb data/lake.duckdb")
+        logger.info("Publish when ready: python scripts/publish_generation.py lake_next.duckdb")
     except subprocess.TimeoutExpired as e:
         logger.exception("INGEST_ALL_FAILED month=%s reason=timeout timeout=%s", e.cmd[-1] if e.cmd else "?", e.timeout)
         sys.exit(1)
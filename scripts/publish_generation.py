@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Publish a DB as a new generation for the API, instead of `mv` over the file it is reading.
+Usage: python scripts/publish_generation.py [lake_next.duckdb|lake.duckdb|PATH] [--copy] [--keep 3]
+       python scripts/publish_generation.py --activate NAME   # roll back/forward to an existing generation
+       python scripts/publish_generation.py --list
+  Moves (or with --copy, copies) the DB to data/generations/<UTC timestamp>/lake.duckdb, checks
+  that it opens and has every table the API reads (and tenders), then atomically rewrites
+  data/generations/current. Running API processes switch new requests to it within
+  DB_SWAP_CHECK_SECONDS and close the old generation once its requests finish.
+  Only the newest --keep generations (current included) are kept on disk.
+"""
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import config
+from backend.db import validate_db
+
+
+def _source_path(which: str) -> str:
+    if which == "lake_next.duckdb":
+        return config.DB_PATH_NEXT
+    if which == "lake.duckdb":
+        return config.DB_PATH
+    return os.path.abspath(which)
+
+
+def generation_db(name: str) -> str:
+    return os.path.join(config.GENERATIONS_DIR, name, config.GENERATION_DB_NAME)
+
+
+def current_name() -> str | None:
+    try:
+        with open(config.CURRENT_GENERATION_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def list_generations() -> list[str]:
+    """Published generation names, oldest first (names are UTC timestamps)."""
+    if not os.path.isdir(config.GENERATIONS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(config.GENERATIONS_DIR)
+        if not name.startswith(".") and os.path.isfile(generation_db(name))
+    )
+
+
+def activate(name: str) -> None:
+    """Point generations/current at name (write-then-rename, so readers see old or new, never half)."""
+    tmp = f"{config.CURRENT_GENERATION_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, config.CURRENT_GENERATION_PATH)
+
+
+def prune(keep: int) -> list[str]:
+    """Delete all but the newest `keep` generations (never the current one) and stale staging dirs."""
+    current = current_name()
+    names = list_generations()
+    newest = set(names[-keep:]) if keep > 0 else set()
+    removed = []
+    for name in names:
+        if name != current and name not in newest:
+            # A still-running API may have this file open; on POSIX it stays readable until closed.
+            shutil.rmtree(os.path.join(config.GENERATIONS_DIR, name), ignore_errors=True)
+            removed.append(name)
+    for name in os.listdir(config.GENERATIONS_DIR):
+        if name.startswith(".staging-") and not name.endswith(f"-{os.getpid()}"):
+            shutil.rmtree(os.path.join(config.GENERATIONS_DIR, name), ignore_errors=True)
+    return removed
+
+
+def publish(source: str, copy: bool = False, keep: int = 3) -> str:
+    """Stage, validate and activate source as a new generation; returns its name."""
+    os.makedirs(config.GENERATIONS_DIR, exist_ok=True)
+    name = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    base, n = name, 1
+    while os.path.exists(os.path.join(config.GENERATIONS_DIR, name)):
+        name, n = f"{base}-{n}", n + 1
+    staging = os.path.join(config.GENERATIONS_DIR, f".staging-{name}-{os.getpid()}")
+    os.makedirs(staging)
+    staged_db = os.path.join(staging, config.GENERATION_DB_NAME)
+    try:
+        if copy:
+            shutil.copy2(source, staged_db)
+        else:
+            shutil.move(source, staged_db)
+        problems = validate_db(staged_db)
+        if problems:
+            if not copy:
+                shutil.move(staged_db, source)  # give the unpublished DB back
+            raise ValueError(f"{source} not published: {'; '.join(problems)}")
+        os.replace(staging, os.path.join(config.GENERATIONS_DIR, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    activate(name)
+    prune(keep)
+    return name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish a DB generation for the API")
+    parser.add_argument("source", nargs="?", default="lake_next.duckdb")
+    parser.add_argument("--copy", action="store_true", help="copy the source instead of moving it")
+    parser.add_argument("--keep", type=int, default=3, help="generations to keep on disk (default 3)")
+    parser.add_argument("--activate", metavar="NAME", help="make an existing generation current")
+    parser.add_argument("--list", action="store_true", help="list generations and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        current = current_name()
+        for name in list_generations():
+            print(f"{'*' if name == current else ' '} {name}")
+        print(f"Serving: {config.served_db_path()}")
+        return
+
+    if args.activate:
+        if args.activate not in list_generations():
+            print(f"No generation {args.activate!r} in {config.GENERATIONS_DIR}", file=sys.stderr)
+            sys.exit(1)
+        problems = validate_db(generation_db(args.activate))
+        if problems:
+            print(f"Generation {args.activate} not activated: {'; '.join(problems)}", file=sys.stderr)
+            sys.exit(1)
+        activate(args.activate)
+        print(f"Current generation: {args.activate}")
+        return
+
+    source = _source_path(args.source)
+    if not os.path.isfile(source):
+        print(f"DB not found: {source}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        name = publish(source, copy=args.copy, keep=args.keep)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    print(f"Published generation {name}: {generation_db(name)}")
+
+
+if __name__ == "__main__":
+    main()
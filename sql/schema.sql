@@ -1,5 +1,9 @@
--- Consolidated tables for transparency portal. Ingest script fills these from NDJSON.
--- buyer_name filter is applied at insert time (see scripts/ingest.py).
+-- Consolidated tables for transparency portal. Ingest script fills these from NDJSON, every buyer.
+-- buyer_key = md5_number_upper(COALESCE(buyer_name, '')) (see backend.db.buyer_key) is the compact
+-- buyer id the API filters on; tables are kept sorted by buyer_key first (cluster_tables in
+-- scripts/derived_tables.py), so one buyer's rows share row groups. month is the 'YYYY-MM' key
+-- of the monthly file; year / month_date are the same value typed, used by the API filters
+-- (range predicates, row-group pruning).
 
 CREATE TABLE IF NOT EXISTS tenders_clean_all (
     ocid VARCHAR,
@@ -11,7 +15,11 @@ CREATE TABLE IF NOT EXISTS tenders_clean_all (
     number_of_tenderers BIGINT,
     tender_status VARCHAR,
     tender_status_details VARCHAR,
-    month VARCHAR
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    competition_level VARCHAR,  -- '0', '1', '2+' or 'unknown' (number_of_tenderers NULL)
+    buyer_key UBIGINT
 );
 
 CREATE TABLE IF NOT EXISTS awards_clean_all (
@@ -25,5 +33,196 @@ CREATE TABLE IF NOT EXISTS awards_clean_all (
     currency VARCHAR,
     supplier_name VARCHAR,
     supplier_id VARCHAR,
-    month VARCHAR
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    buyer_key UBIGINT
 );
+
+-- One row per award with its tender's modality, status, bidder count and publish date, joined
+-- once at ingest on (nog, month, buyer_key) so nothing downstream joins tenders to awards.
+-- has_tender is false (tender columns NULL) for awards whose tender is not in the same month file.
+-- check_awards_fact in scripts/derived_tables.py verifies it against the join.
+CREATE TABLE IF NOT EXISTS awards_fact (
+    ocid VARCHAR,
+    nog VARCHAR,
+    title VARCHAR,
+    award_id VARCHAR,
+    award_date VARCHAR,
+    amount DOUBLE,
+    currency VARCHAR,
+    supplier_name VARCHAR,
+    supplier_id VARCHAR,
+    procurement_method_details VARCHAR,
+    tender_status VARCHAR,
+    number_of_tenderers BIGINT,
+    date_published VARCHAR,
+    has_tender BOOLEAN,
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    buyer_key UBIGINT
+);
+
+-- Month-level rollups per buyer (see scripts/derived_tables.py). Rebuilt per month at ingest so
+-- the aggregate API endpoints never scan award/tender rows. All API filters are by buyer and month.
+
+CREATE TABLE IF NOT EXISTS awards_by_month_supplier (
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    supplier_name VARCHAR,
+    awards_count BIGINT,
+    total_amount DOUBLE,
+    buyer_key UBIGINT
+);
+
+CREATE TABLE IF NOT EXISTS awards_by_month_band (
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    band VARCHAR,
+    awards_count BIGINT,
+    total_amount DOUBLE,
+    min_amount DOUBLE,
+    buyer_key UBIGINT
+);
+
+-- Awards with a tender (awards_fact.has_tender), by the tender's modality.
+CREATE TABLE IF NOT EXISTS awards_by_month_modality_supplier (
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    procurement_method_details VARCHAR,
+    supplier_name VARCHAR,
+    awards_count BIGINT,
+    total_amount DOUBLE,
+    buyer_key UBIGINT
+);
+
+-- procesos = distinct NOGs in the month; a NOG belongs to the monthly file it was published in.
+-- Endpoints SUM it across months, which is COUNT(DISTINCT nog) as long as no NOG spans two months:
+-- check_awards_fact (scripts/derived_tables.py) fails the ingest if one does.
+CREATE TABLE IF NOT EXISTS tenders_by_month_modality (
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    procurement_method_details VARCHAR,
+    tenders_count BIGINT,
+    procesos BIGINT,
+    buyer_key UBIGINT
+);
+
+-- Award rows sorted by supplier_key = md5_number_upper(COALESCE(supplier_name, '')) (see
+-- cluster_tables in scripts/derived_tables.py), so a supplier drill-down reads only the row
+-- groups holding that supplier.
+CREATE TABLE IF NOT EXISTS awards_by_supplier (
+    supplier_key UBIGINT,
+    supplier_name VARCHAR,
+    award_date VARCHAR,
+    nog VARCHAR,
+    title VARCHAR,
+    amount DOUBLE,
+    currency VARCHAR,
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    buyer_key UBIGINT
+);
+
+-- Tenders with competition_level '0', '1' or 'unknown', sorted newest first like
+-- /api/low-competition lists them (keyset pages read consecutive rows).
+CREATE TABLE IF NOT EXISTS low_competition_tenders (
+    nog VARCHAR,
+    title VARCHAR,
+    procurement_method_details VARCHAR,
+    number_of_tenderers BIGINT,
+    competition_level VARCHAR,
+    date_published VARCHAR,
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    buyer_key UBIGINT
+);
+
+-- Tender and award titles for /api/search, one row per tender / award. doc_id (from the
+-- search_doc_id sequence) is the key of the BM25 full-text index fts_main_search_docs, built over
+-- title at the end of ingest (build_search_index in scripts/derived_tables.py).
+CREATE SEQUENCE IF NOT EXISTS search_doc_id;
+CREATE TABLE IF NOT EXISTS search_docs (
+    doc_id BIGINT,
+    kind VARCHAR,  -- 'tender' or 'award'
+    nog VARCHAR,
+    title VARCHAR,
+    doc_date VARCHAR,  -- date_published (tender) / award_date (award)
+    procurement_method_details VARCHAR,
+    supplier_name VARCHAR,  -- awards only
+    amount DOUBLE,  -- awards only
+    month VARCHAR,
+    year SMALLINT,
+    month_date DATE,
+    buyer_key UBIGINT
+);
+
+-- Words left out of the full-text index and of /api/search queries (lowercase, no accents).
+CREATE TABLE IF NOT EXISTS search_stopwords (
+    sw VARCHAR
+);
+
+-- One row per buyer, for /api/buyers (rebuilt whole at every ingest).
+CREATE TABLE IF NOT EXISTS buyers (
+    buyer_key UBIGINT,
+    buyer_name VARCHAR,
+    tenders_count BIGINT,
+    awards_count BIGINT,
+    total_amount DOUBLE,
+    first_month VARCHAR,
+    last_month VARCHAR
+);
+
+-- Filter options, counts and manifest summary for the API (backend/dataset_meta.py), so it doesn't
+-- scan tables for DISTINCT months / buyers per request. One row per buyer plus one with
+-- buyer_key NULL for the whole DB; rebuilt whole at every ingest from the rollups. The manifest
+-- columns are ingest_manifest.json as of that ingest.
+CREATE TABLE IF NOT EXISTS dataset_meta (
+    buyer_key UBIGINT,
+    months VARCHAR[],
+    years VARCHAR[],
+    modalities VARCHAR[],  -- procurement_method_details, NULL as '(Sin especificar)'
+    buyer_names VARCHAR[],
+    tenders_count BIGINT,
+    awards_count BIGINT,
+    manifest_updated_at VARCHAR,
+    manifest_files BIGINT,
+    last_downloaded VARCHAR,
+    package_published_min VARCHAR,
+    package_published_max VARCHAR,
+    built_at TIMESTAMP
+);
+
+-- Upgrade DBs created before year / month_date existed (backfilled by scripts/derived_tables.py).
+ALTER TABLE tenders_clean_all ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE tenders_clean_all ADD COLUMN IF NOT EXISTS month_date DATE;
+ALTER TABLE awards_clean_all ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE awards_clean_all ADD COLUMN IF NOT EXISTS month_date DATE;
+ALTER TABLE awards_by_month_supplier ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE awards_by_month_supplier ADD COLUMN IF NOT EXISTS month_date DATE;
+ALTER TABLE awards_by_month_band ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE awards_by_month_band ADD COLUMN IF NOT EXISTS month_date DATE;
+ALTER TABLE awards_by_month_modality_supplier ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE awards_by_month_modality_supplier ADD COLUMN IF NOT EXISTS month_date DATE;
+ALTER TABLE tenders_by_month_modality ADD COLUMN IF NOT EXISTS year SMALLINT;
+ALTER TABLE tenders_by_month_modality ADD COLUMN IF NOT EXISTS month_date DATE;
+
+-- Upgrade DBs created before competition_level existed (backfilled by scripts/derived_tables.py).
+ALTER TABLE tenders_clean_all ADD COLUMN IF NOT EXISTS competition_level VARCHAR;
+
+-- Upgrade single-buyer DBs created before buyer_key existed (backfilled / rebuilt by scripts/derived_tables.py).
+ALTER TABLE tenders_clean_all ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE awards_clean_all ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE awards_by_month_supplier ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE awards_by_month_band ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE awards_by_month_modality_supplier ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE tenders_by_month_modality ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE awards_by_supplier ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
+ALTER TABLE low_competition_tenders ADD COLUMN IF NOT EXISTS buyer_key UBIGINT;
@@ -0,0 +1,177 @@
+"""
+Small lakes for the tests: sql/schema.sql plus the given tender / award rows, with every derived
+table built by scripts/derived_tables.py as ingest would (typed months, buyer_key, rollups,
+side tables, buyers, dataset_meta, sort order), and a test case serving one through the API.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import duckdb
+
+import config
+from scripts.derived_tables import build_search_index, cluster_tables, refresh_all
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANTIGUA = "MUNICIPALIDAD DE ANTIGUA GUATEMALA, SACATEPÉQUEZ"
+MIXCO = "MUNICIPALIDAD DE MIXCO, GUATEMALA"
+
+
+def tender(nog: str, month: str, buyer: str = ANTIGUA, modality: str | None = "Compra Directa",
+           tenderers: int | None = 2, title: str | None = None, published: str | None = None) -> dict:
+    return {
+        "ocid": f"ocds-{nog}",
+        "nog": nog,
+        "buyer_name": buyer,
+        "title": title or f"Proceso {nog}",
+        "date_published": published or f"{month}-10T00:00:00Z",
+        "procurement_method_details": modality,
+        "number_of_tenderers": tenderers,
+        "month": month,
+    }
+
+
+def award(nog: str, month: str, amount: float, supplier: str | None, buyer: str = ANTIGUA,
+          award_id: str | None = None, date: str | None = None) -> dict:
+    return {
+        "ocid": f"ocds-{nog}",
+        "nog": nog,
+        "buyer_name": buyer,
+        "title": f"Proceso {nog}",
+        "award_id": award_id or f"{nog}-1",
+        "award_date": date or f"{month}-20T00:00:00Z",
+        "amount": amount,
+        "currency": "GTQ",
+        "supplier_name": supplier,
+        "month": month,
+    }
+
+
+def _insert(con, table: str, rows: list[dict]) -> None:
+    for row in rows:
+        cols = list(row)
+        con.execute(
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+            [row[c] for c in cols],
+        )
+
+
+def build_lake(path: str, tenders: list[dict], awards: list[dict]) -> str:
+    """Write a lake with these rows to path (replaced if it exists); returns path."""
+    if os.path.exists(path):
+        os.remove(path)
+    con = duckdb.connect(path)
+    try:
+        with open(os.path.join(PROJECT_ROOT, "sql", "schema.sql")) as f:
+            con.execute(f.read())
+        _insert(con, "tenders_clean_all", tenders)
+        _insert(con, "awards_clean_all", awards)
+        refresh_all(con)
+        cluster_tables(con)
+        build_search_index(con)
+    finally:
+        con.close()
+    return path
+
+
+MODALITIES = ("Compra Directa", "Cotización", "Licitación Pública", None)
+SUPPLIERS = ("CONSTRUCTORA PÉREZ, S.A.", "SERVICIOS GARCÍA", "FERRETERÍA EL SOL", "DISTRIBUIDORA LÓPEZ",
+             "TRANSPORTES MAYA", "PAPELERÍA CENTRAL", "INGENIEROS UNIDOS", None)
+MONTHS = ("2024-11", "2024-12", "2025-01", "2025-02", "2025-03")
+TITLE_WORDS = ("compra de materiales", "servicio de limpieza", "construcción de muro", "mantenimiento de calles",
+               "adquisición de equipo")
+
+
+def sample_rows(seed: int = 7) -> tuple[list[dict], list[dict]]:
+    """
+    Two buyers over five months: every modality and supplier (plus unnamed ones), amounts in every
+    band, tenders without awards, awards whose tender is in another month's file (no has_tender),
+    shared publish dates (cursor ties) and missing ones (NULLS LAST), and every competition level.
+    """
+    import random
+
+    rng = random.Random(seed)
+    tenders, awards = [], []
+    n = 0
+    for buyer, per_month in ((ANTIGUA, 9), (MIXCO, 5)):
+        for month in MONTHS:
+            for i in range(per_month):
+                n += 1
+                nog = f"{20000 + n}"
+                published = None if i == 0 else f"{month}-{1 + i % 3:02d}T00:00:00Z"
+                tenders.append(tender(
+                    nog, month, buyer, modality=MODALITIES[n % len(MODALITIES)],
+                    tenderers=(None, 0, 1, 2, 5)[n % 5],
+                    title=f"{TITLE_WORDS[n % len(TITLE_WORDS)].capitalize()} lote {n}", published=published,
+                ))
+                for k in range(n % 3):
+                    awards.append(award(
+                        nog, month, round(rng.choice((5000, 24999.99, 25000, 60000.5, 90000, 250000)) * rng.random() + 1000, 2),
+                        SUPPLIERS[rng.randrange(len(SUPPLIERS))], buyer, award_id=f"{nog}-{k}",
+                        date=None if n % 11 == 0 else f"{month}-{10 + k:02d}T00:00:00Z",
+                    ))
+            # Award whose tender was published in another month's file.
+            n += 1
+            awards.append(award(f"{90000 + n}", month, 12345.67, SUPPLIERS[n % 3], buyer, award_id=f"{90000 + n}-0"))
+    return tenders, awards
+
+
+def sample_lake(path: str) -> str:
+    tenders, awards = sample_rows()
+    return build_lake(path, tenders, awards)
+
+
+class LakeApiTestCase(unittest.TestCase):
+    """The API app (TestClient, no warm-up) serving sample_lake() from a temp dir, default buyer Antigua."""
+
+    @classmethod
+    def setUpClass(cls):
+        import logging
+        import warnings
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        logging.getLogger("backend").setLevel(logging.WARNING)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            from fastapi.testclient import TestClient
+
+            from backend.main import app
+        import backend.db
+
+        cls.dir = tempfile.mkdtemp(prefix=f"test_{cls.__name__}_")
+        cls.db_path = sample_lake(os.path.join(cls.dir, "lake.duckdb"))
+        cls.manager = backend.db.ConnectionManager(lambda: cls.db_path, check_interval=0, signal_path="")
+        cls._patches = [
+            mock.patch.object(config, "DB_PATH", cls.db_path),
+            mock.patch.object(config, "CURRENT_GENERATION_PATH", os.path.join(cls.dir, "generations", "current")),
+            mock.patch.object(config, "MANIFEST_PATH", os.path.join(cls.dir, "ingest_manifest.json")),
+            mock.patch.object(config, "DEFAULT_BUYER", ANTIGUA),
+            mock.patch.object(backend.db, "_manager", cls.manager),
+        ]
+        for patcher in cls._patches:
+            patcher.start()
+        cls.client = TestClient(app)
+
+    @classmethod
+    def tearDownClass(cls):
+        for patcher in reversed(cls._patches):
+            patcher.stop()
+        cls.manager.close()
+        shutil.rmtree(cls.dir, ignore_errors=True)
+
+    def get(self, path: str, params=None, status: int = 200, **headers):
+        """GET path; asserts the status code and returns the response."""
+        response = self.client.get(path, params=params, headers=headers)
+        self.assertEqual(response.status_code, status, response.text[:500])
+        return response
+
+    def raw(self, sql: str, params=None) -> list[tuple]:
+        """Rows of sql on the fixture lake, read directly (not through the API)."""
+        con = duckdb.connect(self.db_path, read_only=True)
+        try:
+            return con.execute(sql, params or []).fetchall()
+        finally:
+            con.close()
@@ -0,0 +1,113 @@
+"""
+buyer= on the data endpoints (backend.db.resolve_buyer): omitted means config.DEFAULT_BUYER,
+buyer=all lifts the filter, an unknown buyer matches nothing; and scripts/export_buyer_lake.py
+writes a lake that serves one buyer exactly as the full lake does. Run: python -m unittest discover tests
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fixtures import ANTIGUA, MIXCO, LakeApiTestCase
+
+UNKNOWN = "MUNICIPALIDAD QUE NO EXISTE"
+
+# Endpoints that take buyer= and answer from the rows of the selected buyer(s).
+ENDPOINTS = (
+    "/api/kpis", "/api/suppliers", "/api/concentration", "/api/supplier-names", "/api/bands", "/api/trend",
+    "/api/modalities", "/api/top-suppliers-by-modality", "/api/summary-by-year", "/api/low-competition",
+    "/api/tenders", "/api/awards", "/api/dashboard", "/api/filters",
+)
+
+
+class BuyerFilterTest(LakeApiTestCase):
+    def test_omitted_buyer_is_default_buyer(self):
+        for path in ENDPOINTS:
+            with self.subTest(path):
+                self.assertEqual(self.get(path).json(), self.get(path, {"buyer": ANTIGUA}).json())
+                if path != "/api/filters":  # both buyers have every month
+                    self.assertNotEqual(self.get(path).json(), self.get(path, {"buyer": MIXCO}).json())
+
+    def test_all_lifts_the_filter(self):
+        (tenders,), = self.raw("SELECT COUNT(*) FROM tenders_clean_all")
+        (awards, total), = self.raw("SELECT COUNT(*), ROUND(SUM(amount), 2) FROM awards_clean_all")
+        self.assertEqual(
+            self.get("/api/kpis", {"buyer": "all"}).json(),
+            {"tenders_count": tenders, "awards_count": awards, "total_amount": float(total)},
+        )
+        per_buyer = [self.get("/api/kpis", {"buyer": b}).json() for b in (ANTIGUA, MIXCO)]
+        self.assertEqual(tenders, sum(k["tenders_count"] for k in per_buyer))
+        self.assertEqual(len(self.get("/api/tenders", {"buyer": "ALL", "limit": 500}).json()["items"]), tenders)
+        months = self.raw("SELECT DISTINCT month FROM tenders_clean_all ORDER BY month")
+        self.assertEqual(sorted(self.get("/api/filters", {"buyer": "all"}).json()["months"]), [m for m, in months])
+
+    def test_unknown_buyer_matches_nothing(self):
+        self.assertEqual(
+            self.get("/api/kpis", {"buyer": UNKNOWN}).json(),
+            {"tenders_count": 0, "awards_count": 0, "total_amount": 0.0},
+        )
+        self.assertEqual(self.get("/api/filters", {"buyer": UNKNOWN}).json(), {"months": [], "years": []})
+        for path in ("/api/suppliers", "/api/bands", "/api/trend", "/api/modalities", "/api/summary-by-year"):
+            with self.subTest(path):
+                self.assertEqual(self.get(path, {"buyer": UNKNOWN}).json(), [])
+        for path in ("/api/tenders", "/api/awards"):
+            with self.subTest(path):
+                self.assertEqual(self.get(path, {"buyer": UNKNOWN}).json(), {"items": [], "next_cursor": None})
+        low = self.get("/api/low-competition", {"buyer": UNKNOWN}).json()
+        self.assertEqual((low["count"], low["tenders"]), (0, []))
+
+    def test_buyers_lists_every_buyer(self):
+        buyers = self.get("/api/buyers").json()
+        self.assertEqual(sorted(b["comprador"] for b in buyers), sorted([ANTIGUA, MIXCO]))
+        self.assertEqual([b["comprador"] for b in buyers if b["es_default"]], [ANTIGUA])
+        for b in buyers:
+            kpis = self.get("/api/kpis", {"buyer": b["comprador"]}).json()
+            self.assertEqual(
+                (b["procesos"], b["adjudicaciones"], b["total_q"]),
+                (kpis["tenders_count"], kpis["awards_count"], kpis["total_amount"]),
+            )
+
+
+class ExportBuyerLakeTest(LakeApiTestCase):
+    """The single-buyer lake the daily workflow commits answers like the full lake for that buyer."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import backend.db
+        from scripts.export_buyer_lake import export
+
+        cls.full = {path: cls.client.get(path, params={"buyer": MIXCO}).json() for path in ENDPOINTS}
+        export_path = os.path.join(cls.dir, "mixco.duckdb")
+        with contextlib.redirect_stderr(io.StringIO()):  # "Full-text index not built" without fts
+            cls.counts = export(cls.db_path, export_path, MIXCO)
+        # Serve the exported lake from here on (a new manager: new data version, nothing cached).
+        cls.manager.close()
+        cls.manager = backend.db.ConnectionManager(lambda: export_path, check_interval=0, signal_path="")
+        patcher = mock.patch.object(backend.db, "_manager", cls.manager)
+        patcher.start()
+        cls._patches.append(patcher)
+
+    def test_counts(self):
+        self.assertEqual(
+            self.counts,
+            {
+                "tenders_clean_all": self.raw("SELECT COUNT(*) FROM tenders_clean_all WHERE buyer_name = ?", [MIXCO])[0][0],
+                "awards_clean_all": self.raw("SELECT COUNT(*) FROM awards_clean_all WHERE buyer_name = ?", [MIXCO])[0][0],
+            },
+        )
+
+    def test_serves_buyer_like_full_lake(self):
+        self.assertEqual([b["comprador"] for b in self.get("/api/buyers").json()], [MIXCO])
+        for path in ENDPOINTS:
+            with self.subTest(path):
+                self.assertEqual(self.get(path, {"buyer": MIXCO}).json(), self.full[path])
+                self.assertEqual(self.get(path, {"buyer": "all"}).json(), self.full[path])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Supplier concentration (backend/concentration.py and /api/concentration): HHI, Gini, top-N shares
+and the Lorenz curve on hand-checked totals, and the endpoint's overall and by=modality metrics
+against the award rows of the fixture lake. Run: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.concentration import metrics, parse_top_n
+from tests.fixtures import LakeApiTestCase
+
+
+class MetricsTest(unittest.TestCase):
+    def test_equal_suppliers(self):
+        out = metrics([25.0, 25.0, 25.0, 25.0], top_n=(1, 2, 10))
+        self.assertEqual((out["suppliers"], out["total_q"], out["hhi"], out["gini"]), (4, 100.0, 2500.0, 0.0))
+        self.assertEqual(out["top_shares"], [{"n": 1, "pct": 25.0}, {"n": 2, "pct": 50.0}, {"n": 10, "pct": 100.0}])
+        self.assertEqual(out["lorenz"], [[0.0, 0.0], [0.25, 0.25], [0.5, 0.5], [0.75, 0.75], [1.0, 1.0]])
+
+    def test_skewed_suppliers(self):
+        out = metrics([10.0, 0.0, 30.0, None, 60.0], top_n=(1,))
+        self.assertEqual(out["hhi"], 100.0 + 900.0 + 3600.0)
+        # Ascending 0, 0, 10, 30, 60: (-4*0 - 2*0 + 0*10 + 2*30 + 4*60) / (5 * 100)
+        self.assertEqual(out["gini"], 0.6)
+        self.assertEqual(out["top_shares"], [{"n": 1, "pct": 60.0}])
+        self.assertEqual(out["lorenz"][-2:], [[0.8, 0.4], [1.0, 1.0]])
+
+    def test_lorenz_sampling(self):
+        out = metrics([float(i) for i in range(1, 1001)], lorenz_points=11)
+        self.assertEqual(len(out["lorenz"]), 11)
+        # 100 smallest of 1..1000 hold 5,050 of 500,500.
+        self.assertEqual((out["lorenz"][0], out["lorenz"][1], out["lorenz"][-1]), ([0.0, 0.0], [0.1, 0.0101], [1.0, 1.0]))
+
+    def test_no_amount(self):
+        self.assertEqual(metrics([], top_n=(5,))["top_shares"], [{"n": 5, "pct": 0.0}])
+        self.assertEqual(metrics([0.0, None])["lorenz"], [])
+
+    def test_parse_top_n(self):
+        self.assertEqual(parse_top_n(None), [1, 5, 10, 20])
+        self.assertEqual(parse_top_n(["10,3", "3", " "]), [3, 10])
+        for bad in ("0", "-1", "x"):
+            with self.assertRaises(ValueError):
+                parse_top_n([bad])
+
+
+class ConcentrationEndpointTest(LakeApiTestCase):
+    def test_overall_and_by_modality(self):
+        params = {"buyer": "all", "top": "1,3", "by": "modality"}
+        out = self.get("/api/concentration", params).json()
+        overall = [t for _, t in self.raw("SELECT supplier_name, SUM(amount) FROM awards_clean_all GROUP BY 1")]
+        expected = metrics(overall, (1, 3))
+        self.assertEqual({key: out[key] for key in expected}, expected)
+
+        rows = self.raw(
+            """
+            SELECT COALESCE(t.procurement_method_details, '(Sin especificar)'), a.supplier_name, SUM(a.amount)
+            FROM awards_clean_all a JOIN tenders_clean_all t ON t.nog = a.nog AND t.month = a.month
+            GROUP BY 1, 2
+            """
+        )
+        by_modality: dict[str, list[float]] = {}
+        for modalidad, _, total in rows:
+            by_modality.setdefault(modalidad, []).append(total)
+        self.assertEqual([m["modalidad"] for m in out["by_modality"]], sorted(by_modality))
+        for section in out["by_modality"]:
+            with self.subTest(section["modalidad"]):
+                expected = metrics(by_modality[section["modalidad"]], (1, 3))
+                self.assertEqual({key: section[key] for key in expected}, expected)
+
+    def test_points_and_bad_params(self):
+        self.assertEqual(len(self.get("/api/concentration", {"buyer": "all", "points": 3}).json()["lorenz"]), 3)
+        self.get("/api/concentration", {"top": "0"}, status=400)
+        self.get("/api/concentration", {"by": "supplier"}, status=400)
+        self.get("/api/concentration", {"points": 1}, status=422)
+
+
+if __name__ == "__main__":
+    unittest.main()
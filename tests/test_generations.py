@@ -0,0 +1,176 @@
+"""
+ConnectionManager generation switching (backend/db.py): a DB replaced with `mv` or published as a
+new generation is opened off the request path and served to new requests; a DB that fails the
+check is skipped; a generation still leased by a request is closed only once it is released.
+Run: python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import duckdb
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from backend.db import ConnectionManager, read_signal, validate_db
+from backend.serve import SignalWriter
+from scripts import publish_generation
+from tests.fixtures import award, build_lake, tender
+
+SWITCH_TIMEOUT_SECONDS = 10
+
+
+def _lake(path: str, n_tenders: int) -> str:
+    """Lake whose tenders_clean_all row count tells the tests which DB answered."""
+    tenders = [tender(str(1000 + i), "2025-01") for i in range(n_tenders)]
+    return build_lake(path, tenders, [award("1000", "2025-01", 100.0, "PROVEEDOR A")])
+
+
+def _tenders(manager: ConnectionManager) -> int:
+    with manager.cursor() as cur:
+        return cur.execute("SELECT COUNT(*) FROM tenders_clean_all").fetchone()[0]
+
+
+def _wait_for(manager: ConnectionManager, predicate) -> None:
+    """Check the DB until predicate(stats) holds (the new DB is opened on the manager's db-open thread)."""
+    deadline = time.monotonic() + SWITCH_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        manager.identity()
+        if predicate(manager.stats()):
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"timed out waiting for the DB switch: {manager.stats()}")
+
+
+class GenerationSwitchTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="test_generations_")
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.db_path = os.path.join(self.dir, "lake.duckdb")
+
+    def _manager(self, resolve_path=None) -> ConnectionManager:
+        manager = ConnectionManager(resolve_path or (lambda: self.db_path), check_interval=0, signal_path="")
+        self.addCleanup(manager.close)
+        return manager
+
+    def _mv(self, n_tenders: int) -> None:
+        staged = _lake(os.path.join(self.dir, "lake_next.duckdb"), n_tenders)
+        os.replace(staged, self.db_path)
+
+    def test_mv_swap_serves_new_db(self):
+        _lake(self.db_path, 1)
+        manager = self._manager()
+        self.assertEqual(_tenders(manager), 1)
+        self._mv(2)
+        _wait_for(manager, lambda s: s["reopens"] == 1)
+        self.assertEqual(_tenders(manager), 2)
+        self.assertEqual(manager.stats()["generations_closed"], 1)
+
+    def test_published_generation_serves_new_db(self):
+        patches = {
+            "DB_PATH": self.db_path,
+            "GENERATIONS_DIR": os.path.join(self.dir, "generations"),
+            "CURRENT_GENERATION_PATH": os.path.join(self.dir, "generations", "current"),
+        }
+        for name, value in patches.items():
+            patcher = mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        _lake(self.db_path, 1)
+        manager = self._manager(config.served_db_path)
+        self.assertEqual(_tenders(manager), 1)
+
+        name = publish_generation.publish(_lake(os.path.join(self.dir, "lake_next.duckdb"), 3))
+        _wait_for(manager, lambda s: s["db_path"] == publish_generation.generation_db(name))
+        self.assertEqual(_tenders(manager), 3)
+
+    def test_invalid_db_keeps_serving_current_generation(self):
+        _lake(self.db_path, 1)
+        manager = self._manager()
+        self.assertEqual(_tenders(manager), 1)
+        generation = manager.stats()["generation"]
+
+        junk = os.path.join(self.dir, "junk.duckdb")
+        with open(junk, "wb") as f:
+            f.write(b"not a duckdb file" * 100)
+        os.replace(junk, self.db_path)
+        with self.assertLogs("backend.db", "ERROR"):
+            _wait_for(manager, lambda s: s["rejected"] == 1)
+        self.assertEqual(_tenders(manager), 1)
+        self.assertEqual(manager.stats()["generation"], generation)
+
+        # A DB without the API's tables is rejected the same way.
+        empty = os.path.join(self.dir, "empty.duckdb")
+        duckdb.connect(empty).close()
+        os.replace(empty, self.db_path)
+        with self.assertLogs("backend.db", "ERROR"):
+            _wait_for(manager, lambda s: s["rejected"] == 2)
+        self.assertEqual(_tenders(manager), 1)
+
+        # The next good DB is picked up again.
+        self._mv(4)
+        _wait_for(manager, lambda s: s["reopens"] == 1)
+        self.assertEqual(_tenders(manager), 4)
+
+    def test_leased_generation_closed_after_release(self):
+        _lake(self.db_path, 1)
+        manager = self._manager()
+        with manager.cursor() as old_cur:
+            old_generation = manager.stats()["generation"]
+            self._mv(2)
+            _wait_for(manager, lambda s: s["reopens"] == 1)
+            stats = manager.stats()
+            self.assertNotEqual(stats["generation"], old_generation)
+            self.assertEqual(stats["retired_generations"], [
+                {"generation": old_generation, "db_path": self.db_path, "active_leases": 1},
+            ])
+            self.assertEqual(stats["generations_closed"], 0)
+            # The request that started on the old generation still reads it.
+            self.assertEqual(old_cur.execute("SELECT COUNT(*) FROM tenders_clean_all").fetchone()[0], 1)
+        stats = manager.stats()
+        self.assertEqual(stats["retired_generations"], [])
+        self.assertEqual(stats["generations_closed"], 1)
+        self.assertEqual(_tenders(manager), 2)
+
+
+class ValidateDbTest(unittest.TestCase):
+    """validate_db: the check publish_generation.py and the multi-worker supervisor both run."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="test_validate_db_")
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def test_problems(self):
+        self.assertEqual(validate_db(_lake(self._path("ok.duckdb"), 1)), [])
+        self.assertEqual(validate_db(build_lake(self._path("no_tenders.duckdb"), [], [])), ["tenders_clean_all is empty"])
+        duckdb.connect(self._path("bare.duckdb")).close()
+        self.assertTrue(validate_db(self._path("bare.duckdb"))[0].startswith("missing tables: tenders_clean_all"))
+        with open(self._path("junk.duckdb"), "wb") as f:
+            f.write(b"not a duckdb file" * 100)
+        self.assertTrue(validate_db(self._path("junk.duckdb"))[0].startswith("cannot open"))
+
+    def test_signal_writer_signals_only_valid_dbs(self):
+        db_path = self._path("lake.duckdb")
+        signal_path = self._path("serving.json")
+        writer = SignalWriter(signal_path)
+        with mock.patch.object(config, "served_db_path", lambda: db_path):
+            build_lake(db_path, [], [])
+            with self.assertLogs("backend.serve", "ERROR"):
+                self.assertFalse(writer.check())
+            self.assertIsNone(read_signal(signal_path))
+            os.remove(db_path)
+            _lake(db_path, 2)
+            self.assertTrue(writer.check(switch_now=True))
+        self.assertEqual(read_signal(signal_path)["path"], db_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
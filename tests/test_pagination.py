@@ -0,0 +1,81 @@
+"""
+Keyset cursors (backend/pagination.py): walking next_cursor page by page returns every row of the
+filter once, in the order of a single page (ties on the date and missing dates included), and a
+cursor issued by another endpoint or a malformed one is a 400. Run: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.pagination import encode_cursor
+from tests.fixtures import LakeApiTestCase
+
+# path -> (params, key of the rows in the JSON body, id column)
+PAGED = {
+    "/api/tenders": ({"buyer": "all"}, "items", "nog"),
+    "/api/awards": ({"buyer": "all"}, "items", "award_id"),
+    "/api/low-competition": ({"buyer": "all"}, "tenders", "nog"),
+    "/api/search": ({"buyer": "all", "q": "lote"}, "items", "doc_id"),
+}
+
+
+class KeysetCursorTest(LakeApiTestCase):
+    def _walk(self, path: str, params: dict, key: str, limit: int) -> list[dict]:
+        rows, cursor, pages = [], None, 0
+        while True:
+            body = self.get(path, {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}).json()
+            rows += body[key]
+            pages += 1
+            cursor = body["next_cursor"]
+            if not cursor:
+                return rows
+            self.assertLess(pages, 1000, "cursor does not advance")
+
+    def test_round_trip(self):
+        for path, (params, key, id_col) in PAGED.items():
+            with self.subTest(path):
+                everything = self.get(path, {**params, "limit": 100}).json()
+                self.assertIsNone(everything["next_cursor"])
+                self.assertGreater(len(everything[key]), 7)
+                for limit in (1, 3, 7):
+                    rows = self._walk(path, params, key, limit)
+                    self.assertEqual(rows, everything[key])
+                    self.assertEqual(len({r[id_col] for r in rows}), len(rows))
+
+    def test_round_trip_arrow(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        params, _, _ = PAGED["/api/tenders"]
+        expected = [r["nog"] for r in self.get("/api/tenders", {**params, "limit": 100}).json()["items"]]
+        nogs, cursor = [], None
+        while True:
+            response = self.get(
+                "/api/tenders", {**params, "limit": 4, "format": "arrow", **({"cursor": cursor} if cursor else {})}
+            )
+            nogs += pa.ipc.open_stream(response.content).read_all().column("nog").to_pylist()
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual(nogs, expected)
+
+    def test_foreign_cursor_rejected(self):
+        for path, (params, _, _) in PAGED.items():
+            with self.subTest(path):
+                kind = path.rsplit("/", 1)[-1]
+                other = "awards" if kind != "awards" else "tenders"
+                foreign = encode_cursor(other, "2025-01-01T00:00:00Z", "20001")
+                detail = self.get(path, {**params, "cursor": foreign}, status=400).json()["detail"]
+                self.assertEqual(detail, f"Cursor was not issued by /api/{kind}")
+                # A page's cursor from another endpoint, as a client would misuse it.
+                issued = self.get(f"/api/{other}", {"buyer": "all", "limit": 1}).json()["next_cursor"]
+                self.get(path, {**params, "cursor": issued}, status=400)
+                for junk in ("not-a-cursor", "eyJ4Ijox", encode_cursor(kind, None, 5)):
+                    self.get(path, {**params, "cursor": junk}, status=400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+Rollup parity: the endpoints that read the rollups built by scripts/derived_tables.py answer what
+the original queries over tenders_clean_all / awards_clean_all answered, for several filters, and
+/api/dashboard's sections match the standalone endpoints. Run: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fixtures import ANTIGUA, MIXCO, LakeApiTestCase
+
+FILTERS = (
+    {},
+    {"years": "2025"},
+    {"from_month": "2024-12", "to_month": "2025-02"},
+    {"buyer": "all"},
+    {"buyer": MIXCO, "years": ["2024", "2025"]},
+)
+
+
+def _where(alias: str, params: dict) -> tuple[str, list]:
+    """The filter as the original queries applied it: buyer name and the raw 'YYYY-MM' month column."""
+    prefix = f"{alias}." if alias else ""
+    parts, values = [], []
+    buyer = params.get("buyer", ANTIGUA)
+    if buyer != "all":
+        parts.append(f"{prefix}buyer_name = ?")
+        values.append(buyer)
+    years = params.get("years")
+    if years:
+        years = [years] if isinstance(years, str) else years
+        parts.append(f"SUBSTR({prefix}month, 1, 4) IN ({', '.join('?' for _ in years)})")
+        values += years
+    for key, op in (("from_month", ">="), ("to_month", "<=")):
+        if params.get(key):
+            parts.append(f"{prefix}month {op} ?")
+            values.append(params[key])
+    return " AND ".join(parts) or "TRUE", values
+
+
+class RollupParityTest(LakeApiTestCase):
+    def test_kpis(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("", params)
+                (tenders,), = self.raw(f"SELECT COUNT(*) FROM tenders_clean_all WHERE {wf}", values)
+                awards, total = self.raw(
+                    f"SELECT COUNT(*), ROUND(COALESCE(SUM(amount), 0), 2) FROM awards_clean_all WHERE {wf}", values
+                )[0]
+                self.assertGreater(awards, 0)
+                self.assertEqual(
+                    self.get("/api/kpis", params).json(),
+                    {"tenders_count": tenders, "awards_count": awards, "total_amount": float(total)},
+                )
+
+    def test_suppliers(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("", params)
+                expected = [
+                    {"proveedor": r[0], "adjudicaciones": r[1], "total_q": float(r[2])}
+                    for r in self.raw(
+                        f"""
+                        SELECT COALESCE(supplier_name, '(Sin nombre)'), COUNT(*), ROUND(SUM(amount), 2) AS total_q
+                        FROM awards_clean_all WHERE {wf} GROUP BY supplier_name ORDER BY total_q DESC
+                        """,
+                        values,
+                    )
+                ]
+                self.assertEqual(self.get("/api/suppliers", params).json(), expected)
+
+    def test_concentration(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("", params)
+                totals = self.raw(
+                    f"SELECT supplier_name, SUM(amount) FROM awards_clean_all WHERE {wf} GROUP BY supplier_name", values
+                )
+                amounts = sorted((t for _, t in totals), reverse=True)
+                out = self.get("/api/concentration", params).json()
+                self.assertEqual(out["distinct_suppliers"], sum(1 for name, _ in totals if name is not None))
+                self.assertEqual(out["top5_pct"], round(sum(amounts[:5]) / sum(amounts) * 100, 1))
+                shares = [t / sum(amounts) for t in amounts]
+                self.assertEqual(out["hhi"], round(sum((s * 100) ** 2 for s in shares), 1))
+
+    def test_bands_and_trend(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("", params)
+                bands = self.raw(
+                    f"""
+                    SELECT
+                        CASE
+                            WHEN amount < 25000 THEN '< Q25,000 (baja cuantía)'
+                            WHEN amount < 90000 THEN 'Q25,000 - Q90,000 (compra directa)'
+                            ELSE '> Q90,000 (licitación)'
+                        END AS rango,
+                        COUNT(*), ROUND(SUM(amount), 2)
+                    FROM awards_clean_all WHERE {wf} AND amount IS NOT NULL
+                    GROUP BY rango ORDER BY MIN(amount)
+                    """,
+                    values,
+                )
+                self.assertEqual(
+                    self.get("/api/bands", params).json(),
+                    [{"rango": r[0], "adjudicaciones": r[1], "total_q": float(r[2])} for r in bands],
+                )
+                trend = self.raw(
+                    f"""
+                    SELECT month, COUNT(*), ROUND(SUM(amount), 2) FROM awards_clean_all
+                    WHERE {wf} AND month IS NOT NULL GROUP BY month ORDER BY month
+                    """,
+                    values,
+                )
+                self.assertEqual(
+                    self.get("/api/trend", params).json(),
+                    [{"mes": r[0], "adjudicaciones": r[1], "total_q": float(r[2])} for r in trend],
+                )
+
+    def test_modalities(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("t", params)
+                rows = self.raw(
+                    f"""
+                    SELECT
+                        COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
+                        COUNT(DISTINCT t.nog),
+                        ROUND(COALESCE(SUM(a.amount), 0), 2) AS total_q
+                    FROM tenders_clean_all t
+                    LEFT JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
+                    WHERE {wf}
+                    GROUP BY t.procurement_method_details
+                    ORDER BY total_q DESC
+                    """,
+                    values,
+                )
+                self.assertEqual(
+                    self.get("/api/modalities", params).json(),
+                    [{"modalidad": r[0], "procesos": r[1], "total_q": float(r[2])} for r in rows],
+                )
+
+    def test_top_suppliers_by_modality(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                wf, values = _where("t", params)
+                rows = self.raw(
+                    f"""
+                    WITH by_mod_supplier AS (
+                        SELECT
+                            COALESCE(t.procurement_method_details, '(Sin especificar)') AS modalidad,
+                            COALESCE(a.supplier_name, '(Sin nombre)') AS proveedor,
+                            ROUND(SUM(a.amount), 2) AS total_q,
+                            COUNT(*) AS adjudicaciones
+                        FROM tenders_clean_all t
+                        JOIN awards_clean_all a ON t.nog = a.nog AND t.month = a.month
+                        WHERE {wf}
+                        GROUP BY t.procurement_method_details, a.supplier_name
+                    ),
+                    ranked AS (
+                        SELECT *, ROW_NUMBER() OVER (PARTITION BY modalidad ORDER BY total_q DESC) AS rn
+                        FROM by_mod_supplier
+                    )
+                    SELECT modalidad, proveedor, total_q, adjudicaciones, rn
+                    FROM ranked WHERE rn <= 10 ORDER BY modalidad, rn
+                    """,
+                    values,
+                )
+                self.assertEqual(
+                    self.get("/api/top-suppliers-by-modality", params).json(),
+                    [
+                        {"modalidad": r[0], "proveedor": r[1], "total_q": float(r[2]), "adjudicaciones": r[3], "rn": r[4]}
+                        for r in rows
+                    ],
+                )
+
+    def test_dashboard_matches_standalone_endpoints(self):
+        for params in FILTERS:
+            with self.subTest(**params):
+                dashboard = self.get("/api/dashboard", params).json()
+                for section in ("kpis", "suppliers", "concentration", "supplier-names", "bands", "trend"):
+                    self.assertEqual(dashboard[section], self.get(f"/api/{section}", params).json(), section)
+
+
+if __name__ == "__main__":
+    unittest.main()
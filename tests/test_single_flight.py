@@ -0,0 +1,72 @@
+"""
+SingleFlight across event loops: the API serves requests on the server's loop while warm-up
+(backend/warmup.py) replays requests through the app on its own thread's loop, and both may
+miss on the same key at once. Run: python -m unittest discover tests
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.cache import SingleFlight
+
+
+class SingleFlightAcrossLoopsTest(unittest.TestCase):
+    def _run_two_loops(self, flight: SingleFlight, fn, first_delay: float = 0.05) -> list:
+        """Call flight.run on the same key from two threads, each with its own asyncio.run loop."""
+        results: list = [None, None]
+
+        def call(i: int) -> None:
+            try:
+                results[i] = asyncio.run(flight.run("key", "test", fn))
+            except BaseException as e:  # noqa: BLE001 - the test inspects it
+                results[i] = e
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(2)]
+        threads[0].start()
+        time.sleep(first_delay)  # second caller arrives while the first is in flight
+        threads[1].start()
+        for t in threads:
+            t.join(5)
+        return results
+
+    def test_shares_one_execution(self):
+        calls = []
+
+        async def compute():
+            calls.append(threading.get_ident())
+            await asyncio.sleep(0.3)
+            return "body"
+
+        flight = SingleFlight(enabled=True)
+        results = self._run_two_loops(flight, compute)
+        self.assertEqual(results, ["body", "body"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"enabled": True, "in_flight": 0, "executions": 1, "coalesced": 1})
+
+    def test_shares_exception(self):
+        async def compute():
+            await asyncio.sleep(0.3)
+            raise ValueError("bad filter")
+
+        results = self._run_two_loops(SingleFlight(enabled=True), compute)
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+
+    def test_key_reusable_after_completion(self):
+        flight = SingleFlight(enabled=True)
+
+        async def compute():
+            return 1
+
+        self.assertEqual(asyncio.run(flight.run("key", "test", compute)), 1)
+        self.assertEqual(asyncio.run(flight.run("key", "test", compute)), 1)
+        self.assertEqual(flight.stats()["executions"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Warm-up outcome reported by /api/ready (backend/warmup.py): failed requests make it degraded or
+failed instead of ready. Run: python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.warmup import WarmupState
+
+
+def _warm(state: WarmupState, errors: list[str | None]) -> dict:
+    state.begin(len(errors))
+    for error in errors:
+        state.step(error)
+    state.finish("v1")
+    return state.snapshot()
+
+
+class WarmupStateTest(unittest.TestCase):
+    def setUp(self):
+        self.state = WarmupState()
+        self.state.status = "pending"  # as when API_WARMUP is on
+
+    def test_not_ready_before_first_warmup(self):
+        self.assertFalse(self.state.snapshot()["ready"])
+
+    def test_clean_warmup_is_ready(self):
+        snapshot = _warm(self.state, [None, None, None])
+        self.assertEqual((snapshot["ready"], snapshot["status"]), (True, "ready"))
+        self.assertFalse(self.state.needs_retry)
+
+    def test_some_errors_degrade(self):
+        snapshot = _warm(self.state, [None, "/api/kpis: HTTP 500", None])
+        self.assertEqual((snapshot["ready"], snapshot["status"]), (True, "degraded"))
+        self.assertEqual(snapshot["errors"], ["/api/kpis: HTTP 500"])
+        self.assertTrue(self.state.needs_retry)
+
+    def test_all_errors_fail(self):
+        snapshot = _warm(self.state, ["/api/kpis: HTTP 500", "/api/trend: HTTP 500"])
+        self.assertEqual((snapshot["ready"], snapshot["status"]), (False, "failed"))
+        self.assertTrue(self.state.needs_retry)
+
+    def test_rewarming_keeps_previous_outcome(self):
+        _warm(self.state, [None])
+        self.state.begin(1)
+        snapshot = self.state.snapshot()
+        self.assertEqual((snapshot["ready"], snapshot["status"]), (True, "warming"))
+        _warm(self.state, ["/api/kpis: HTTP 503"])
+        self.assertFalse(self.state.snapshot()["ready"])
+
+
+if __name__ == "__main__":
+    unittest.main()